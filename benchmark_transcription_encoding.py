@@ -0,0 +1,104 @@
+"""
+    compares the size, encoding time and (optionally) transcription latency and
+    WER of the audio formats a recording can be sent to the providers in.
+
+    python benchmark_transcription_encoding.py data/sample1.mp3
+    python benchmark_transcription_encoding.py data/sample1.mp3 --transcribe --reference script.txt
+    python benchmark_transcription_encoding.py data/sample1.mp3 --transcribe --client local --local-model openai/whisper-small
+
+    without a reference text the WER is measured against the transcription of
+    the full rate mp3, i.e. what is sent today. the cpu column is the
+    process cpu time of the transcription, the cost of a local model.
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import jiwer
+
+import src.common  # noqa: F401, has to be imported before src.services
+from src.common import AudioBuffer, encode_for_transcription
+from src.common.text_preprocessor import TextPreprocessor
+
+# (name, format, sample rate), None keeps the recording's own rate
+CANDIDATES = [
+    ("mp3 (current)", "mp3", None),
+    ("mp3 16k", "mp3", 16000),
+    ("flac 16k", "flac", 16000),
+    ("opus 16k", "opus", 16000),
+]
+
+
+def transcriber(client: str, local_model: str) -> Callable[[bytes], Awaitable[str]]:
+    """transcribe function of the client, "remote" goes through the provider router"""
+    if client == "local":
+        # built here, the local model needs none of the app configuration
+        from src.services import LocalWhisperTranscriptionService
+
+        local = LocalWhisperTranscriptionService(model=local_model)
+        local.load()
+        return lambda audio: local.transcribe(audio, language="en")
+
+    from src.configs.setup_context import context
+
+    return lambda audio: context.transcription_service.transcribe(
+        audio=audio,
+        client=None if client == "remote" else client,
+        language="en"
+    )
+
+
+async def transcribe(transcribe_audio: Callable[[bytes], Awaitable[str]], audio: bytes) -> tuple:
+    start, cpu_start = time.perf_counter(), time.process_time()
+    transcription = await transcribe_audio(audio)
+    return (
+        TextPreprocessor.normalize(transcription),
+        time.perf_counter() - start,
+        time.process_time() - cpu_start
+    )
+
+
+async def main(args):
+    audio = AudioBuffer.from_file(args.audio)
+    reference = None
+    if args.reference:
+        with open(args.reference) as file:
+            reference = TextPreprocessor.normalize(file.read())
+
+    transcribe_audio = transcriber(args.client, args.local_model) if args.transcribe else None
+
+    print(f"{args.audio}: {audio.duration_seconds:.1f}s at {audio.sample_rate} Hz, client {args.client}")
+    print(f"{'format':<16}{'bytes':>12}{'ratio':>8}{'encode s':>10}{'latency s':>11}{'cpu s':>8}{'wer':>8}")
+
+    baseline_size = None
+    for name, _format, sample_rate in CANDIDATES:
+        start = time.perf_counter()
+        encoded = encode_for_transcription(audio, _format, sample_rate or audio.sample_rate)
+        encode_time = time.perf_counter() - start
+        baseline_size = baseline_size or len(encoded)
+
+        latency, cpu, wer = "", "", ""
+        if args.transcribe:
+            transcription, elapsed, cpu_time = await transcribe(transcribe_audio, encoded)
+            # the first candidate is the current upload, the others are compared to it
+            reference = reference or transcription
+            latency = f"{elapsed:.2f}"
+            cpu = f"{cpu_time:.2f}"
+            # jiwer can't score against an empty reference
+            wer = f"{jiwer.wer(reference, transcription):.3f}" if reference else "n/a"
+
+        print(
+            f"{name:<16}{len(encoded):>12}{len(encoded) / baseline_size:>8.2f}"
+            f"{encode_time:>10.2f}{latency:>11}{cpu:>8}{wer:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark the audio formats sent for transcription")
+    parser.add_argument("audio", nargs="?", default="data/sample1.mp3")
+    parser.add_argument("--transcribe", action="store_true", help="also transcribe every format, needs the provider tokens")
+    parser.add_argument("--client", choices=["remote", "groq", "deepgram", "local"], default="remote", help="remote sends through the provider router, local runs a whisper model on this machine")
+    parser.add_argument("--local-model", default="openai/whisper-small", help="whisper checkpoint of the local client")
+    parser.add_argument("--reference", help="text file with the expected transcription")
+    asyncio.run(main(parser.parse_args()))
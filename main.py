@@ -1,54 +1,258 @@
 import asyncio
 import argparse
-from typing import Dict
+import os
+import signal
+from typing import Dict, List, Optional, Union
 from src.configs.initialize_dependencies import initialize_dependencies
 from src.enums import AssessmentType
-from src.common import AppContext, Worker
+from src.common import AppContext, Worker, TaskExecutor, TaskPrefetcher, \
+    AudioBuffer, Task, PollScheduler, LarkEventListener, WeightedFairSelector
+from src.configs.config import config
 from src.configs.setup_context import context
 from src.interfaces import CallbackHandler
 from src.handlers import ScriptReadingHandler, EnhancedScriptReadingHandler
 
 Handlers = Dict[str, CallbackHandler]
 
+# map shortcut name to its real name
+task_map = {
+    "sr": AssessmentType.SCRIPT_READING,
+    "esr": AssessmentType.ENHANCED_SCRIPT_READING,
+}
+
+
+def parse_per_task(value: str, server_tasks: List[str]) -> Dict[str, float]:
+    """
+        parse a per assessment setting, either one number for every
+        assessment ("3") or one per shortcut name ("sr=2,esr=4"). every
+        number must be positive, an assessment with a quota or weight of 0
+        would never be served
+    """
+    def to_number(number: str) -> float:
+        try:
+            return float(number)
+        except ValueError:
+            raise ValueError(f"expected a number, got {number.strip()!r}") from None
+
+    if "=" not in value:
+        try:
+            number = to_number(value)
+        except ValueError:
+            raise ValueError(f"expected a number or name=number pairs, got {value!r}") from None
+        settings = {server_task: number for server_task in server_tasks}
+    else:
+        settings = {}
+        for item in value.split(","):
+            parts = item.split("=")
+            if len(parts) != 2:
+                raise ValueError(f"expected name=number, got {item.strip()!r}")
+
+            name, number = parts[0].strip(), parts[1]
+            if name not in task_map:
+                raise ValueError(f"unknown assessment {name!r}, expected one of {', '.join(task_map)}")
+            settings[task_map[name]] = to_number(number)
+
+    for server_task, number in settings.items():
+        if number <= 0:
+            raise ValueError(f"{server_task} must be above 0, got {number:g}")
+
+    return {
+        server_task: settings.get(server_task, 1)
+        for server_task in server_tasks
+    }
+
 
 async def main(
-    server_task: str,
+    server_tasks: List[str],
     ctx: AppContext,
     worker: Worker,
-    handlers: Handlers
+    handlers: Handlers,
+    concurrency: Union[int, Dict[str, int]] = 1,
+    shutdown_timeout: float = 60,
+    prefetch_depth: int = 2,
+    prefetch_max_bytes: int = 256 * 1024 * 1024,
+    poll_min_interval: float = 1,
+    poll_max_interval: float = 30,
+    webhook: bool = False,
+    weights: Optional[Dict[str, float]] = None
 ):
     """
         Entry point:
-        1. This will setup all necessary dependencies and fetch all references 
+        1. This will setup all necessary dependencies and fetch all references
         from lark base
-        2. This will create an infinite loop that will poll and process 
-        assessment dynamically based on their assessment types
+        2. This will create an infinite loop that will poll and process
+        assessment dynamically based on their assessment types, running up to
+        `concurrency` assessments of each type at the same time while the
+        recordings of the next `prefetch_depth` assessments are downloaded in
+        the background. when several types have work, they take turns in
+        proportion to their `weights`.
+        lark is polled right away while work keeps coming in and less often
+        while idle, a SIGUSR1 forces an immediate sync. with `webhook` new
+        submissions are pushed by lark record change events and polling only
+        reconciles what the events missed
+        3. A SIGTERM (or SIGINT) stops taking new work and gives the in-flight
+        assessments `shutdown_timeout` seconds to finish. the ones cancelled
+        after that go back to the queue and resume from their last
+        checkpointed stage on the next start
     """
-    should_exit = False
+    stopping = asyncio.Event()
+
+    executor = TaskExecutor(
+        handlers={server_task: handlers[server_task] for server_task in server_tasks},
+        concurrency=concurrency,
+        logger=ctx.logger,
+        task_queue=ctx.task_queue,
+        registry=ctx.record_registry,
+        claimer=ctx.record_claimer
+    )
+
+    selector = WeightedFairSelector(
+        weights or {server_task: 1 for server_task in server_tasks}
+    )
+
+    async def fetch_audio(task: Task) -> AudioBuffer:
+        data = await ctx.audio_downloader.download(task.payload['audio_url'])
+        return await asyncio.to_thread(AudioBuffer.from_bytes, data)
+
+    # one prefetcher per assessment type, so a backlog of one type can't
+    # hold up the recordings of the others
+    prefetchers = {
+        server_task: TaskPrefetcher(
+            ctx.task_queue,
+            fetch_audio,
+            depth=prefetch_depth,
+            max_bytes=prefetch_max_bytes // len(server_tasks),
+            logger=ctx.logger,
+            types=[server_task]
+        )
+        for server_task in server_tasks
+    }
+
+    scheduler = PollScheduler(
+        min_interval=poll_min_interval,
+        max_interval=poll_max_interval
+    )
+
+    def stop():
+        """stop taking new work, in-flight assessments get to finish"""
+        if not stopping.is_set():
+            ctx.logger.info('stopping, waiting for in-flight assessments...')
+        stopping.set()
+        scheduler.wake()
+        executor.wake()
+
+    try:
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGUSR1, scheduler.wake)
+        # systemd stops and restarts the service with a SIGTERM
+        loop.add_signal_handler(signal.SIGTERM, stop)
+        loop.add_signal_handler(signal.SIGINT, stop)
+    except (NotImplementedError, AttributeError):
+        # no SIGUSR1 / loop signal handlers on windows
+        pass
+
+    pruned = ctx.checkpoints.prune()
+    if pruned:
+        ctx.logger.info('dropped %s expired checkpoint(s)', pruned)
+
+    if ctx.record_claimer is not None:
+        # without the claim fields every claim fails and no record is evaluated
+        await ctx.record_claimer.check_fields()
 
     await ctx.stores.reference_store.sync_and_store_df_in_memory()
 
+    # only script reading uses the voice analyzer models, load them upfront
+    # so the first applicant does not pay for the model startup. every
+    # assessment type served by this process shares the same models
+    if AssessmentType.SCRIPT_READING in server_tasks:
+        await ctx.audio_scoring_service.start()
+
+    local_transcriber = ctx.transcription_service.implementations.get("local")
+    if local_transcriber is not None:
+        await local_transcriber.start()
+
+    listener = None
+    if webhook:
+        listener = LarkEventListener(
+            ctx,
+            worker,
+            table_id=ctx.lark_queue.bitable_table_id,
+            encrypt_key=config.LARK_EVENT_ENCRYPT_KEY,
+            verification_token=config.LARK_EVENT_VERIFICATION_TOKEN,
+            scheduler=scheduler,
+            host=config.LARK_EVENT_HOST,
+            port=config.LARK_EVENT_PORT,
+            path=config.LARK_EVENT_PATH,
+            logger=ctx.logger
+        )
+        await listener.start()
+
     await worker.sync()
 
-    ctx.logger.info('queue count: %s', ctx.task_queue.remaining())
+    ctx.logger.info('queue count: %s', ctx.task_queue.remaining(server_tasks))
 
-    while not should_exit:
-        try:
-            if not ctx.task_queue.is_empty():
-                ctx.logger.info('queue count: %s', ctx.task_queue.remaining())
-                task = ctx.task_queue.pop()
-                payload = task.payload
-                assessment_type = task.type
-
-                if assessment_type == server_task:
-                    await handlers[assessment_type].handle(payload)
-
-            else:
-                await worker.sync()
-            ctx.logger.info("delay for 1 sec...")
-            await asyncio.sleep(1)
-        except KeyboardInterrupt:
-            should_exit = True
+    try:
+        while not stopping.is_set():
+            try:
+                with_work = [
+                    server_task for server_task in server_tasks
+                    if not prefetchers[server_task].is_empty()
+                ]
+                ready = [
+                    server_task for server_task in with_work
+                    if executor.has_capacity(server_task)
+                ]
+
+                if ready:
+                    server_task = selector.pick(ready)
+                    prefetcher = prefetchers[server_task]
+
+                    ctx.logger.info(
+                        '%s queue count: %s, prefetched: %s, in-flight: %s',
+                        server_task,
+                        ctx.task_queue.remaining([server_task]),
+                        prefetcher.pending(),
+                        executor.in_flight()
+                    )
+                    prefetched = await prefetcher.next()
+                    if prefetched is None:
+                        continue
+
+                    task, audio = prefetched
+
+                    if stopping.is_set():
+                        ctx.task_queue.release(task)
+                        break
+
+                    record_id = task.payload.get('record_id')
+
+                    if executor.is_running(record_id):
+                        ctx.logger.info('skipping %s, already in progress', record_id)
+                        ctx.task_queue.ack(task)
+                    else:
+                        await executor.submit(task, audio)
+                elif with_work:
+                    # every type with queued work is at its quota, the
+                    # prefetchers keep downloading meanwhile
+                    await executor.wait_for_slot()
+                elif await worker.sync():
+                    scheduler.reset()
+                elif await scheduler.wait():
+                    ctx.logger.info('woken up, syncing...')
+            except KeyboardInterrupt:
+                stop()
+    finally:
+        if listener is not None:
+            await listener.stop()
+        for prefetcher in prefetchers.values():
+            await prefetcher.close()
+        cancelled = await executor.drain(timeout=shutdown_timeout)
+        if cancelled:
+            ctx.logger.warning('cancelled %s unfinished task(s)', cancelled)
+        ctx.audio_scoring_service.shutdown()
+        await ctx.audio_downloader.close()
+        ctx.checkpoints.close()
+        ctx.result_cache.close()
 
 if __name__ == "__main__":
     print("starting...")
@@ -56,24 +260,96 @@ if __name__ == "__main__":
     parser.add_argument(
         '--server-task',
         type=str,
-        default='sr',
+        nargs='+',
+        default=os.getenv('SERVER_TASKS', 'sr').split(','),
         choices=['sr', 'esr'],
-        help='Choose which task to run'
+        help='Choose which tasks to run, e.g. --server-task sr esr'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=str,
+        default=os.getenv('MAX_CONCURRENT_TASKS', '3'),
+        help='Maximum number of assessments processed at the same time, '
+             'for every task ("3") or per task ("sr=2,esr=4")'
+    )
+    parser.add_argument(
+        '--weights',
+        type=str,
+        default=os.getenv('TASK_WEIGHTS', '1'),
+        help='Share of turns each task gets while several have work queued, '
+             'e.g. "sr=2,esr=1"'
+    )
+    parser.add_argument(
+        '--shutdown-timeout',
+        type=float,
+        default=float(os.getenv('SHUTDOWN_TIMEOUT_SECONDS', 60)),
+        help='Seconds to wait for in-flight assessments before exiting'
+    )
+    parser.add_argument(
+        '--prefetch-depth',
+        type=int,
+        default=int(os.getenv('PREFETCH_DEPTH', 2)),
+        help='Number of upcoming assessments to download ahead of time'
+    )
+    parser.add_argument(
+        '--prefetch-max-mb',
+        type=int,
+        default=int(os.getenv('PREFETCH_MAX_MB', 256)),
+        help='Stop prefetching while the decoded audio buffered exceeds this size'
+    )
+    parser.add_argument(
+        '--poll-min-interval',
+        type=float,
+        default=float(os.getenv('POLL_MIN_INTERVAL_SECONDS', 1)),
+        help='Seconds between lark syncs while submissions keep coming in'
+    )
+    parser.add_argument(
+        '--poll-max-interval',
+        type=float,
+        default=os.getenv('POLL_MAX_INTERVAL_SECONDS'),
+        help='Upper bound of the idle backoff between lark syncs '
+             '(default: 30, or 300 with --webhook)'
+    )
+    parser.add_argument(
+        '--webhook',
+        action='store_true',
+        default=os.getenv('LARK_EVENTS_ENABLED', '').lower() in ('1', 'true'),
+        help='Receive submissions through lark record change events, '
+             'polling then only reconciles missed events'
     )
 
     args = parser.parse_args()
 
-    task_map = {
-        "sr": AssessmentType.SCRIPT_READING,
-        "esr": AssessmentType.ENHANCED_SCRIPT_READING,
-    }
+    if args.poll_max_interval is None:
+        # with events pushing new submissions, polling is only a safety net
+        args.poll_max_interval = 300 if args.webhook else 30
+    args.poll_max_interval = float(args.poll_max_interval)
 
-    # map shortcut name to its real name
-    server_task = task_map[args.server_task]
+    if args.webhook and not (config.LARK_EVENT_ENCRYPT_KEY and config.LARK_EVENT_VERIFICATION_TOKEN):
+        parser.error(
+            "--webhook needs LARK_EVENT_ENCRYPT_KEY and LARK_EVENT_VERIFICATION_TOKEN, "
+            "without them anyone could forge lark events"
+        )
 
-    print("Server task:", server_task)
+    server_tasks = list(dict.fromkeys(
+        task_map[server_task] for server_task in args.server_task
+    ))
 
-    initialize_dependencies()
+    print("Server tasks:", ", ".join(server_tasks))
+
+    try:
+        concurrency = {
+            server_task: int(limit)
+            for server_task, limit in parse_per_task(
+                args.concurrency,
+                server_tasks
+            ).items()
+        }
+        weights = parse_per_task(args.weights, server_tasks)
+    except ValueError as err:
+        parser.error(f"--concurrency/--weights: {err}")
+
+    initialize_dependencies(config.STORAGE_CLEANUP_AGE)
 
     # map handlers for all supported assessments
     handlers: Handlers = {
@@ -81,6 +357,21 @@ if __name__ == "__main__":
         AssessmentType.ENHANCED_SCRIPT_READING: EnhancedScriptReadingHandler(context)
     }
 
-    worker = Worker(context, server_task)
+    worker = Worker(context, server_tasks)
 
-    asyncio.run(main(server_task, context, worker, handlers))
+    asyncio.run(
+        main(
+            server_tasks,
+            context,
+            worker,
+            handlers,
+            concurrency=concurrency,
+            shutdown_timeout=args.shutdown_timeout,
+            prefetch_depth=args.prefetch_depth,
+            prefetch_max_bytes=args.prefetch_max_mb * 1024 * 1024,
+            poll_min_interval=args.poll_min_interval,
+            poll_max_interval=args.poll_max_interval,
+            webhook=args.webhook,
+            weights=weights
+        )
+    )
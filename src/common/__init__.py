@@ -1,15 +1,29 @@
 from .feature_extractor import FeatureExtractor
 from .audio_converter import AudioConverter
+from .record_registry import RecordRegistry
+from .checkpoint_store import CheckpointStore
+from .result_cache import ResultCache
+from .record_claimer import RecordClaimer
 from .task_queue import TaskQueue
 from ._task import Task
 from .utilities import retry, download_mp3, map_value, delete_file, get_necessary_fields_from_payload, get_prompt, get_prompt_raw, log_execution_time
 from .data_transformer import DataTransformer
 from .lark_queue import LarkQueue
 from .transcription_processor import TranscriptionProcessor
+from .audio_buffer import AudioBuffer
+from .audio_source import AudioSource, read_audio, encode_for_transcription
 from .audio_processor import AudioProcessor
+from .audio_downloader import AudioDownloader
 from ._logger import Logger
 from .app_context import AppContext
 from .worker import Worker
+from .lark_event_listener import LarkEventListener
+from .task_executor import TaskExecutor
+from .weighted_fair_selector import WeightedFairSelector
+from .task_prefetcher import TaskPrefetcher
+from .stage_graph import StageGraph
+from .poll_scheduler import PollScheduler
+from .micro_batcher import MicroBatcher
 from ._constants import Constants
 from .text_preprocessor import TextPreprocessor
 from .text_processor import get_total_word_correct
\ No newline at end of file
@@ -0,0 +1,26 @@
+import os
+import sqlite3
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """
+        open a sqlite database tuned for a single writer process: WAL journal,
+        so readers never block the writer, and a busy timeout instead of
+        failing immediately when the database is locked.
+    """
+    if path != ":memory:":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(
+        path,
+        timeout=30,
+        isolation_level=None,
+        check_same_thread=False
+    )
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA busy_timeout=30000")
+    return connection
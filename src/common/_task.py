@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Any
 from datetime import datetime
 from uuid import uuid4
@@ -7,7 +7,7 @@ from uuid import uuid4
 class Task:
     payload: Dict[str, Any]
     type: str
-    uuid: str = uuid4()
+    uuid: str = field(default_factory=lambda: str(uuid4()))
     failed_at: datetime = None
     no_of_retries: int = 0
     
@@ -18,4 +18,4 @@ class Task:
         self.failed_at = None
     
     def update_failed_at(self):
-        self.failed_at = datetime.now()
\ No newline at end of file
+        self.failed_at = datetime.now()
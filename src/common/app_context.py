@@ -1,11 +1,13 @@
 import logging
 import os
 from src.lark import BitableManager, FileManager, LarkMessenger
-from src.common import LarkQueue, TaskQueue
+from src.common import LarkQueue, TaskQueue, AudioDownloader, RecordRegistry, \
+    RecordClaimer, CheckpointStore, ResultCache
 from src.services import TranscriptionService, VoiceAnalyzerService, \
     LlamaService, QuoteTranslationService, \
-    BubbleHTTPClientService, ScriptReadingService
+    BubbleHTTPClientService, ScriptReadingService, AudioScoringService
 from dataclasses import dataclass
+from typing import Optional
 from src.stores import Stores
 
 
@@ -18,6 +20,7 @@ class AppContext:
         lark_messenger: LarkMessenger,
         transcription_service: TranscriptionService,
         voice_analyzer_service: VoiceAnalyzerService,
+        audio_scoring_service: AudioScoringService,
         llama_service: LlamaService,
         lark_queue: LarkQueue,
         logger: logging.Logger,
@@ -26,6 +29,11 @@ class AppContext:
         quote_translation_service: QuoteTranslationService,
         bubble_http_client_service: BubbleHTTPClientService,
         script_reading_service: ScriptReadingService,
+        audio_downloader: AudioDownloader,
+        record_registry: RecordRegistry,
+        checkpoints: CheckpointStore,
+        result_cache: ResultCache,
+        record_claimer: Optional[RecordClaimer] = None,
         version: str = os.getenv('VERSION'),
         environment: str = os.getenv('ENV')
     ):
@@ -34,6 +42,7 @@ class AppContext:
         self.lark_messenger = lark_messenger
         self.transcription_service = transcription_service
         self.voice_analyzer_service = voice_analyzer_service
+        self.audio_scoring_service = audio_scoring_service
         self.llama_service = llama_service
         self.logger = logger
         self.lark_queue = lark_queue
@@ -42,5 +51,10 @@ class AppContext:
         self.bubble_http_client_service = bubble_http_client_service
         self.quote_translation_service = quote_translation_service
         self.stores = stores
+        self.audio_downloader = audio_downloader
+        self.record_registry = record_registry
+        self.checkpoints = checkpoints
+        self.result_cache = result_cache
+        self.record_claimer = record_claimer
         self.version = version
         self.environment = environment
@@ -0,0 +1,139 @@
+import hashlib
+import io
+import threading
+from typing import Dict, Literal, Optional, Tuple
+
+import librosa
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+AudioFormat = Literal["mp3", "wav", "flac", "ogg", "opus"]
+
+# soundfile format and subtype of every supported output format
+_SOUNDFILE_FORMATS: Dict[str, Tuple[str, Optional[str]]] = {
+    "mp3": ("MP3", None),
+    "wav": ("WAV", None),
+    "flac": ("FLAC", None),
+    "ogg": ("OGG", "VORBIS"),
+    "opus": ("OGG", "OPUS"),
+}
+
+# sample rates the opus codec supports
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+class AudioBuffer:
+    """
+        Decoded mono audio (float32 pcm in [-1, 1] plus its sample rate) that is
+        passed between the stages of an assessment so a recording is decoded
+        and encoded at most once.
+
+        Encoded bytes and resampled copies are computed on first use and cached.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples: np.ndarray = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sample_rate: int = sample_rate
+        self._encoded: Dict[str, bytes] = {}
+        self._resampled: Dict[int, "AudioBuffer"] = {}
+        self._content_hash: Optional[str] = None
+        # the upload and the transcription may ask for the encoding together
+        self._encode_lock = threading.Lock()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "AudioBuffer":
+        """decode an audio file held in memory, downmixing it to mono"""
+        try:
+            samples, sample_rate = sf.read(
+                io.BytesIO(data),
+                dtype="float32",
+                always_2d=True
+            )
+            return AudioBuffer(samples.mean(axis=1), sample_rate)
+        except (sf.LibsndfileError, RuntimeError):
+            # containers libsndfile can't read (e.g. m4a, webm) go through ffmpeg
+            return AudioBuffer.from_segment(AudioSegment.from_file(io.BytesIO(data)))
+
+    @staticmethod
+    def from_file(audio_path: str) -> "AudioBuffer":
+        """decode an audio file from disk, downmixing it to mono"""
+        with open(audio_path, "rb") as file:
+            return AudioBuffer.from_bytes(file.read())
+
+    @staticmethod
+    def from_segment(segment: AudioSegment) -> "AudioBuffer":
+        """convert a pydub segment into a mono float32 buffer"""
+        samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+        samples = samples.reshape(-1, segment.channels).mean(axis=1)
+        samples /= float(1 << (8 * segment.sample_width - 1))
+        return AudioBuffer(samples, segment.frame_rate)
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def nbytes(self) -> int:
+        """memory held by the pcm samples"""
+        return self.samples.nbytes
+
+    @property
+    def content_hash(self) -> str:
+        """sha256 of the pcm samples and sample rate, identical audio gets the same hash"""
+        if self._content_hash is None:
+            digest = hashlib.sha256(str(self.sample_rate).encode())
+            digest.update(self.samples.tobytes())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def resample(self, sample_rate: int) -> "AudioBuffer":
+        """copy of the audio at another sample rate, cached per rate"""
+        if sample_rate == self.sample_rate:
+            return self
+
+        if sample_rate not in self._resampled:
+            self._resampled[sample_rate] = AudioBuffer(
+                librosa.resample(
+                    self.samples,
+                    orig_sr=self.sample_rate,
+                    target_sr=sample_rate
+                ),
+                sample_rate
+            )
+        return self._resampled[sample_rate]
+
+    def to_segment(self) -> AudioSegment:
+        """16-bit pydub segment of the audio"""
+        pcm = (np.clip(self.samples, -1.0, 1.0) * 32767).astype(np.int16)
+        return AudioSegment(
+            data=pcm.tobytes(),
+            sample_width=2,
+            frame_rate=self.sample_rate,
+            channels=1
+        )
+
+    def encode(self, _format: AudioFormat = "mp3") -> bytes:
+        """encoded file contents, the audio is only encoded once per format"""
+        if _format == "opus" and self.sample_rate not in _OPUS_SAMPLE_RATES:
+            raise ValueError(f"opus can't encode {self.sample_rate} Hz audio, resample it first")
+
+        with self._encode_lock:
+            if _format not in self._encoded:
+                output = io.BytesIO()
+                container, subtype = _SOUNDFILE_FORMATS[_format]
+                sf.write(
+                    output,
+                    self.samples,
+                    self.sample_rate,
+                    format=container,
+                    subtype=subtype
+                )
+                self._encoded[_format] = output.getvalue()
+            return self._encoded[_format]
+
+    def save(self, audio_path: str, _format: AudioFormat = "mp3") -> str:
+        """write the encoded audio to disk"""
+        with open(audio_path, "wb") as file:
+            file.write(self.encode(_format))
+        return audio_path
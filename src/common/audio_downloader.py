@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import random
+from typing import Optional
+
+import aiohttp
+
+from src.exceptions import AudioDownloadError, InvalidAudioUrlError, \
+    AudioTooLargeError
+
+logger = logging.getLogger("audio_downloader")
+
+# statuses worth retrying, everything else >= 400 is treated as permanent
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class AudioDownloader:
+    """
+        Downloads applicant recordings into memory without blocking the event
+        loop. All downloads share one keep-alive connection pool, the body is
+        streamed in chunks and rejected once it grows past `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 50 * 1024 * 1024,
+        timeout: float = 60,
+        retries: int = 3,
+        backoff: float = 1.0,
+        chunk_size: int = 64 * 1024,
+        max_connections: int = 10
+    ):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # the session has to be created inside the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=30
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def download(self, url: str) -> bytes:
+        """download the file at `url`, retrying transient failures with exponential backoff"""
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._download_once(url)
+            except (InvalidAudioUrlError, AudioTooLargeError):
+                raise
+            except (AudioDownloadError, aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if attempt == self.retries:
+                    if isinstance(err, AudioDownloadError):
+                        raise
+                    raise AudioDownloadError(url, f"{type(err).__name__}: {err}") from err
+
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    "download failed (%s/%s), retrying in %.1fs: %s",
+                    attempt + 1,
+                    self.retries + 1,
+                    delay,
+                    err
+                )
+                await asyncio.sleep(delay)
+
+    async def _download_once(self, url: str) -> bytes:
+        try:
+            async with self._get_session().get(url) as response:
+                if response.status in RETRYABLE_STATUSES:
+                    raise AudioDownloadError(url, response.reason, response.status)
+                if response.status >= 400:
+                    raise InvalidAudioUrlError(url, response.reason, response.status)
+
+                if response.content_length and response.content_length > self.max_bytes:
+                    raise AudioTooLargeError(
+                        url,
+                        f"content length {response.content_length} exceeds {self.max_bytes} bytes"
+                    )
+
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    body.extend(chunk)
+                    if len(body) > self.max_bytes:
+                        raise AudioTooLargeError(
+                            url,
+                            f"body exceeds {self.max_bytes} bytes"
+                        )
+
+                return bytes(body)
+        except aiohttp.InvalidURL as err:
+            raise InvalidAudioUrlError(url, "Provided url is invalid.") from err
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
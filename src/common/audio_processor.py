@@ -3,8 +3,9 @@ import numpy as np
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
 from scipy.signal import find_peaks
-from typing import Literal
+from typing import List, Literal, Tuple
 import os
+from .audio_buffer import AudioBuffer
 
 class AudioProcessor:
     """audio processor class"""
@@ -33,6 +34,153 @@ class AudioProcessor:
         processed_audio.export(audio_path, format=_format)
         return processed_audio.duration_seconds
 
+    @staticmethod
+    def remove_silence_from_buffer(
+        audio: AudioBuffer,
+        silence_thresh=-50,
+        min_silence_len=500,
+        keep_silence=500
+    ) -> AudioBuffer:
+        """same as remove_silence_from_audio but in memory, nothing is decoded or written to disk"""
+        return AudioBuffer(
+            AudioProcessor.trim_silence(
+                audio.samples,
+                audio.sample_rate,
+                silence_thresh=silence_thresh,
+                min_silence_len=min_silence_len,
+                keep_silence=keep_silence
+            ),
+            audio.sample_rate
+        )
+
+    @staticmethod
+    def _millisecond_edges(total_ms: int, sample_rate: int) -> np.ndarray:
+        """
+        sample index where every millisecond starts, rounded the same way pydub
+        slices. the last edges can point past the end of the audio, pydub pads
+        those missing samples with silence.
+        """
+        return (np.arange(total_ms + 1) * (sample_rate / 1000.0)).astype(np.int64)
+
+    @staticmethod
+    def detect_nonsilent_ranges(
+        samples: np.ndarray,
+        sample_rate: int,
+        min_silence_len=500,
+        silence_thresh=-50
+    ) -> np.ndarray:
+        """
+        Vectorized version of pydub's detect_nonsilent (seek_step of 1 ms) on a
+        float32 pcm array. A window of `min_silence_len` ms starting at every
+        millisecond is silent when its 16-bit rms is at or below
+        `silence_thresh` dBFS. Returns a (n, 2) array of [start_ms, end_ms].
+        """
+        total_samples = len(samples)
+        total_ms = round(1000 * total_samples / sample_rate)
+
+        if total_ms < min_silence_len:
+            return np.array([[0, total_ms]], dtype=np.int64)
+
+        edges = AudioProcessor._millisecond_edges(total_ms, sample_rate)
+        sample_edges = np.minimum(edges, total_samples)
+
+        # energy of every millisecond, built block by block so only a few
+        # seconds of 64-bit squares are held in memory at a time
+        energy = np.empty(total_ms, dtype=np.int64)
+        block_ms = 10_000
+        for first in range(0, total_ms, block_ms):
+            last = min(first + block_ms, total_ms)
+            low, high = sample_edges[first], sample_edges[last]
+            # same 16-bit conversion pydub sees in AudioBuffer.to_segment
+            pcm = (np.clip(samples[low:high], -1.0, 1.0) * 32767).astype(np.int64)
+            cumulative = np.concatenate(([0], np.cumsum(pcm * pcm)))
+            energy[first:last] = np.diff(cumulative[sample_edges[first:last + 1] - low])
+
+        cumulative_energy = np.concatenate(([0], np.cumsum(energy)))
+        starts = np.arange(total_ms - min_silence_len + 1)
+        window_energy = cumulative_energy[starts + min_silence_len] - cumulative_energy[starts]
+        window_samples = edges[starts + min_silence_len] - edges[starts]
+
+        # audioop.rms truncates to an integer before pydub compares it
+        rms = np.floor(
+            np.sqrt(window_energy / np.maximum(window_samples, 1))
+        )
+        rms[window_samples == 0] = 0
+        threshold = (10 ** (silence_thresh / 20)) * 32768
+
+        silence_starts = np.flatnonzero(rms <= threshold)
+
+        if len(silence_starts) == 0:
+            return np.array([[0, total_ms]], dtype=np.int64)
+
+        # consecutive silent windows closer than min_silence_len form one range
+        breaks = np.flatnonzero(np.diff(silence_starts) > min_silence_len)
+        silent_starts = silence_starts[np.concatenate(([0], breaks + 1))]
+        silent_ends = silence_starts[np.concatenate((breaks, [len(silence_starts) - 1]))] + min_silence_len
+
+        if silent_starts[0] == 0 and silent_ends[0] == total_ms:
+            return np.empty((0, 2), dtype=np.int64)
+
+        nonsilent_starts = np.concatenate(([0], silent_ends))
+        nonsilent_ends = np.concatenate((silent_starts, [total_ms]))
+        ranges = np.stack([nonsilent_starts, nonsilent_ends], axis=1)
+
+        if silent_ends[-1] == total_ms:
+            ranges = ranges[:-1]
+        if len(ranges) and ranges[0, 0] == 0 and ranges[0, 1] == 0:
+            ranges = ranges[1:]
+
+        return ranges
+
+    @staticmethod
+    def trim_silence(
+        samples: np.ndarray,
+        sample_rate: int,
+        silence_thresh=-50,
+        min_silence_len=500,
+        keep_silence=500
+    ) -> np.ndarray:
+        """
+        numpy equivalent of joining the chunks of pydub's split_on_silence,
+        every non-silent range keeps `keep_silence` ms of padding and
+        overlapping paddings meet halfway
+        """
+        total_samples = len(samples)
+        total_ms = round(1000 * total_samples / sample_rate)
+
+        ranges = AudioProcessor.detect_nonsilent_ranges(
+            samples,
+            sample_rate,
+            min_silence_len=min_silence_len,
+            silence_thresh=silence_thresh
+        )
+
+        if len(ranges) == 0:
+            return np.empty(0, dtype=np.float32)
+
+        starts = ranges[:, 0] - keep_silence
+        ends = ranges[:, 1] + keep_silence
+
+        overlapping = starts[1:] < ends[:-1]
+        midpoints = (ends[:-1] + starts[1:]) // 2
+        ends[:-1] = np.where(overlapping, midpoints, ends[:-1])
+        starts[1:] = np.where(overlapping, midpoints, starts[1:])
+
+        starts = np.clip(starts, 0, total_ms)
+        ends = np.clip(ends, 0, total_ms)
+
+        edges = AudioProcessor._millisecond_edges(total_ms, sample_rate)
+
+        pieces = [samples[edges[start]:edges[end]] for start, end in zip(starts, ends)]
+
+        # pydub fills a slice that ends past the last sample with silence
+        missing = edges[ends[-1]] - total_samples
+        if missing > 0:
+            pieces.append(np.zeros(missing, dtype=samples.dtype))
+
+        # a single copy gathers every kept range
+        return np.concatenate(pieces)
+
     @staticmethod
     def determine_wpm_category(wpm):
         """determine the wpm category of the speaker"""
@@ -156,30 +304,8 @@ class AudioProcessor:
 
             # --- Load the full audio ---
             audio = AudioSegment.from_file(input_path)
-            total_ms = len(audio)
 
-            # --- Define durations ---
-            show_ms  = 15 * 1000   # 15 s showing phrase
-            ready_ms =  5 * 1000   # 5 s get ready
-            say_ms   = 15 * 1000   # 15 s saying phrase
-            cycle_ms = show_ms + ready_ms + say_ms
-
-            merged = AudioSegment.empty()
-            timestamps = []  # will hold (start_sec, end_sec) tuples
-
-            for i in range(cycles):
-                say_start_ms = i * cycle_ms + show_ms + ready_ms
-                if say_start_ms >= total_ms:
-                    print(f"⏭️ Cycle {i+1} SAY start beyond audio length, stopping.")
-                    break
-
-                say_end_ms = min(say_start_ms + say_ms, total_ms)
-                merged += audio[say_start_ms:say_end_ms]
-
-                start_sec = say_start_ms / 1000
-                end_sec   = say_end_ms   / 1000
-                timestamps.append((start_sec, end_sec))
-                print(f"  ➕ Appended cycle {i+1} SAY: {start_sec:.1f}s–{end_sec:.1f}s")
+            merged, timestamps = AudioProcessor.merge_say_phrases(audio, cycles)
 
             # --- Overwrite the original file ---
             # Export in the same format as input
@@ -194,4 +320,101 @@ class AudioProcessor:
         except ValueError as e:
             print(f"❌ Value error: {e}")
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
\ No newline at end of file
+            print(f"❌ Unexpected error: {e}")
+
+    @staticmethod
+    def merge_say_phrases(
+        audio: AudioSegment,
+        cycles: int = 10
+    ) -> Tuple[AudioSegment, List[Tuple[float, float]]]:
+        """
+        Keeps only the 'say‑phrase' (15 s) of each 15 s show + 5 s ready + 15 s say
+        cycle and returns the merged audio with the (start_sec, end_sec) of every
+        phrase that was kept.
+        """
+        total_ms = len(audio)
+
+        # --- Define durations ---
+        show_ms  = 15 * 1000   # 15 s showing phrase
+        ready_ms =  5 * 1000   # 5 s get ready
+        say_ms   = 15 * 1000   # 15 s saying phrase
+        cycle_ms = show_ms + ready_ms + say_ms
+
+        merged = AudioSegment.empty()
+        timestamps = []  # will hold (start_sec, end_sec) tuples
+
+        for i in range(cycles):
+            say_start_ms = i * cycle_ms + show_ms + ready_ms
+            if say_start_ms >= total_ms:
+                print(f"⏭️ Cycle {i+1} SAY start beyond audio length, stopping.")
+                break
+
+            say_end_ms = min(say_start_ms + say_ms, total_ms)
+            merged += audio[say_start_ms:say_end_ms]
+
+            start_sec = say_start_ms / 1000
+            end_sec   = say_end_ms   / 1000
+            timestamps.append((start_sec, end_sec))
+            print(f"  ➕ Appended cycle {i+1} SAY: {start_sec:.1f}s–{end_sec:.1f}s")
+
+        return merged, timestamps
+
+    @staticmethod
+    def say_phrase_ranges(
+        total_samples: int,
+        sample_rate: int,
+        cycles: int = 10
+    ) -> List[Tuple[int, int]]:
+        """
+        [start, end) sample indices of the 'say‑phrase' of every
+        15 s show + 5 s ready + 15 s say cycle, for up to `cycles` repeats
+        """
+        show_ms, ready_ms, say_ms = 15 * 1000, 5 * 1000, 15 * 1000
+        cycle_ms = show_ms + ready_ms + say_ms
+        total_ms = round(1000 * total_samples / sample_rate)
+
+        def to_sample(ms: int) -> int:
+            # rounded the same way pydub slices milliseconds
+            return min(int(ms * (sample_rate / 1000.0)), total_samples)
+
+        ranges = []
+        for i in range(cycles):
+            say_start_ms = i * cycle_ms + show_ms + ready_ms
+            if say_start_ms >= total_ms:
+                break
+            say_end_ms = min(say_start_ms + say_ms, total_ms)
+            ranges.append((to_sample(say_start_ms), to_sample(say_end_ms)))
+
+        return ranges
+
+    @staticmethod
+    def cut_say_phrases_from_buffer(
+        audio: AudioBuffer,
+        cycles: int = 10
+    ) -> AudioBuffer:
+        """
+        same as cut_and_merge_say_phrases but on the pcm array, the phrases
+        are gathered with a single copy and nothing touches the disk
+        """
+        ranges = AudioProcessor.say_phrase_ranges(
+            len(audio.samples),
+            audio.sample_rate,
+            cycles
+        )
+        print(
+            "Merged SAY‑phrase timestamps (sec):",
+            [(start / audio.sample_rate, end / audio.sample_rate) for start, end in ranges]
+        )
+
+        if len(ranges) == 0:
+            return AudioBuffer(audio.samples[:0], audio.sample_rate)
+
+        if len(ranges) == 1:
+            # a single phrase is returned as a view, no copy at all
+            start, end = ranges[0]
+            return AudioBuffer(audio.samples[start:end], audio.sample_rate)
+
+        return AudioBuffer(
+            np.concatenate([audio.samples[start:end] for start, end in ranges]),
+            audio.sample_rate
+        )
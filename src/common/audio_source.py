@@ -0,0 +1,58 @@
+import asyncio
+import os
+from typing import Tuple, Union
+
+import aiofiles
+
+from .audio_buffer import AudioBuffer, AudioFormat
+
+# what a transcriber accepts: a file path, encoded file contents, or decoded
+# audio that gets encoded (once, the encoding is cached on the buffer)
+AudioSource = Union[str, bytes, memoryview, AudioBuffer]
+
+
+async def read_audio(audio: AudioSource, _format: AudioFormat = "mp3") -> Tuple[str, bytes]:
+    """
+        file name and encoded contents of an audio source, without blocking
+        the event loop. files are read with aiofiles and closed right away.
+    """
+    if isinstance(audio, AudioBuffer):
+        data = await asyncio.to_thread(audio.encode, _format)
+        return f"audio.{_sniff_extension(data, _format)}", data
+
+    if isinstance(audio, memoryview):
+        # http clients want bytes or a file, not a buffer view
+        audio = audio.tobytes()
+
+    if isinstance(audio, bytes):
+        return f"audio.{_sniff_extension(audio, _format)}", audio
+
+    async with aiofiles.open(audio, "rb") as file:
+        return os.path.basename(audio), await file.read()
+
+
+def encode_for_transcription(
+    audio: AudioBuffer,
+    _format: AudioFormat = "opus",
+    sample_rate: int = 16000
+) -> bytes:
+    """
+        compact encoding of the audio for a speech to text provider: speech
+        models work on 16 kHz mono anyway, so the extra bandwidth of the
+        original recording is only upload size. opus by default, the
+        smallest; flac is lossless but larger than the original mp3.
+        blocking, run it in a thread
+    """
+    return audio.resample(sample_rate).encode(_format)
+
+
+def _sniff_extension(data: bytes, default: str) -> str:
+    # providers guess the codec from the file name, name it after the contents
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:4] == b"RIFF":
+        return "wav"
+    return default
+
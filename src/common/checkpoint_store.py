@@ -0,0 +1,90 @@
+import logging
+import pickle
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ._sqlite import connect_sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    value BLOB NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (key, stage)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_saved_at ON checkpoints (saved_at);
+"""
+
+
+class CheckpointStore:
+    """
+        Durable results of the finished stages of an assessment, keyed by
+        e.g. the lark record id, so a worker restarted mid-assessment resumes
+        from the last completed stage instead of paying for the upload,
+        transcription or evaluation again.
+
+        Values are pickled. A checkpoint that can't be loaded anymore (e.g.
+        the result class changed with a deploy) is treated as missing.
+        Checkpoints older than `max_age` seconds are dropped by `prune`.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_age: float = 24 * 60 * 60,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.logger = logger or logging.getLogger("checkpoint_store")
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.executescript(_SCHEMA)
+
+    def save(self, key: str, stage: str, value: Any) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, stage, value, saved_at) VALUES (?, ?, ?, ?)",
+                (key, stage, pickle.dumps(value), time.time())
+            )
+
+    def load(self, key: str) -> Dict[str, Any]:
+        """results of the checkpointed stages of `key`, keyed by stage name"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT stage, value FROM checkpoints WHERE key = ? AND saved_at >= ?",
+                (key, time.time() - self.max_age)
+            ).fetchall()
+
+        results = {}
+        for row in rows:
+            try:
+                results[row["stage"]] = pickle.loads(row["value"])
+            except Exception as err:
+                self.logger.warning(
+                    "ignoring unreadable checkpoint %s/%s: %s",
+                    key,
+                    row["stage"],
+                    err
+                )
+        return results
+
+    def clear(self, key: str) -> None:
+        """forget the checkpoints of a finished assessment"""
+        with self._lock:
+            self._connection.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def prune(self) -> int:
+        """drop the checkpoints past `max_age`, returns how many were dropped"""
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM checkpoints WHERE saved_at < ?",
+                (time.time() - self.max_age,)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from typing import List, Optional, Set
+
+import lark_oapi as lark
+from aiohttp import web
+from lark_oapi.core.const import LARK_REQUEST_NONCE, LARK_REQUEST_SIGNATURE, \
+    LARK_REQUEST_TIMESTAMP
+
+from src.common import AppContext
+from .poll_scheduler import PollScheduler
+from .worker import Worker
+
+# bitable record change event, delivered once the app subscribed to the base
+RECORD_CHANGED_EVENT = "drive.file.bitable_record_changed_v1"
+
+# deleted records have nothing left to evaluate
+_HANDLED_ACTIONS = {"record_added", "record_edited"}
+
+
+class LarkEventListener:
+    """
+        Small HTTP endpoint receiving lark bitable record change events.
+
+        The events are verified (verification token, signature and
+        decryption) by the lark event dispatcher, both secrets are required
+        since empty ones would let anyone forge events. The changed records of the
+        watched table are fetched, the pending ones are pushed straight into
+        the task queue and the poll scheduler is woken up, so a submission is
+        picked up without waiting for the next poll. Polling keeps running as
+        reconciliation for missed events.
+    """
+
+    def __init__(
+        self,
+        ctx: AppContext,
+        worker: Worker,
+        table_id: str,
+        encrypt_key: str,
+        verification_token: str,
+        scheduler: Optional[PollScheduler] = None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        path: str = "/lark/events",
+        logger: Optional[logging.Logger] = None
+    ):
+        if not encrypt_key or not verification_token:
+            raise ValueError(
+                "the lark event encrypt key and verification token are required "
+                "(LARK_EVENT_ENCRYPT_KEY, LARK_EVENT_VERIFICATION_TOKEN)"
+            )
+
+        self._ctx = ctx
+        self.worker = worker
+        self.table_id = table_id
+        self.scheduler = scheduler
+        self.host = host
+        self.port = port
+        self.path = path
+        self.logger = logger or logging.getLogger("lark_event_listener")
+        self._dispatcher = lark.EventDispatcherHandler.builder(
+            encrypt_key,
+            verification_token
+        ).register_p2_customized_event(
+            RECORD_CHANGED_EVENT,
+            self._on_record_changed
+        ).build()
+        self._changed_record_ids: Set[str] = set()
+        self._ingesting: Set[asyncio.Task] = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    def application(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self._handle)
+        return app
+
+    async def start(self) -> None:
+        """subscribe to the base events and start serving the endpoint"""
+        await self._ctx.base_manager.subscribe_events_async()
+
+        self._runner = web.AppRunner(self.application())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+        self.logger.info(
+            "listening for lark events on %s:%s%s",
+            self.host,
+            self.port,
+            self.path
+        )
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+        if self._ingesting:
+            await asyncio.gather(*self._ingesting, return_exceptions=True)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        raw_request = lark.RawRequest()
+        raw_request.uri = request.path
+        raw_request.headers = dict(request.headers)
+        # the dispatcher looks the signature headers up case-sensitively
+        for name in (LARK_REQUEST_TIMESTAMP, LARK_REQUEST_NONCE, LARK_REQUEST_SIGNATURE):
+            if name in request.headers:
+                raw_request.headers[name] = request.headers[name]
+        raw_request.body = await request.read()
+
+        # verifies and decodes the event, then calls `_on_record_changed`
+        raw_response = self._dispatcher.do(raw_request)
+
+        if self._changed_record_ids:
+            record_ids = list(self._changed_record_ids)
+            self._changed_record_ids.clear()
+
+            # lark expects an answer within 3 seconds, ingest in the background
+            ingesting = asyncio.create_task(self.ingest(record_ids))
+            self._ingesting.add(ingesting)
+            ingesting.add_done_callback(self._ingesting.discard)
+
+        return web.Response(
+            status=raw_response.status_code,
+            body=raw_response.content,
+            headers=raw_response.headers
+        )
+
+    def _on_record_changed(self, data: lark.CustomizedEvent) -> None:
+        event = data.event or {}
+
+        if event.get("table_id") != self.table_id:
+            return
+
+        for action in event.get("action_list") or []:
+            if action.get("action") in _HANDLED_ACTIONS and action.get("record_id"):
+                self._changed_record_ids.add(action["record_id"])
+
+    async def ingest(self, record_ids: List[str]) -> int:
+        """queue the pending records among `record_ids`, returns the number of new tasks"""
+        try:
+            records = await self._ctx.lark_queue.get_items_by_ids(
+                self.worker.server_tasks,
+                record_ids
+            )
+            queued = self.worker.enqueue_records(records)
+        except Exception as err:
+            # polling picks the records up anyway
+            self.logger.error("failed to ingest lark event: %s", err)
+            return 0
+
+        if queued and self.scheduler is not None:
+            self.scheduler.wake()
+
+        return queued
@@ -1,20 +1,144 @@
+import asyncio
+import time
 from src.lark import BitableManager
 from lark_oapi.api.bitable.v1 import AppTableRecord
-from typing import List
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
 
 @dataclass
 class LarkQueue:
+    """
+        Pulls the unprocessed submissions of an assessment type from lark.
+
+        With a `cursor_field` (a numeric field that grows for new records,
+        e.g. an auto number or a created/modified time) only the records at or
+        past the highest cursor value seen so far are fetched. The whole
+        filtered view is still rescanned every `full_sync_interval` seconds to
+        pick up records that changed behind the high-water mark, e.g. retries.
+    """
     base_manager: BitableManager
     bitable_table_id: str
     version: str
     environment: str
+    cursor_field: Optional[str] = None
+    full_sync_interval: float = 5 * 60
+    _high_water_marks: Dict[str, float] = field(default_factory=dict)
+    _last_full_sync: Dict[str, float] = field(default_factory=dict)
 
-    async def get_items(self, server_task: str) -> List[AppTableRecord]:
+    def _scope_query(self, server_task: str) -> str:
+        return f"AND(AND(CurrentValue.[version] = \"{self.version}\", CurrentValue.[environment] = \"{self.environment.upper()}\"), CurrentValue.[assessment_type] = \"{server_task}\")"
+
+    def _query(self, server_task: str) -> str:
         # query = f"AND(AND(AND(OR(CurrentValue.[status] = \"\", CurrentValue.[status] = \"failed\"), CurrentValue.[no_of_retries] <= 3), CurrentValue.[version] = \"{self.version}\"), CurrentValue.[environment] = \"{self.environment.upper()}\")"
-        query = f"AND(AND(AND(CurrentValue.[version] = \"{self.version}\", CurrentValue.[environment] = \"{self.environment.upper()}\"), AND(CurrentValue.[status] = \"\", CurrentValue.[no_of_retries] <= 3)), CurrentValue.[assessment_type] = \"{server_task}\")"
+        return f"AND(AND(AND(CurrentValue.[version] = \"{self.version}\", CurrentValue.[environment] = \"{self.environment.upper()}\"), AND(CurrentValue.[status] = \"\", CurrentValue.[no_of_retries] <= 3)), CurrentValue.[assessment_type] = \"{server_task}\")"
+
+    async def get_items(self, server_task: str) -> List[AppTableRecord]:
+        query = self._query(server_task)
+
+        if self.cursor_field is None:
+            return await self.base_manager.async_get_records(
+                table_id=self.bitable_table_id,
+                filter=query
+            )
+
+        high_water_mark = self._high_water_marks.get(server_task)
+        now = time.monotonic()
+        full_sync = high_water_mark is None \
+            or now - self._last_full_sync.get(server_task, 0) >= self.full_sync_interval
+
+        if full_sync:
+            # read the newest cursor before listing, anything created while
+            # listing is then picked up by the next incremental sync
+            high_water_mark = await self._latest_cursor(server_task)
+            self._last_full_sync[server_task] = now
+        else:
+            query = f"AND({query}, CurrentValue.[{self.cursor_field}] >= {self._format(high_water_mark)})"
+
         records = await self.base_manager.async_get_records(
             table_id=self.bitable_table_id,
             filter=query
         )
+
+        cursors = [
+            cursor for cursor in map(self._cursor, records)
+            if cursor is not None
+        ]
+        if high_water_mark is not None or cursors:
+            self._high_water_marks[server_task] = max(
+                cursors + ([high_water_mark] if high_water_mark is not None else [])
+            )
+
         return records
+
+    async def get_items_by_ids(self, server_tasks: List[str], record_ids: List[str]) -> List[AppTableRecord]:
+        """fetch the given records, keeping only the ones `get_items` would return"""
+        responses = await asyncio.gather(*[
+            self.base_manager.find_record(
+                table_id=self.bitable_table_id,
+                record_id=record_id
+            )
+            for record_id in record_ids
+        ], return_exceptions=True)
+        # records deleted in the meantime fail to load and are skipped
+        return [
+            response.data.record
+            for response in responses
+            if not isinstance(response, Exception)
+            and self._is_pending(response.data.record, server_tasks)
+        ]
+
+    def _is_pending(self, record: AppTableRecord, server_tasks: List[str]) -> bool:
+        """python counterpart of the `_query` filter formula"""
+        fields = record.fields or {}
+        try:
+            no_of_retries = float(fields.get("no_of_retries") or 0)
+        except (TypeError, ValueError):
+            return False
+
+        return self._text(fields.get("version")) == self.version \
+            and self._text(fields.get("environment")) == self.environment.upper() \
+            and self._text(fields.get("assessment_type")) in server_tasks \
+            and self._text(fields.get("status")) == "" \
+            and no_of_retries <= 3
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        # text fields are either plain strings or lists of rich text segments
+        if value is None:
+            return ""
+        if isinstance(value, list):
+            return "".join(
+                segment.get("text", "") if isinstance(segment, dict) else str(segment)
+                for segment in value
+            )
+        return str(value)
+
+    async def _latest_cursor(self, server_task: str) -> Optional[float]:
+        """highest cursor value in the table for the assessment type"""
+        async for items in self.base_manager.iter_records(
+            table_id=self.bitable_table_id,
+            filter=self._scope_query(server_task),
+            page_size=1,
+            sort=[f"{self.cursor_field} DESC"]
+        ):
+            return self._cursor(items[0])
+        return None
+
+    def _cursor(self, record: AppTableRecord) -> Optional[float]:
+        value: Any = record.fields.get(self.cursor_field)
+
+        # formula and lookup fields come back wrapped, e.g. {"type": 2, "value": [12]}
+        if isinstance(value, dict):
+            value = value.get("value")
+        if isinstance(value, list):
+            value = value[0] if value else None
+
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _format(value: float) -> str:
+        # large timestamps must not be written in scientific notation
+        return str(int(value)) if float(value).is_integer() else repr(value)
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+        Groups items submitted by concurrent callers into batches.
+
+        A batch is dispatched as soon as one of the `max_concurrency` slots is
+        free, so an item never waits when the batcher is idle. While every slot
+        is busy, new items accumulate and leave together (up to
+        `max_batch_size`) once a slot frees up.
+
+        `process_batch` returns one result per item, in order. Returning an
+        exception instance fails only the caller of that item.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 8,
+        max_concurrency: int = 1
+    ):
+        self._process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """queue the item and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self) -> None:
+        while self._pending and len(self._running) < self.max_concurrency:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+
+            running = asyncio.create_task(self._run(batch))
+            self._running.add(running)
+            running.add_done_callback(self._on_batch_done)
+
+    def _on_batch_done(self, running: asyncio.Task) -> None:
+        self._running.discard(running)
+        self._dispatch()
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        try:
+            results = await self._process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"batch returned {len(results)} results for {len(batch)} items"
+                )
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as err:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
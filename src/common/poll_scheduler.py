@@ -0,0 +1,60 @@
+import asyncio
+import random
+
+
+class PollScheduler:
+    """
+        Decides how long the worker waits between lark syncs.
+
+        Every idle poll (a sync that found nothing new) doubles the wait, from
+        `min_interval` up to `max_interval`, with +/- `jitter` randomization so
+        several workers don't poll in lockstep. Finding work resets the wait.
+
+        `wake` ends the current wait immediately, for external triggers such
+        as a webhook or a signal.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.1
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._idle_polls = 0
+        self._wake = asyncio.Event()
+
+    def reset(self) -> None:
+        """work was found, poll at the fastest rate again"""
+        self._idle_polls = 0
+
+    def next_delay(self) -> float:
+        """delay before the next poll, backing off with every idle poll"""
+        delay = min(
+            self.max_interval,
+            self.min_interval * self.multiplier ** self._idle_polls
+        )
+        if delay < self.max_interval:
+            self._idle_polls += 1
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def wake(self) -> None:
+        """cut the current wait short and sync right away"""
+        self._wake.set()
+
+    async def wait(self) -> bool:
+        """wait until the next poll is due, returns True when woken up early"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.next_delay())
+            woken = True
+        except asyncio.TimeoutError:
+            woken = False
+
+        self._wake.clear()
+        if woken:
+            self.reset()
+        return woken
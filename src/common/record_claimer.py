@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from src.stores import BubbleDataStore
+
+
+class RecordClaimer:
+    """
+        Coordinates several workers (possibly on different machines) pulling
+        from the same bubble table, so each record is evaluated by one of
+        them only.
+
+        A worker claims a record before evaluating it by writing its
+        `worker_id` and a lease expiry on the record, keeps the lease alive
+        while the evaluation runs and clears it once done. A record whose
+        lease expired, e.g. because its worker crashed, can be claimed again
+        by anyone.
+
+        The table needs a text field `worker_id` and a number field
+        `lease_expires_at` (ms epoch), `check_fields` fails when it doesn't:
+        every claim would fail and the records would never be evaluated.
+    """
+
+    def __init__(
+        self,
+        store: BubbleDataStore,
+        worker_id: str,
+        lease_duration: float = 10 * 60,
+        confirm_delay: float = 2.0,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.store = store
+        self.worker_id = worker_id
+        self.lease_duration = lease_duration
+        self.confirm_delay = confirm_delay
+        self.logger = logger or logging.getLogger("record_claimer")
+
+    async def check_fields(self) -> None:
+        """raise when the table lacks the fields the claims are written to"""
+        missing = await self.store.missing_claim_fields()
+        if missing:
+            raise RuntimeError(
+                f"record claims are enabled but the bubble table has no {', '.join(missing)} "
+                "field, add them or set RECORD_CLAIMS_ENABLED=false"
+            )
+
+    def held_elsewhere(self, fields: Optional[dict]) -> bool:
+        """check if the listed record is leased by another worker"""
+        owner, lease_expires_at = BubbleDataStore.parse_claim(fields)
+        return bool(owner) \
+            and owner != self.worker_id \
+            and lease_expires_at > time.time() * 1000
+
+    async def claim(self, record_id: Optional[str]) -> bool:
+        """try to claim the record, returns False when another worker holds it"""
+        if record_id is None:
+            return True
+
+        try:
+            return await self.store.claim(
+                record_id,
+                self.worker_id,
+                self.lease_duration,
+                self.confirm_delay
+            )
+        except Exception as err:
+            # without a confirmed claim the record is left to the next sync
+            self.logger.error("failed to claim %s: %s", record_id, err)
+            return False
+
+    async def keep_alive(self, record_id: Optional[str]) -> None:
+        """renew the lease of the record until cancelled"""
+        if record_id is None:
+            return
+
+        while True:
+            await asyncio.sleep(self.lease_duration / 3)
+            try:
+                if not await self.store.renew(record_id, self.worker_id, self.lease_duration):
+                    self.logger.warning("lost the claim on %s", record_id)
+                    return
+            except Exception as err:
+                # try again on the next round, the lease is still running
+                self.logger.error("failed to renew the claim on %s: %s", record_id, err)
+
+    async def release(self, record_id: Optional[str]) -> None:
+        if record_id is None:
+            return
+
+        try:
+            await self.store.release(record_id, self.worker_id)
+        except Exception as err:
+            # the lease expires on its own
+            self.logger.error("failed to release %s: %s", record_id, err)
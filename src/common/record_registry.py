@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Literal, Optional
+
+RecordState = Literal["in_flight", "completed"]
+
+
+@dataclass
+class _Entry:
+    state: RecordState
+    retries: Any
+    expires_at: float
+
+
+class RecordRegistry:
+    """
+        In-process memory of the lark records this worker is processing or
+        recently finished, keyed by `record_id`.
+
+        Lark only flips the status of a record at the end of an assessment,
+        so a sync can return a record that is still being evaluated or whose
+        status write hasn't landed yet. Those records are recognised here and
+        skipped instead of being evaluated twice.
+
+        A completed record is only remembered with the `no_of_retries` it had,
+        the same record coming back with a higher retry count is a genuine
+        retry and is let through. Entries expire after `ttl` seconds and the
+        oldest ones are dropped past `max_size` entries.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 15 * 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark_in_flight(self, record_id: Optional[str], retries: Any = None) -> None:
+        self._set(record_id, "in_flight", retries)
+
+    def mark_completed(self, record_id: Optional[str], retries: Any = None) -> None:
+        self._set(record_id, "completed", retries)
+
+    def release(self, record_id: Optional[str]) -> None:
+        """forget the record, e.g. when its task goes back to the queue"""
+        with self._lock:
+            self._entries.pop(record_id, None)
+
+    def is_known(self, record_id: Optional[str], retries: Any = None) -> bool:
+        """check if the record is in flight or was completed with the same retry count"""
+        if record_id is None:
+            return False
+
+        with self._lock:
+            entry = self._entries.get(record_id)
+            if entry is None:
+                return False
+
+            if entry.expires_at < time.monotonic():
+                del self._entries[record_id]
+                return False
+
+            if entry.state == "in_flight":
+                return True
+
+            return retries is None or entry.retries is None or entry.retries == retries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _set(self, record_id: Optional[str], state: RecordState, retries: Any) -> None:
+        if record_id is None:
+            return
+
+        with self._lock:
+            self._entries.pop(record_id, None)
+            self._entries[record_id] = _Entry(
+                state=state,
+                retries=retries,
+                expires_at=time.monotonic() + self.ttl
+            )
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ._sqlite import connect_sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at);
+"""
+
+
+class ResultCache:
+    """
+        Content addressed cache of expensive stage results (transcriptions,
+        voice analyzer scores, llm evaluations), backed by SQLite.
+
+        Keys are built with `key` from what determines the result, e.g. the
+        hash of the audio and the model, not from the lark record. A retry
+        of a failed assessment or the same recording submitted again then
+        gets the results of the stages that already succeeded for free.
+
+        Entries expire after `ttl` seconds and the least recently used ones
+        are evicted once the pickled values exceed `max_bytes`. Concurrent
+        lookups of the same missing key share a single computation.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        ttl: float = 7 * 24 * 60 * 60,
+        max_bytes: int = 256 * 1024 * 1024,
+        logger: Optional[logging.Logger] = None
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.logger = logger or logging.getLogger("result_cache")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.executescript(_SCHEMA)
+        self._computing: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """cache key of a stage result computed from `parts`"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode())
+            # separator, so ("ab", "c") and ("a", "bc") differ
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            now = time.time()
+            row = self._connection.execute(
+                "SELECT value FROM results WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return default
+
+            self._connection.execute(
+                "UPDATE results SET used_at = ? WHERE key = ?",
+                (now, key)
+            )
+
+        try:
+            return pickle.loads(row["value"])
+        except Exception as err:
+            # e.g. the result class changed with a deploy
+            self.logger.warning("ignoring unreadable cache entry %s: %s", key, err)
+            return default
+
+    def put(self, key: str, value: Any) -> None:
+        data = pickle.dumps(value)
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            now = time.time()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now)
+            )
+            self._evict(now)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """cached result of `key`, running `compute` and storing its result on a miss"""
+        _missing = object()
+        while True:
+            value = self.get(key, _missing)
+            if value is not _missing:
+                self.hits += 1
+                return value
+
+            if key not in self._computing:
+                break
+
+            # someone else is computing it, look again once they are done.
+            # when they failed it's this caller's turn to try
+            await asyncio.wait([self._computing[key]])
+
+        self.misses += 1
+        done = asyncio.get_running_loop().create_future()
+        self._computing[key] = done
+        try:
+            value = await compute()
+            self.put(key, value)
+            return value
+        finally:
+            del self._computing[key]
+            done.set_result(None)
+
+    def _evict(self, now: float) -> None:
+        self._connection.execute(
+            "DELETE FROM results WHERE created_at < ?",
+            (now - self.ttl,)
+        )
+        total = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # drop the least recently used entries until the cache fits again
+        rows = self._connection.execute(
+            "SELECT key, size FROM results ORDER BY used_at"
+        ).fetchall()
+        evicted = []
+        for row in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((row["key"],))
+            total -= row["size"]
+        self._connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
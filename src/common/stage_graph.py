@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Set, Tuple
+
+from .checkpoint_store import CheckpointStore
+
+
+@dataclass
+class _Stage:
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    depends_on: Tuple[str, ...]
+    checkpoint: bool = False
+
+
+class StageGraph:
+    """
+        Runs the stages of an assessment as a dependency graph. Every stage
+        starts as soon as the stages it depends on are done, so independent
+        stages (e.g. the upload and the transcription) overlap.
+
+        A stage receives the results of its dependencies as keyword
+        arguments named after them. When a stage fails the remaining stages
+        are cancelled and the error is raised from `run`.
+
+        With `checkpoints`, the result of every stage added with
+        `checkpoint=True` is saved under `key` once it completes, and a later
+        run with the same key (e.g. after a restart) reuses it instead of
+        running the stage again. Stages only feeding restored stages are
+        skipped as well, their result is None.
+    """
+
+    def __init__(
+        self,
+        name: str = "stages",
+        logger: Optional[logging.Logger] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        key: Optional[str] = None
+    ):
+        self.name = name
+        self.logger = logger or logging.getLogger("stage_graph")
+        self.checkpoints = checkpoints if key is not None else None
+        self.key = key
+        self.timings: Dict[str, float] = {}
+        self._stages: Dict[str, _Stage] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        depends_on: Sequence[str] = (),
+        checkpoint: bool = False
+    ) -> "StageGraph":
+        """
+            register a stage, its dependencies have to be added first.
+            `checkpoint` saves its result so it survives a restart, the
+            result has to be picklable.
+        """
+        if name in self._stages:
+            raise ValueError(f"stage {name} is already registered")
+
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"stage {name} depends on unknown stage {dependency}")
+
+        self._stages[name] = _Stage(name, fn, tuple(depends_on), checkpoint)
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """run every stage and return their results keyed by stage name"""
+        if not self._stages:
+            return {}
+
+        running: Dict[str, asyncio.Task] = {}
+        restored = self._restore()
+        skipped = self._skippable(restored)
+
+        async def run_stage(stage: _Stage) -> Any:
+            if stage.name in restored:
+                return restored[stage.name]
+            if stage.name in skipped:
+                return None
+
+            dependencies = {
+                dependency: await running[dependency]
+                for dependency in stage.depends_on
+            }
+            start = time.perf_counter()
+            try:
+                result = await stage.fn(**dependencies)
+            finally:
+                self.timings[stage.name] = time.perf_counter() - start
+
+            if stage.checkpoint and self.checkpoints is not None:
+                self.checkpoints.save(self.key, stage.name, result)
+            return result
+
+        for stage in self._stages.values():
+            running[stage.name] = asyncio.create_task(run_stage(stage))
+
+        try:
+            done, pending = await asyncio.wait(
+                running.values(),
+                return_when=asyncio.FIRST_EXCEPTION
+            )
+        except asyncio.CancelledError:
+            await self._cancel(running.values())
+            raise
+
+        if pending:
+            await self._cancel(pending)
+
+        self.log_timings()
+
+        # stages are registered after their dependencies, so the first
+        # failure in registration order is the root cause
+        for stage_task in running.values():
+            if not stage_task.cancelled() and stage_task.exception() is not None:
+                raise stage_task.exception()
+
+        return {name: stage_task.result() for name, stage_task in running.items()}
+
+    def _restore(self) -> Dict[str, Any]:
+        if self.checkpoints is None:
+            return {}
+
+        restored = {
+            name: result
+            for name, result in self.checkpoints.load(self.key).items()
+            if name in self._stages and self._stages[name].checkpoint
+        }
+        if restored:
+            self.logger.info(
+                "%s resuming, restored stages: %s",
+                self.name,
+                ", ".join(restored)
+            )
+        return restored
+
+    def _skippable(self, restored: Dict[str, Any]) -> Set[str]:
+        """stages whose every dependent is restored or skipped"""
+        skipped: Set[str] = set()
+        # dependents are registered after their dependencies
+        for stage in reversed(list(self._stages.values())):
+            if stage.name in restored:
+                continue
+            dependents = [
+                other.name for other in self._stages.values()
+                if stage.name in other.depends_on
+            ]
+            if dependents and all(
+                dependent in restored or dependent in skipped
+                for dependent in dependents
+            ):
+                skipped.add(stage.name)
+        return skipped
+
+    def log_timings(self) -> None:
+        self.logger.info(
+            "%s timings: %s",
+            self.name,
+            ", ".join(
+                f"{name}={seconds:.2f}s"
+                for name, seconds in self.timings.items()
+            )
+        )
+
+    @staticmethod
+    async def _cancel(stage_tasks) -> None:
+        for stage_task in stage_tasks:
+            stage_task.cancel()
+        await asyncio.gather(*stage_tasks, return_exceptions=True)
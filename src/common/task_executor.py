@@ -0,0 +1,229 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Set, Union
+
+from src.interfaces import CallbackHandler
+from .audio_buffer import AudioBuffer
+from .record_claimer import RecordClaimer
+from .record_registry import RecordRegistry
+from .task_queue import TaskQueue
+from ._task import Task
+
+
+class TaskExecutor:
+    """
+        Runs assessment handlers concurrently with a bounded number of
+        in-flight tasks per assessment type.
+
+        `submit` waits for a free slot before scheduling the handler, so the
+        caller stops pulling work from the queue while the pool is full.
+
+        When a `task_queue` is given, a task is acked once its handler
+        returns, nacked when the handler crashes and released when it is
+        cancelled, so it is picked up again. Its lease is renewed while the
+        handler runs, so a handler running past the queue's
+        `visibility_timeout` isn't handed out a second time. The `registry` is told which records are in flight
+        and which were completed.
+
+        With a `claimer`, the lark record of a task is claimed before its
+        handler runs and released afterwards. Tasks whose record is claimed
+        by another worker are dropped.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, CallbackHandler],
+        concurrency: Union[int, Dict[str, int]] = 1,
+        logger: Optional[logging.Logger] = None,
+        task_queue: Optional[TaskQueue] = None,
+        registry: Optional[RecordRegistry] = None,
+        claimer: Optional[RecordClaimer] = None
+    ):
+        self.handlers = handlers
+        self.task_queue = task_queue
+        self.registry = registry
+        self.claimer = claimer
+        self.logger = logger or logging.getLogger("task_executor")
+
+        if isinstance(concurrency, int):
+            concurrency = {
+                assessment_type: concurrency
+                for assessment_type in handlers.keys()
+            }
+
+        self.limits: Dict[str, int] = {
+            assessment_type: max(1, concurrency.get(assessment_type, 1))
+            for assessment_type in handlers.keys()
+        }
+        self._semaphores: Dict[str, asyncio.Semaphore] = {
+            assessment_type: asyncio.Semaphore(limit)
+            for assessment_type, limit in self.limits.items()
+        }
+        self._in_flight: Set[asyncio.Task] = set()
+        self._running_records: Set[str] = set()
+        self._slot_freed = asyncio.Event()
+        self._accepting = True
+
+    def supports(self, assessment_type: str) -> bool:
+        """check if there is a handler registered for the assessment type"""
+        return assessment_type in self.handlers
+
+    def in_flight(self) -> int:
+        """number of handlers currently running"""
+        return len(self._in_flight)
+
+    def is_running(self, record_id: Optional[str]) -> bool:
+        """check if a task for the given lark record is still being processed"""
+        return record_id is not None and record_id in self._running_records
+
+    def has_capacity(self, assessment_type: str) -> bool:
+        """check if a task of the assessment type can start without waiting"""
+        return not self._semaphores[assessment_type].locked()
+
+    async def wait_for_slot(self) -> None:
+        """wait until any running handler finishes and frees its slot"""
+        self._slot_freed.clear()
+        await self._slot_freed.wait()
+
+    def wake(self) -> None:
+        """end a pending `wait_for_slot` early, e.g. to shut down"""
+        self._slot_freed.set()
+
+    async def submit(self, task: Task, audio: Optional[AudioBuffer] = None) -> None:
+        """
+            wait for a free slot then run the task handler in the background.
+            `audio` is the already downloaded recording of the task, if any.
+        """
+        if not self._accepting:
+            raise RuntimeError("TaskExecutor is draining, no new tasks accepted")
+
+        semaphore = self._semaphores[task.type]
+        await semaphore.acquire()
+
+        record_id = task.payload.get("record_id")
+        if record_id is not None:
+            self._running_records.add(record_id)
+        if self.registry is not None:
+            self.registry.mark_in_flight(record_id, task.payload.get("no_of_retries"))
+
+        running = asyncio.create_task(self._run(task, semaphore, audio))
+        self._in_flight.add(running)
+        running.add_done_callback(self._in_flight.discard)
+
+    async def _run(
+        self,
+        task: Task,
+        semaphore: asyncio.Semaphore,
+        audio: Optional[AudioBuffer] = None
+    ) -> None:
+        record_id = task.payload.get("record_id")
+        claimed = False
+        keep_alive: Optional[asyncio.Task] = None
+        renew_lease: Optional[asyncio.Task] = None
+
+        try:
+            if self.task_queue is not None:
+                renew_lease = asyncio.create_task(self._renew_lease(task))
+
+            if self.claimer is not None:
+                if not await self.claimer.claim(record_id):
+                    self.logger.info("skipping %s, claimed by another worker", record_id)
+                    self._drop(task)
+                    return
+
+                claimed = True
+                keep_alive = asyncio.create_task(self.claimer.keep_alive(record_id))
+
+            if audio is None:
+                await self.handlers[task.type].handle(task.payload)
+            else:
+                await self.handlers[task.type].handle(task.payload, audio=audio)
+            self._ack(task)
+        except asyncio.CancelledError:
+            self.logger.warning(
+                "task cancelled: type=%s, record_id=%s",
+                task.type,
+                record_id
+            )
+            # interrupted rather than failed, the attempt doesn't count
+            self._release(task)
+            raise
+        except Exception as err:
+            self.logger.error(
+                "unhandled error while processing task: type=%s, record_id=%s, error=%s",
+                task.type,
+                record_id,
+                err
+            )
+            self._nack(task)
+        finally:
+            if renew_lease is not None:
+                renew_lease.cancel()
+            if keep_alive is not None:
+                keep_alive.cancel()
+            if claimed:
+                await self.claimer.release(record_id)
+            self._running_records.discard(record_id)
+            semaphore.release()
+            self._slot_freed.set()
+
+    async def _renew_lease(self, task: Task) -> None:
+        """extend the queue lease of the task until cancelled"""
+        while True:
+            await asyncio.sleep(self.task_queue.visibility_timeout / 3)
+            try:
+                self.task_queue.extend_lease(task)
+            except Exception as err:
+                # try again on the next round, the lease is still running
+                self.logger.error("failed to extend the lease of %s: %s", task.uuid, err)
+
+    def _ack(self, task: Task) -> None:
+        if self.registry is not None:
+            self.registry.mark_completed(
+                task.payload.get("record_id"),
+                task.payload.get("no_of_retries")
+            )
+        if self.task_queue is not None:
+            self.task_queue.ack(task)
+
+    def _drop(self, task: Task) -> None:
+        # another worker owns the record, it is neither done nor failed here
+        if self.registry is not None:
+            self.registry.release(task.payload.get("record_id"))
+        if self.task_queue is not None:
+            self.task_queue.ack(task)
+
+    def _nack(self, task: Task, delay: Optional[float] = None) -> None:
+        if self.registry is not None:
+            self.registry.release(task.payload.get("record_id"))
+        if self.task_queue is not None:
+            self.task_queue.nack(task, delay=delay)
+
+    def _release(self, task: Task) -> None:
+        if self.registry is not None:
+            self.registry.release(task.payload.get("record_id"))
+        if self.task_queue is not None:
+            self.task_queue.release(task)
+
+    async def drain(self, timeout: Optional[float] = None) -> int:
+        """
+            stop accepting tasks and wait for in-flight handlers to finish,
+            cancelling whatever is still running after `timeout` seconds.
+            returns the number of cancelled tasks.
+        """
+        self._accepting = False
+
+        if not self._in_flight:
+            return 0
+
+        self.logger.info("draining %s in-flight task(s)...", len(self._in_flight))
+
+        _, pending = await asyncio.wait(set(self._in_flight), timeout=timeout)
+
+        for running in pending:
+            running.cancel()
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        return len(pending)
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, Sequence, Tuple
+
+from .audio_buffer import AudioBuffer
+from .task_queue import TaskQueue
+from ._task import Task
+
+
+class TaskPrefetcher:
+    """
+        Pulls the next tasks off the `TaskQueue` and downloads and decodes
+        their recordings in the background, so a task handed to the executor
+        already has its audio in memory.
+
+        At most `depth` tasks are held at a time, and no new prefetch starts
+        while the decoded audio waiting in the buffer takes `max_bytes` or
+        more. Tasks come out in the order they were queued, only tasks of
+        the assessment `types` are pulled when given.
+    """
+
+    def __init__(
+        self,
+        task_queue: TaskQueue,
+        fetch: Callable[[Task], Awaitable[AudioBuffer]],
+        depth: int = 2,
+        max_bytes: int = 256 * 1024 * 1024,
+        logger: Optional[logging.Logger] = None,
+        types: Optional[Sequence[str]] = None
+    ):
+        self.task_queue = task_queue
+        self.types = types
+        self.fetch = fetch
+        self.depth = max(1, depth)
+        self.max_bytes = max_bytes
+        self.logger = logger or logging.getLogger("task_prefetcher")
+        self._buffer: Deque[Tuple[Task, asyncio.Task]] = deque()
+
+    def pending(self) -> int:
+        """number of tasks taken off the queue and not handed out yet"""
+        return len(self._buffer)
+
+    def is_empty(self) -> bool:
+        return not self._buffer and self.task_queue.is_empty(self.types)
+
+    def buffered_bytes(self) -> int:
+        """memory held by the audio that finished prefetching"""
+        return sum(
+            fetching.result().nbytes
+            for _, fetching in self._buffer
+            if fetching.done()
+            and not fetching.cancelled()
+            and fetching.exception() is None
+        )
+
+    def fill(self) -> None:
+        """start prefetching queued tasks until the buffer is full"""
+        while (
+            len(self._buffer) < self.depth
+            and self.buffered_bytes() < self.max_bytes
+        ):
+            task = self.task_queue.pop(self.types)
+            if task is None:
+                break
+            self._buffer.append((task, asyncio.create_task(self.fetch(task))))
+
+    async def next(self) -> Optional[Tuple[Task, Optional[AudioBuffer]]]:
+        """
+            the oldest task with its decoded audio, or None when nothing is
+            queued. the audio is None when prefetching failed, the handler
+            then downloads it again and reports the error itself.
+        """
+        self.fill()
+
+        if not self._buffer:
+            return None
+
+        task, fetching = self._buffer.popleft()
+        try:
+            audio = await fetching
+        except Exception as err:
+            self.logger.warning(
+                "prefetch failed: type=%s, record_id=%s, error=%s",
+                task.type,
+                task.payload.get("record_id"),
+                err
+            )
+            audio = None
+
+        # the slot just freed up, keep the pipeline busy
+        self.fill()
+        return task, audio
+
+    async def close(self) -> None:
+        """cancel the prefetches that were not handed out and release their tasks"""
+        while self._buffer:
+            task, fetching = self._buffer.popleft()
+            fetching.cancel()
+            await asyncio.gather(fetching, return_exceptions=True)
+            # never ran, hand it out again as if it was never popped
+            self.task_queue.release(task)
@@ -1,33 +1,356 @@
-from dataclasses import dataclass, field
-from queue import Queue
-from typing import List, Dict, Any
+import json
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
+
+from ._sqlite import connect_sqlite
+from .record_registry import RecordRegistry
 from ._task import Task
-from datetime import datetime, timedelta
-# test
 
-@dataclass
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid TEXT NOT NULL UNIQUE,
+    dedup_key TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    failed_at REAL,
+    lease_expires_at REAL,
+    enqueued_at REAL NOT NULL,
+    rank REAL NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+# columns added after the first release, for queues created before them
+_MIGRATIONS = {
+    "rank": "ALTER TABLE tasks ADD COLUMN rank REAL NOT NULL DEFAULT 0",
+    "available_at": "ALTER TABLE tasks ADD COLUMN available_at REAL NOT NULL DEFAULT 0",
+}
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+CREATE INDEX IF NOT EXISTS tasks_rank ON tasks (status, rank, id);
+"""
+
+# a task can be handed out when it is queued and its retry delay is over, or
+# when the worker holding its lease stopped renewing it (crashed, killed
+# mid-task)
+_AVAILABLE = "((status = 'queued' AND available_at <= :now) OR (status = 'leased' AND lease_expires_at < :now))"
+
+
 class TaskQueue:
-    tasks: Queue = Queue()
+    """
+        Durable priority queue of assessment tasks backed by SQLite, so
+        queued and in-progress work survives a restart.
+
+        Tasks are handed out by rank, a virtual enqueue time: the time the
+        task was queued, pushed back by `retry_penalty` seconds per retry
+        and by the `type_priorities` offset (seconds) of its assessment
+        type. Fresh applicants go ahead of retries and of lower priority
+        types, but since the rank is a point in time a penalised task still
+        ages ahead of everything queued sufficiently later, nothing starves.
+
+        Retries are delayed with an exponential backoff, `retry_delay`
+        seconds doubled on every retry up to `max_retry_delay`, counted from
+        the `failed_at` time of a nacked task, or from the sync for a record
+        lark reports as retried.
+
+        `pop` leases a task instead of removing it: the task stays hidden
+        from other pops for `visibility_timeout` seconds and goes back to the
+        queue unless it is `ack`ed (done), `nack`ed (retry) or `release`d
+        (interrupted, the attempt doesn't count) before that.
+        A task that was handed out `max_attempts` times without an ack is
+        marked dead.
+
+        Tasks are de-duplicated by the lark `record_id` of their payload, a
+        record that is queued, leased or dead is not queued again. Acked
+        tasks are removed so the record can be queued again for a retry, a
+        dead task is replaced once lark reports more retries of its record
+        than when it died (someone bumped the retry).
+        `enqueue_many` also skips records the `registry` knows are being
+        processed or were just completed.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        visibility_timeout: float = 30 * 60,
+        max_attempts: int = 5,
+        registry: Optional[RecordRegistry] = None,
+        type_priorities: Optional[Dict[str, float]] = None,
+        retry_penalty: float = 5 * 60,
+        retry_delay: float = 0,
+        max_retry_delay: float = 15 * 60
+    ):
+        self.path = path
+        self.registry = registry
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.type_priorities = type_priorities or {}
+        self.retry_penalty = retry_penalty
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._lock = threading.Lock()
+        self._connection = connect_sqlite(path)
+        self._connection.executescript(_SCHEMA)
+        self._migrate()
+        self._connection.executescript(_INDEXES)
+
+    def _migrate(self) -> None:
+        columns = {
+            row["name"]
+            for row in self._connection.execute("PRAGMA table_info(tasks)").fetchall()
+        }
+        for column, statement in _MIGRATIONS.items():
+            if column not in columns:
+                self._connection.execute(statement)
+                if column == "rank":
+                    self._connection.execute("UPDATE tasks SET rank = enqueued_at")
+
+    @staticmethod
+    def lark_retries(task: Task) -> int:
+        """number of times lark already retried the record of the task"""
+        try:
+            return int(float(task.payload.get("no_of_retries") or 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def backoff(self, retries: int) -> float:
+        """seconds a task waits before its `retries`-th retry"""
+        if retries <= 0 or self.retry_delay <= 0:
+            return 0
+        return min(self.max_retry_delay, self.retry_delay * 2 ** (retries - 1))
+
+    def rank(self, task: Task, enqueued_at: float) -> float:
+        retries = self.lark_retries(task) + task.no_of_retries
+        return enqueued_at \
+            + self.type_priorities.get(task.type, 0) \
+            + self.retry_penalty * retries
+
+    @staticmethod
+    def dedup_key(task: Task) -> str:
+        """key identifying the same piece of work across syncs"""
+        record_id = task.payload.get("record_id")
+        return f"record:{record_id}" if record_id else f"task:{task.uuid}"
 
-    def push(self, task: Task) -> None:
-        self.tasks.put(task)
+    def push(self, task: Task) -> bool:
+        """queue the task, returns False when its record is already in the queue"""
+        now = time.time()
+        with self._lock:
+            self._replace_dead(task)
+            cursor = self._connection.execute(
+                """
+                INSERT OR IGNORE INTO tasks
+                    (uuid, dedup_key, type, payload, attempts, failed_at, enqueued_at,
+                     rank, available_at)
+                VALUES (:uuid, :dedup_key, :type, :payload, :attempts, :failed_at, :now,
+                        :rank, :available_at)
+                """,
+                {
+                    "uuid": task.uuid,
+                    "dedup_key": self.dedup_key(task),
+                    "type": task.type,
+                    "payload": json.dumps(task.payload, default=str),
+                    "attempts": task.no_of_retries,
+                    "failed_at": task.failed_at.timestamp() if task.failed_at else None,
+                    "now": now,
+                    "rank": self.rank(task, now),
+                    "available_at": now + self.backoff(self.lark_retries(task))
+                }
+            )
+            return cursor.rowcount > 0
 
-    def pop(self) -> Task:
-        return self.tasks.get()
+    def _replace_dead(self, task: Task) -> None:
+        """drop the dead task of the record when lark retried it since it died"""
+        row = self._connection.execute(
+            "SELECT id, payload FROM tasks WHERE dedup_key = ? AND status = 'dead'",
+            (self.dedup_key(task),)
+        ).fetchone()
+        if row is None:
+            return
 
-    def remaining(self):
-        return self.tasks.qsize()
-    
-    def enqueue_many(self, tasks: List[Dict[str, Any]]):
+        dead = Task(payload=json.loads(row["payload"]), type=task.type)
+        if self.lark_retries(task) > self.lark_retries(dead):
+            self._connection.execute("DELETE FROM tasks WHERE id = ?", (row["id"],))
+
+    def pop(self, types: Optional[Sequence[str]] = None) -> Optional[Task]:
+        """
+            lease the best ranked available task of one of the assessment
+            `types` (any type when not given), None when nothing is available
+        """
+        type_filter, params = self._type_filter(types)
+        with self._lock:
+            now = time.time()
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._connection.execute(
+                        f"SELECT * FROM tasks WHERE {_AVAILABLE}{type_filter} ORDER BY rank, id LIMIT 1",
+                        {"now": now, **params}
+                    ).fetchone()
+
+                    if row is None:
+                        self._connection.execute("COMMIT")
+                        return None
+
+                    if row["attempts"] >= self.max_attempts:
+                        self._connection.execute(
+                            "UPDATE tasks SET status = 'dead', lease_expires_at = NULL WHERE id = ?",
+                            (row["id"],)
+                        )
+                        continue
+
+                    self._connection.execute(
+                        """
+                        UPDATE tasks
+                        SET status = 'leased', attempts = attempts + 1, lease_expires_at = ?
+                        WHERE id = ?
+                        """,
+                        (now + self.visibility_timeout, row["id"])
+                    )
+                    self._connection.execute("COMMIT")
+                    return self._to_task(row)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def ack(self, task: Task) -> None:
+        """the task is finished, remove it from the queue"""
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM tasks WHERE uuid = ? AND status = 'leased'",
+                (task.uuid,)
+            )
+
+    def nack(self, task: Task, delay: Optional[float] = None) -> None:
+        """
+            release the lease so the task is handed out again, after `delay`
+            seconds or the retry backoff when not given
+        """
+        task.update_failed_at()
+        failed_at = task.failed_at.timestamp()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT attempts FROM tasks WHERE uuid = ? AND status = 'leased'",
+                (task.uuid,)
+            ).fetchone()
+            if row is None:
+                return
+
+            retries = self.lark_retries(task) + row["attempts"]
+            if delay is None:
+                delay = self.backoff(retries)
+
+            self._connection.execute(
+                """
+                UPDATE tasks
+                SET status = 'queued', lease_expires_at = NULL, failed_at = :failed_at,
+                    rank = rank + :penalty, available_at = :failed_at + :delay
+                WHERE uuid = :uuid AND status = 'leased'
+                """,
+                {
+                    "failed_at": failed_at,
+                    "penalty": self.retry_penalty,
+                    "delay": delay,
+                    "uuid": task.uuid
+                }
+            )
+
+    def release(self, task: Task) -> None:
+        """
+            hand the task out again right away, for work that was interrupted
+            (shutdown, prefetched but never run) rather than failed: the
+            attempt is refunded and the rank isn't penalised
+        """
+        with self._lock:
+            self._connection.execute(
+                """
+                UPDATE tasks
+                SET status = 'queued', lease_expires_at = NULL,
+                    attempts = MAX(attempts - 1, 0), available_at = 0
+                WHERE uuid = ? AND status = 'leased'
+                """,
+                (task.uuid,)
+            )
+
+    def extend_lease(self, task: Task, seconds: Optional[float] = None) -> None:
+        """keep a long running task hidden from other pops"""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE tasks SET lease_expires_at = ? WHERE uuid = ? AND status = 'leased'",
+                (time.time() + (seconds or self.visibility_timeout), task.uuid)
+            )
+
+    def remaining(self, types: Optional[Sequence[str]] = None) -> int:
+        """number of tasks that can be popped right now"""
+        type_filter, params = self._type_filter(types)
+        with self._lock:
+            return self._connection.execute(
+                f"SELECT COUNT(*) FROM tasks WHERE {_AVAILABLE}{type_filter}",
+                {"now": time.time(), **params}
+            ).fetchone()[0]
+
+    def enqueue_many(self, tasks: List[Dict[str, Any]]) -> int:
+        """queue lark records, returns how many of them were new"""
+        queued = 0
         for task in tasks:
+            if self.registry is not None and self.registry.is_known(
+                task.get('record_id'),
+                task.get('no_of_retries')
+            ):
+                continue
+
             type = task['assessment_type']
             created_task = Task(payload=task, type=type)
-            self.tasks.put(created_task)
+            queued += self.push(created_task)
+        return queued
+
+    def record_ids(self) -> Set[str]:
+        """
+            lark record ids that are queued or leased. dead records are left
+            out so a record retried in lark reaches `push`, which replaces
+            the dead task.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT dedup_key FROM tasks WHERE dedup_key LIKE 'record:%' AND status != 'dead'"
+            ).fetchall()
+        return {row["dedup_key"][len("record:"):] for row in rows}
+
+    def list_queued_items(self) -> List[Task]:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM tasks WHERE {_AVAILABLE} ORDER BY rank, id",
+                {"now": time.time()}
+            ).fetchall()
+        return [self._to_task(row) for row in rows]
+
+    def is_empty(self, types: Optional[Sequence[str]] = None) -> bool:
+        return self.remaining(types) == 0
 
-    def list_queued_items(self):
-        return list(self.tasks.queue)
-    
-    def is_empty(self) -> bool:
-        return self.tasks.empty()
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
 
+    @staticmethod
+    def _type_filter(types: Optional[Sequence[str]]) -> Tuple[str, Dict[str, str]]:
+        if types is None:
+            return "", {}
+        params = {f"type{i}": _type for i, _type in enumerate(types)}
+        placeholders = ", ".join(f":{name}" for name in params) or "NULL"
+        return f" AND type IN ({placeholders})", params
 
+    @staticmethod
+    def _to_task(row) -> Task:
+        # no_of_retries is how many times the task was handed out before
+        return Task(
+            payload=json.loads(row["payload"]),
+            type=row["type"],
+            uuid=row["uuid"],
+            failed_at=datetime.fromtimestamp(row["failed_at"]) if row["failed_at"] else None,
+            no_of_retries=row["attempts"]
+        )
@@ -0,0 +1,40 @@
+from typing import Dict, Iterable, Optional
+
+
+class WeightedFairSelector:
+    """
+        Picks which assessment type to serve next (smooth weighted round
+        robin). Over time every type gets turns in proportion to its weight,
+        and a heavy type never starves a light one for long since the turns
+        are interleaved instead of handed out in bursts.
+
+        Weights must be positive: a type without weight would never be
+        picked, and its queued work would never be served.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        for assessment_type, weight in weights.items():
+            if weight <= 0:
+                raise ValueError(f"weight of {assessment_type} must be above 0, got {weight:g}")
+        self.weights = dict(weights)
+        self._current: Dict[str, float] = {
+            assessment_type: 0.0 for assessment_type in weights.keys()
+        }
+
+    def pick(self, candidates: Iterable[str]) -> Optional[str]:
+        """choose among the types that have work and a free slot right now"""
+        candidates = [
+            candidate for candidate in candidates
+            if candidate in self.weights
+        ]
+        if not candidates:
+            return None
+
+        total = 0.0
+        for candidate in candidates:
+            self._current[candidate] += self.weights[candidate]
+            total += self.weights[candidate]
+
+        chosen = max(candidates, key=lambda candidate: self._current[candidate])
+        self._current[chosen] -= total
+        return chosen
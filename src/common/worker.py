@@ -1,6 +1,9 @@
 import os
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from typing import List, Union
+
+from lark_oapi.api.bitable.v1 import AppTableRecord
 
 from src.common import (DataTransformer,
                         AppContext)
@@ -10,9 +13,10 @@ from src.common import (DataTransformer,
 class Worker:
     """Worker is responsible for processing applicant submission"""
 
-    def __init__(self, ctx: AppContext, server_task: str):
+    def __init__(self, ctx: AppContext, server_task: Union[str, List[str]]):
         self._ctx = ctx
-        self.server_task = server_task
+        self.server_tasks: List[str] = [server_task] \
+            if isinstance(server_task, str) else list(server_task)
 
     def create_storage_folders(self):
         """Create storage folder when running worker.py"""
@@ -20,8 +24,8 @@ class Worker:
         if not os.path.exists(script_reading_dir):
             os.makedirs(script_reading_dir)
 
-    async def sync(self):
-        """Synchronize items from lark to TaskQueue"""
+    async def sync(self) -> int:
+        """Synchronize items from lark to TaskQueue, returns the number of new tasks"""
         # Get the current date and time
         now = datetime.now()
 
@@ -30,10 +34,34 @@ class Worker:
 
         self._ctx.logger.info('🔄 syncing from lark at %s', formatted_time)
 
-        records = await self._ctx.lark_queue.get_items(self.server_task)
+        records = []
+        for server_task in self.server_tasks:
+            records.extend(await self._ctx.lark_queue.get_items(server_task))
+
+        return self.enqueue_records(records)
+
+    def _held_elsewhere(self, record: AppTableRecord) -> bool:
+        """check if another worker node is evaluating the record"""
+        claimer = self._ctx.record_claimer
+        return claimer is not None and claimer.held_elsewhere(record.fields)
+
+    def enqueue_records(self, records: List[AppTableRecord]) -> int:
+        """queue the lark records that aren't queued or processed yet"""
+        # drop records that are already queued, in progress or just finished
+        # before paying for the transformation
+        queued_record_ids = self._ctx.task_queue.record_ids()
+        records = [
+            record for record in records
+            if record.record_id not in queued_record_ids
+            and not self._ctx.record_registry.is_known(
+                record.record_id,
+                record.fields.get("no_of_retries")
+            )
+            and not self._held_elsewhere(record)
+        ]
 
         if len(records) == 0:
-            return
+            return 0
 
         transformed_records = DataTransformer.convert_raw_lark_record_to_dict(
             records,
@@ -49,4 +77,11 @@ class Worker:
                 "no_of_retries"
             ]
         )
-        self._ctx.task_queue.enqueue_many(transformed_records)
+        queued = self._ctx.task_queue.enqueue_many(transformed_records)
+
+        self._ctx.logger.info(
+            'queued %s new task(s)',
+            queued
+        )
+
+        return queued
@@ -1,6 +1,7 @@
-from typing import Literal, Union
+from typing import Dict, Literal, Union
 from pydantic import BaseModel
-from os import getenv
+from os import getenv, getpid
+from socket import gethostname
 
 
 class Configuration(BaseModel):
@@ -14,4 +15,44 @@ class Configuration(BaseModel):
     VERSION: Union[str, None] = getenv('VERSION')
     ENVIRONMENT: Union[str, None] = getenv('ENV')
     NOTIFY_APP_ID: Union[str, None] = getenv("NOTIFY_APP_ID")
-    NOTIFY_APP_SECRET: Union[str, None] = getenv("NOTIFY_APP_SECRET")
\ No newline at end of file
+    NOTIFY_APP_SECRET: Union[str, None] = getenv("NOTIFY_APP_SECRET")
+    AUDIO_SCORING_WORKERS: int = getenv("AUDIO_SCORING_WORKERS", 1)
+    AUDIO_SCORING_BATCH_SIZE: int = getenv("AUDIO_SCORING_BATCH_SIZE", 1)
+    AUDIO_DOWNLOAD_MAX_BYTES: int = getenv("AUDIO_DOWNLOAD_MAX_BYTES", 50 * 1024 * 1024)
+    AUDIO_DOWNLOAD_TIMEOUT: float = getenv("AUDIO_DOWNLOAD_TIMEOUT", 60)
+    TASK_QUEUE_PATH: str = getenv("TASK_QUEUE_PATH", "storage/task_queue.db")
+    TASK_VISIBILITY_TIMEOUT: float = getenv("TASK_VISIBILITY_TIMEOUT", 30 * 60)
+    TASK_MAX_ATTEMPTS: int = getenv("TASK_MAX_ATTEMPTS", 5)
+    TASK_TYPE_PRIORITIES: Dict[str, float] = {}
+    TASK_RETRY_PENALTY: float = getenv("TASK_RETRY_PENALTY", 5 * 60)
+    TASK_RETRY_DELAY: float = getenv("TASK_RETRY_DELAY", 30)
+    TASK_MAX_RETRY_DELAY: float = getenv("TASK_MAX_RETRY_DELAY", 15 * 60)
+    RECORD_REGISTRY_SIZE: int = getenv("RECORD_REGISTRY_SIZE", 10000)
+    RECORD_REGISTRY_TTL: float = getenv("RECORD_REGISTRY_TTL", 15 * 60)
+    CHECKPOINT_PATH: str = getenv("CHECKPOINT_PATH", "storage/checkpoints.db")
+    CHECKPOINT_MAX_AGE: float = getenv("CHECKPOINT_MAX_AGE", 24 * 60 * 60)
+    RESULT_CACHE_PATH: str = getenv("RESULT_CACHE_PATH", "storage/result_cache.db")
+    RESULT_CACHE_TTL: float = getenv("RESULT_CACHE_TTL", 7 * 24 * 60 * 60)
+    RESULT_CACHE_MAX_MB: int = getenv("RESULT_CACHE_MAX_MB", 256)
+    TRANSCRIPTION_ROUTES: str = getenv("TRANSCRIPTION_ROUTES", "groq:distil-whisper-large-v3-en,deepgram:nova-2")
+    TRANSCRIPTION_MIN_HEDGE_DELAY: float = getenv("TRANSCRIPTION_MIN_HEDGE_DELAY", 5)
+    TRANSCRIPTION_DEFAULT_HEDGE_DELAY: float = getenv("TRANSCRIPTION_DEFAULT_HEDGE_DELAY", 30)
+    TRANSCRIPTION_AUDIO_FORMAT: str = getenv("TRANSCRIPTION_AUDIO_FORMAT", "")
+    TRANSCRIPTION_SAMPLE_RATE: int = getenv("TRANSCRIPTION_SAMPLE_RATE", 16000)
+    LOCAL_TRANSCRIPTION_MODEL: str = getenv("LOCAL_TRANSCRIPTION_MODEL", "")
+    LOCAL_TRANSCRIPTION_BATCH_SIZE: int = getenv("LOCAL_TRANSCRIPTION_BATCH_SIZE", 4)
+    TRANSCRIPTION_CHUNK_SECONDS: float = getenv("TRANSCRIPTION_CHUNK_SECONDS", 0)
+    TRANSCRIPTION_CHUNK_OVERLAP: float = getenv("TRANSCRIPTION_CHUNK_OVERLAP", 1)
+    TRANSCRIPTION_CHUNK_CONCURRENCY: int = getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", 4)
+    STORAGE_CLEANUP_AGE: float = getenv("STORAGE_CLEANUP_AGE", 60 * 60)
+    LARK_SYNC_CURSOR_FIELD: Union[str, None] = getenv("LARK_SYNC_CURSOR_FIELD")
+    LARK_FULL_SYNC_INTERVAL: float = getenv("LARK_FULL_SYNC_INTERVAL", 5 * 60)
+    LARK_EVENT_ENCRYPT_KEY: str = getenv("LARK_EVENT_ENCRYPT_KEY", "")
+    LARK_EVENT_VERIFICATION_TOKEN: str = getenv("LARK_EVENT_VERIFICATION_TOKEN", "")
+    LARK_EVENT_HOST: str = getenv("LARK_EVENT_HOST", "127.0.0.1")
+    LARK_EVENT_PORT: int = getenv("LARK_EVENT_PORT", 8080)
+    LARK_EVENT_PATH: str = getenv("LARK_EVENT_PATH", "/lark/events")
+    RECORD_CLAIMS_ENABLED: bool = getenv("RECORD_CLAIMS_ENABLED", False)
+    WORKER_ID: str = getenv("WORKER_ID", f"{gethostname()}-{getpid()}")
+    RECORD_LEASE_DURATION: float = getenv("RECORD_LEASE_DURATION", 10 * 60)
+    RECORD_CLAIM_CONFIRM_DELAY: float = getenv("RECORD_CLAIM_CONFIRM_DELAY", 2)
\ No newline at end of file
@@ -1,6 +1,8 @@
 import os
+import json
 import logging
 import sys
+import socket
 from dotenv import load_dotenv
 from logging.handlers import RotatingFileHandler
 from ._configuration import Configuration
@@ -63,7 +65,49 @@ config = Configuration(
     VERSION=os.getenv('VERSION'),
     ENVIRONMENT=os.getenv('ENV'),
     NOTIFY_APP_ID=os.getenv("NOTIFY_APP_ID"),
-    NOTIFY_APP_SECRET=os.getenv("NOTIFY_APP_SECRET")
+    NOTIFY_APP_SECRET=os.getenv("NOTIFY_APP_SECRET"),
+    AUDIO_SCORING_WORKERS=os.getenv("AUDIO_SCORING_WORKERS", 1),
+    AUDIO_SCORING_BATCH_SIZE=os.getenv("AUDIO_SCORING_BATCH_SIZE", 1),
+    AUDIO_DOWNLOAD_MAX_BYTES=os.getenv("AUDIO_DOWNLOAD_MAX_BYTES", 50 * 1024 * 1024),
+    AUDIO_DOWNLOAD_TIMEOUT=os.getenv("AUDIO_DOWNLOAD_TIMEOUT", 60),
+    TASK_QUEUE_PATH=os.getenv("TASK_QUEUE_PATH", "storage/task_queue.db"),
+    TASK_VISIBILITY_TIMEOUT=os.getenv("TASK_VISIBILITY_TIMEOUT", 30 * 60),
+    TASK_MAX_ATTEMPTS=os.getenv("TASK_MAX_ATTEMPTS", 5),
+    # seconds each assessment type is ranked behind, e.g. {"Enhanced Script Reading": 60}
+    TASK_TYPE_PRIORITIES=json.loads(os.getenv("TASK_TYPE_PRIORITIES", "{}")),
+    TASK_RETRY_PENALTY=os.getenv("TASK_RETRY_PENALTY", 5 * 60),
+    TASK_RETRY_DELAY=os.getenv("TASK_RETRY_DELAY", 30),
+    TASK_MAX_RETRY_DELAY=os.getenv("TASK_MAX_RETRY_DELAY", 15 * 60),
+    RECORD_REGISTRY_SIZE=os.getenv("RECORD_REGISTRY_SIZE", 10000),
+    RECORD_REGISTRY_TTL=os.getenv("RECORD_REGISTRY_TTL", 15 * 60),
+    CHECKPOINT_PATH=os.getenv("CHECKPOINT_PATH", "storage/checkpoints.db"),
+    CHECKPOINT_MAX_AGE=os.getenv("CHECKPOINT_MAX_AGE", 24 * 60 * 60),
+    RESULT_CACHE_PATH=os.getenv("RESULT_CACHE_PATH", "storage/result_cache.db"),
+    RESULT_CACHE_TTL=os.getenv("RESULT_CACHE_TTL", 7 * 24 * 60 * 60),
+    RESULT_CACHE_MAX_MB=os.getenv("RESULT_CACHE_MAX_MB", 256),
+    TRANSCRIPTION_ROUTES=os.getenv("TRANSCRIPTION_ROUTES", "groq:distil-whisper-large-v3-en,deepgram:nova-2"),
+    TRANSCRIPTION_MIN_HEDGE_DELAY=os.getenv("TRANSCRIPTION_MIN_HEDGE_DELAY", 5),
+    TRANSCRIPTION_DEFAULT_HEDGE_DELAY=os.getenv("TRANSCRIPTION_DEFAULT_HEDGE_DELAY", 30),
+    TRANSCRIPTION_AUDIO_FORMAT=os.getenv("TRANSCRIPTION_AUDIO_FORMAT", ""),
+    TRANSCRIPTION_SAMPLE_RATE=os.getenv("TRANSCRIPTION_SAMPLE_RATE", 16000),
+    LOCAL_TRANSCRIPTION_MODEL=os.getenv("LOCAL_TRANSCRIPTION_MODEL", ""),
+    LOCAL_TRANSCRIPTION_BATCH_SIZE=os.getenv("LOCAL_TRANSCRIPTION_BATCH_SIZE", 4),
+    TRANSCRIPTION_CHUNK_SECONDS=os.getenv("TRANSCRIPTION_CHUNK_SECONDS", 0),
+    TRANSCRIPTION_CHUNK_OVERLAP=os.getenv("TRANSCRIPTION_CHUNK_OVERLAP", 1),
+    TRANSCRIPTION_CHUNK_CONCURRENCY=os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", 4),
+    STORAGE_CLEANUP_AGE=os.getenv("STORAGE_CLEANUP_AGE", 60 * 60),
+    LARK_SYNC_CURSOR_FIELD=os.getenv("LARK_SYNC_CURSOR_FIELD"),
+    LARK_FULL_SYNC_INTERVAL=os.getenv("LARK_FULL_SYNC_INTERVAL", 5 * 60),
+    LARK_EVENT_ENCRYPT_KEY=os.getenv("LARK_EVENT_ENCRYPT_KEY", ""),
+    LARK_EVENT_VERIFICATION_TOKEN=os.getenv("LARK_EVENT_VERIFICATION_TOKEN", ""),
+    LARK_EVENT_HOST=os.getenv("LARK_EVENT_HOST", "127.0.0.1"),
+    LARK_EVENT_PORT=os.getenv("LARK_EVENT_PORT", 8080),
+    LARK_EVENT_PATH=os.getenv("LARK_EVENT_PATH", "/lark/events"),
+    # several workers sharing the bubble table have to claim records first
+    RECORD_CLAIMS_ENABLED=os.getenv("RECORD_CLAIMS_ENABLED", False),
+    WORKER_ID=os.getenv("WORKER_ID", f"{socket.gethostname()}-{os.getpid()}"),
+    RECORD_LEASE_DURATION=os.getenv("RECORD_LEASE_DURATION", 10 * 60),
+    RECORD_CLAIM_CONFIRM_DELAY=os.getenv("RECORD_CLAIM_CONFIRM_DELAY", 2)
 )
 
 groq_api_keys = [
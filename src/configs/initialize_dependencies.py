@@ -1,8 +1,9 @@
 import os 
+import time
 import logging
 
 logger = logging.getLogger()
-def initialize_dependencies():
+def initialize_dependencies(cleanup_age: float = 60 * 60):
     # create storage for supported assessments.
     assessments = ['script_reading', 'enhanced_script_reading']
     for assessment in assessments:
@@ -10,7 +11,26 @@ def initialize_dependencies():
         if not os.path.exists(storage_dir):
             logger.info(f'creating storage directory for {assessment}...')
             os.makedirs(storage_dir)
-    
-    
 
+        cleanup_storage(storage_dir, cleanup_age)
 
+
+def cleanup_storage(storage_dir: str, max_age: float) -> int:
+    """
+        delete the temporary recordings left behind by a worker that was
+        killed mid-assessment. only files older than `max_age` seconds are
+        removed, other workers on the machine may share the directory.
+    """
+    removed = 0
+    cutoff = time.time() - max_age
+    for entry in os.scandir(storage_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError as err:
+            logger.warning(f'failed to remove {entry.path}: {err}')
+
+    if removed:
+        logger.info(f'removed {removed} stale file(s) from {storage_dir}')
+    return removed
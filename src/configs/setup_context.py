@@ -1,16 +1,33 @@
-from src.common import AppContext, LarkQueue, TaskQueue
+from src.common import AppContext, LarkQueue, TaskQueue, AudioDownloader, \
+    RecordRegistry, RecordClaimer, CheckpointStore, ResultCache
 from src.configs.config import groq_api_keys_manager
 from src.services import GroqService, LlamaService, QuoteTranslationService, \
     ScriptReadingService, BubbleHTTPClientService, \
-    TranscriptionService, VoiceAnalyzerService
+    TranscriptionService, VoiceAnalyzerService, AudioScoringService, \
+    ChunkedTranscriber
 from src.lark import LarkMessenger
 from .config import config
 from .setup_constants import base_constants
 from .setup_services import base_manager, file_manager, \
-    transcriptions_clients, notify_lark_client
+    transcriptions_clients, transcription_router, notify_lark_client
 from .setup_stores import stores
 import logging
 
+voice_analyzer_service = VoiceAnalyzerService()
+
+record_registry = RecordRegistry(
+    max_size=config.RECORD_REGISTRY_SIZE,
+    ttl=config.RECORD_REGISTRY_TTL
+)
+
+record_claimer = RecordClaimer(
+    store=stores.bubble_data_store,
+    worker_id=config.WORKER_ID,
+    lease_duration=config.RECORD_LEASE_DURATION,
+    confirm_delay=config.RECORD_CLAIM_CONFIRM_DELAY,
+    logger=logging.getLogger("record_claimer")
+) if config.RECORD_CLAIMS_ENABLED else None
+
 context = AppContext(
     base_manager=base_manager,
     file_manager=file_manager,
@@ -24,12 +41,23 @@ context = AppContext(
         bitable_table_id=base_constants.BUBBLE_TABLE_ID,
         environment=config.ENVIRONMENT,
         version=config.VERSION,
+        cursor_field=config.LARK_SYNC_CURSOR_FIELD,
+        full_sync_interval=config.LARK_FULL_SYNC_INTERVAL
     ),
     lark_messenger=LarkMessenger(
         lark=notify_lark_client
     ),
     logger=logging.getLogger(),
-    task_queue=TaskQueue(),
+    task_queue=TaskQueue(
+        path=config.TASK_QUEUE_PATH,
+        visibility_timeout=config.TASK_VISIBILITY_TIMEOUT,
+        max_attempts=config.TASK_MAX_ATTEMPTS,
+        registry=record_registry,
+        type_priorities=config.TASK_TYPE_PRIORITIES,
+        retry_penalty=config.TASK_RETRY_PENALTY,
+        retry_delay=config.TASK_RETRY_DELAY,
+        max_retry_delay=config.TASK_MAX_RETRY_DELAY
+    ),
     environment=config.ENVIRONMENT,
     version=config.VERSION,
     stores=stores,
@@ -43,7 +71,39 @@ context = AppContext(
         config.BUBBLE_BEARER_TOKEN
     ),
     transcription_service=TranscriptionService(
-        clients=transcriptions_clients
+        clients=transcriptions_clients,
+        router=transcription_router,
+        # e.g. "opus" (smallest) or "flac" (lossless), empty sends the mp3 as is
+        audio_format=config.TRANSCRIPTION_AUDIO_FORMAT or None,
+        sample_rate=config.TRANSCRIPTION_SAMPLE_RATE,
+        # recordings longer than this are transcribed as concurrent chunks, 0 disables it
+        chunker=ChunkedTranscriber(
+            max_chunk_seconds=config.TRANSCRIPTION_CHUNK_SECONDS,
+            overlap_seconds=config.TRANSCRIPTION_CHUNK_OVERLAP,
+            max_concurrency=config.TRANSCRIPTION_CHUNK_CONCURRENCY
+        ) if config.TRANSCRIPTION_CHUNK_SECONDS else None
+    ),
+    voice_analyzer_service=voice_analyzer_service,
+    audio_scoring_service=AudioScoringService(
+        voice_analyzer_service=voice_analyzer_service,
+        workers=config.AUDIO_SCORING_WORKERS,
+        batch_size=config.AUDIO_SCORING_BATCH_SIZE
+    ),
+    audio_downloader=AudioDownloader(
+        max_bytes=config.AUDIO_DOWNLOAD_MAX_BYTES,
+        timeout=config.AUDIO_DOWNLOAD_TIMEOUT
+    ),
+    record_registry=record_registry,
+    checkpoints=CheckpointStore(
+        path=config.CHECKPOINT_PATH,
+        max_age=config.CHECKPOINT_MAX_AGE,
+        logger=logging.getLogger("checkpoint_store")
+    ),
+    result_cache=ResultCache(
+        path=config.RESULT_CACHE_PATH,
+        ttl=config.RESULT_CACHE_TTL,
+        max_bytes=config.RESULT_CACHE_MAX_MB * 1024 * 1024,
+        logger=logging.getLogger("result_cache")
     ),
-    voice_analyzer_service=VoiceAnalyzerService(),
+    record_claimer=record_claimer,
 )
@@ -3,7 +3,8 @@ from src.interfaces import ITranscriber
 from .config import config
 from typing import Dict
 from src.services import GroqTranscriptionService, \
-    DeepgramTranscriptionService
+    DeepgramTranscriptionService, TranscriptionRouter, \
+    LocalWhisperTranscriptionService
 from src.configs.config import groq_api_keys_manager
 
 lark_client = Lark(
@@ -35,3 +36,22 @@ transcriptions_clients: Dict[str, ITranscriber] = {
         token=config.DEEPGRAM_TOKEN
     )
 }
+
+# offline fallback, e.g. LOCAL_TRANSCRIPTION_MODEL=openai/whisper-small and a
+# "local:openai/whisper-small" route after the remote ones
+if config.LOCAL_TRANSCRIPTION_MODEL:
+    transcriptions_clients["local"] = LocalWhisperTranscriptionService(
+        model=config.LOCAL_TRANSCRIPTION_MODEL,
+        batch_size=config.LOCAL_TRANSCRIPTION_BATCH_SIZE
+    )
+
+# provider:model pairs, in order of preference
+transcription_router = TranscriptionRouter(
+    clients=transcriptions_clients,
+    routes=[
+        tuple(route.split(":", 1))
+        for route in config.TRANSCRIPTION_ROUTES.split(",")
+    ],
+    min_hedge_delay=config.TRANSCRIPTION_MIN_HEDGE_DELAY,
+    default_hedge_delay=config.TRANSCRIPTION_DEFAULT_HEDGE_DELAY
+)
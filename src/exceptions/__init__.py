@@ -1,3 +1,4 @@
 from .audio_incomplete_error import AudioIncompleteError
 from .evaluation_failure_error import EvaluationFailureError
-from .file_upload_error import FileUploadError
\ No newline at end of file
+from .file_upload_error import FileUploadError
+from .audio_download_error import AudioDownloadError, InvalidAudioUrlError, AudioTooLargeError
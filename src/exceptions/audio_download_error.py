@@ -0,0 +1,17 @@
+from typing import Optional
+
+
+class AudioDownloadError(Exception):
+    def __init__(self, url: str, message: str, status_code: Optional[int] = None):
+        self.url = url
+        self.message = message
+        self.status_code = status_code
+        super().__init__(f"Audio download error: status_code={self.status_code}, message={self.message}, url={self.url}")
+
+
+class InvalidAudioUrlError(AudioDownloadError):
+    """the url can't be fetched and retrying won't help (malformed url, 4xx response)"""
+
+
+class AudioTooLargeError(AudioDownloadError):
+    """the recording is bigger than the configured download limit"""
@@ -1,18 +1,20 @@
+import asyncio
 import time
-import librosa
 import requests
 import os
 import json
-from src.common import AppContext, AudioProcessor, TextPreprocessor, \
-    TranscriptionProcessor, FeatureExtractor, get_total_word_correct
-from src.common.utilities import download_mp3, delete_file, \
-    get_necessary_fields_from_payload, log_execution_time
+from src.common import AppContext, AudioProcessor, AudioBuffer, \
+    TextPreprocessor, TranscriptionProcessor, StageGraph, ResultCache, \
+    get_total_word_correct
+from src.common.utilities import get_necessary_fields_from_payload, log_execution_time
 from uuid import uuid4
 from src.exceptions import FileUploadError, EvaluationFailureError, \
-    AudioIncompleteError
-from typing import Dict
+    AudioIncompleteError, AudioDownloadError, InvalidAudioUrlError, \
+    AudioTooLargeError
+from typing import Dict, Optional
 from src.dtos import RecordingRelatedFieldsScore, ScriptReadingResultDTO
 from src.interfaces import CallbackHandler
+from src.services import AudioScores
 from src.tools.message_card_template_helper import (
     reading_notification_template_card,
     ReadingTemplateVariables
@@ -25,24 +27,18 @@ class ScriptReadingHandler(CallbackHandler):
 
     def aggregate_applicant_score(
         self,
-        generated_filename: str,
+        audio_scores: AudioScores,
         transcription: str,
         given_transcription: str,
         recording_duration: float
     ) -> RecordingRelatedFieldsScore:
 
-        y, sr = librosa.load(generated_filename, sr=16000)
-        avg_pause_duration = FeatureExtractor(y, sr).calculate_pause_duration()
+        avg_pause_duration = audio_scores.avg_pause_duration
         words_per_minute = AudioProcessor.calculate_words_per_minute(
             transcription,
             recording_duration
         )
         wpm_category = AudioProcessor.determine_wpm_category(words_per_minute)
-        pronunciation, fluency, voice_classification = self._ctx \
-            .voice_analyzer_service \
-            .calculate_score(
-                generated_filename
-            )
         similarity_score = TranscriptionProcessor.compute_distance(
             transcription,
             given_transcription
@@ -54,10 +50,10 @@ class ScriptReadingHandler(CallbackHandler):
         )
 
         return RecordingRelatedFieldsScore(
-            fluency=fluency,
+            fluency=audio_scores.fluency,
             avg_pause_duration=avg_pause_duration,
-            pronunciation=pronunciation,
-            voice_classification=voice_classification,
+            pronunciation=audio_scores.pronunciation,
+            voice_classification=audio_scores.voice_classification,
             wpm_category=wpm_category,
             similarity_score=similarity_score,
             pacing_score=pacing_score,
@@ -75,9 +71,12 @@ class ScriptReadingHandler(CallbackHandler):
             ) * 100
         )
 
-    async def handle(self, payload: Dict[str, str]):
+    async def handle(
+        self,
+        payload: Dict[str, str],
+        audio: Optional[AudioBuffer] = None
+    ):
         with log_execution_time() as _:
-            generated_filename = None  # Initialize generated_filename
             try:
                 process_start = time.time()
                 self._ctx.logger.info('script reading evaluation...')
@@ -86,53 +85,115 @@ class ScriptReadingHandler(CallbackHandler):
                 fields = get_necessary_fields_from_payload(payload)
                 given_transcription = fields.given_transcription  # Use the value retrieved from the payload
 
-                # Generate the filename
-                generated_filename = os.path.join(
-                    'storage',
-                    'script_reading',
-                    f"{fields.user_id}.{uuid4()}.mp3"
-                )
-
-                # Log the generated filename
-                self._ctx.logger.info(f"Generated Filename: {generated_filename}")
+                # Name of the uploaded recording, the audio itself never touches the disk
+                upload_name = f"{fields.user_id}.{uuid4()}.mp3"
 
-                # Download the audio file
-                self._ctx.logger.info(f"Downloading audio file from: {fields.audio_url}")
-                download_mp3(fields.audio_url, generated_filename)
+                # Download the audio file unless it was prefetched
+                if audio is None:
+                    self._ctx.logger.info(f"Downloading audio file from: {fields.audio_url}")
+                    data = await self._ctx.audio_downloader.download(fields.audio_url)
 
-                # Check if the audio file exists
-                if not os.path.exists(generated_filename):
-                    self._ctx.logger.error(f"Audio file not found: {generated_filename}")
-                    raise FileNotFoundError(f"Audio file not found: {generated_filename}")
+                    # Decode once, every later stage reuses the same buffer
+                    audio = await asyncio.to_thread(AudioBuffer.from_bytes, data)
+                    del data
 
                 # Remove silence and calculate duration
                 self._ctx.logger.info('Removing silence from audio...')
-                recording_duration = AudioProcessor.remove_silence_from_audio(generated_filename)
+                audio = await asyncio.to_thread(
+                    AudioProcessor.remove_silence_from_buffer,
+                    audio
+                )
+                recording_duration = audio.duration_seconds
                 self._ctx.logger.info(f"Recording duration: {recording_duration} seconds")
 
-
-                file_token = await self._ctx.file_manager.upload_async(
-                                generated_filename
-                            )
-
-                # Check for short audio duration
+                # Check for short audio duration before spending any api calls
                 if recording_duration < 30:
                     raise AudioIncompleteError(
                         name=fields.name,
-                        audio_path=generated_filename,
+                        audio_path=fields.audio_url,
                         message="Audio file is less than 30 seconds."
                     )
 
-                # Proceed with transcription and further processing
-                transcription = await self._ctx.transcription_service.transcribe(
-                    audio_path=generated_filename,
-                    client="groq",
-                    model="distil-whisper-large-v3-en",
-                    language='en'
+                # results cached for the same recording are reused, e.g. on a retry
+                audio_hash = await asyncio.to_thread(lambda: audio.content_hash)
+
+                # upload, transcription and audio scoring don't depend on each
+                # other and run concurrently.
+                # finished stages are checkpointed so a restarted worker
+                # resumes after the last one instead of paying for them again
+                stages = StageGraph(
+                    f"sr {fields.record_id}",
+                    self._ctx.logger,
+                    checkpoints=self._ctx.checkpoints,
+                    key=fields.record_id
                 )
 
-                transcription = TextPreprocessor.normalize(transcription)
-                
+                async def encode():
+                    # Encode the trimmed audio once, in memory, for the upload
+                    # and transcription
+                    return await asyncio.to_thread(audio.encode, "mp3")
+
+                async def upload(audio_bytes: bytes):
+                    return await self._ctx.file_manager.upload_bytes_async(
+                        audio_bytes,
+                        upload_name
+                    )
+
+                async def transcribe():
+                    async def run():
+                        # routed to the fastest healthy provider, with failover.
+                        # the buffer is sent as the cached mp3, or re-encoded
+                        # compactly when a transcription format is configured
+                        transcription = await self._ctx.transcription_service.transcribe(
+                            audio=audio,
+                            language='en'
+                        )
+                        return TextPreprocessor.normalize(transcription)
+
+                    return await self._ctx.result_cache.get_or_compute(
+                        ResultCache.key(
+                            "transcription",
+                            audio_hash,
+                            *self._ctx.transcription_service.profile
+                        ),
+                        run
+                    )
+
+                async def score():
+                    return await self._ctx.result_cache.get_or_compute(
+                        ResultCache.key(
+                            "audio_scores",
+                            audio_hash,
+                            *self._ctx.audio_scoring_service.models
+                        ),
+                        lambda: self._ctx.audio_scoring_service.score(audio)
+                    )
+
+                async def evaluate(transcription: str):
+                    return await self._ctx.result_cache.get_or_compute(
+                        ResultCache.key(
+                            "evaluation",
+                            transcription,
+                            given_transcription,
+                            self._ctx.script_reading_service.model
+                        ),
+                        lambda: self._ctx.script_reading_service.evaluate(
+                            transcription=transcription,
+                            given_script=given_transcription
+                        )
+                    )
+
+                stages.add("audio_bytes", encode) \
+                    .add("file_token", upload, depends_on=["audio_bytes"], checkpoint=True) \
+                    .add("transcription", transcribe, checkpoint=True) \
+                    .add("audio_scores", score, checkpoint=True) \
+                    .add("llm_response", evaluate, depends_on=["transcription"], checkpoint=True)
+
+                results = await stages.run()
+                file_token = results["file_token"]
+                transcription = results["transcription"]
+                llm_response = results["llm_response"]
+
                 # get total correct word count and base word count
                 correct_word_count, base_words_count = get_total_word_correct(
                     given_transcription,
@@ -142,7 +203,7 @@ class ScriptReadingHandler(CallbackHandler):
                 self._ctx.logger.info('calculating similarity score...')
 
                 partial_fields_score = self.aggregate_applicant_score(
-                    generated_filename,
+                    results["audio_scores"],
                     transcription,
                     given_transcription,
                     recording_duration
@@ -150,11 +211,6 @@ class ScriptReadingHandler(CallbackHandler):
 
                 actual_score = self.calculate_score(partial_fields_score)
 
-                llm_response = await self._ctx.script_reading_service.evaluate(
-                    transcription=transcription,
-                    given_script=given_transcription
-                )
-
                 self._ctx.logger.info('building payload...')
 
                 process_time = time.time() - process_start
@@ -184,70 +240,77 @@ class ScriptReadingHandler(CallbackHandler):
                     environment=self._ctx.environment.upper()
                 )
 
-                lark_stored_response = await self._ctx.stores \
-                    .sr_eval_store \
-                    .create(
-                        sr_payload
+                # the result record is stored once, the status update and the
+                # group notification then both only need its id
+                stages = StageGraph(
+                    f"sr {fields.record_id} writes",
+                    self._ctx.logger,
+                    checkpoints=self._ctx.checkpoints,
+                    key=fields.record_id
+                )
+
+                async def store():
+                    lark_stored_response = await self._ctx.stores \
+                        .sr_eval_store \
+                        .create(
+                            sr_payload
+                        )
+                    return lark_stored_response.data.record.record_id
+
+                async def update_status(stored_record_id: str):
+                    # update status on lark base
+                    await self._ctx.stores.bubble_data_store.update_status(
+                        record_id=fields.record_id,
+                        status="done"
                     )
 
-                # update status on lark base
-                await self._ctx.stores.bubble_data_store.update_status(
-                    record_id=fields.record_id,
-                    status="done"
-                )
+                async def notify(stored_record_id: str):
+                    # get the stored record with shared url
+                    found_record = await self._ctx.stores \
+                        .sr_eval_store \
+                        .find_record(
+                            record_id=stored_record_id
+                        )
 
-                self._ctx.logger.info("updating score on bubble database...")
-
-                # update applicant data on bubble database
-                # response = await self._ctx.bubble_http_client_service \
-                #     .update_reading_score(
-                #         fields.record_id,
-                #         actual_score
-                #     )
-
-                # self._ctx.logger.info(
-                #     "bubble request status: %s",
-                #     response['status']
-                # )
-
-                # get the stored record with shared url
-                found_record = await self._ctx.stores \
-                    .sr_eval_store \
-                    .find_record(
-                        record_id=lark_stored_response.data.record.record_id
+                    record_content = json.loads(
+                        found_record.raw.content.decode()
                     )
 
-                record_content = json.loads(
-                    found_record.raw.content.decode()
-                )
+                    shared_url = record_content['data']['record']['record_url']
+
+                    # notify the group chat
+                    notification_payload = ReadingTemplateVariables(
+                        calculated_score=actual_score,
+                        voice_quality=partial_fields_score.pronunciation,
+                        pacing_score=partial_fields_score.pacing_score,
+                        wpm_category=partial_fields_score.wpm_category,
+                        fluency_score=partial_fields_score.fluency,
+                        accuracy_score=partial_fields_score.similarity_score,
+                        correct_count=correct_word_count,
+                        total_words_count=base_words_count,
+                        name=fields.name,
+                        view_link=shared_url,
+                        given_script=fields.given_transcription,
+                        evaluation=llm_response.evaluation
+                    )
 
-                shared_url = record_content['data']['record']['record_url']
+                    notif_payload = reading_notification_template_card(
+                        notification_payload
+                    )
 
-                # notify the group chat
-                notification_payload = ReadingTemplateVariables(
-                    calculated_score=actual_score,
-                    voice_quality=partial_fields_score.pronunciation,
-                    pacing_score=partial_fields_score.pacing_score,
-                    wpm_category=partial_fields_score.wpm_category,
-                    fluency_score=partial_fields_score.fluency,
-                    accuracy_score=partial_fields_score.similarity_score,
-                    correct_count=correct_word_count,
-                    total_words_count=base_words_count,
-                    name=fields.name,
-                    view_link=shared_url,
-                    given_script=fields.given_transcription,
-                    evaluation=llm_response.evaluation
-                )
+                    await self._ctx.lark_messenger \
+                        .send_message_card_to_group_chat(
+                            os.getenv("SR_GROUP_CHAT_ID"),
+                            notif_payload
+                        )
 
-                notif_payload = reading_notification_template_card(
-                    notification_payload
-                )
+                stages.add("stored_record_id", store, checkpoint=True) \
+                    .add("update_status", update_status, depends_on=["stored_record_id"]) \
+                    .add("notify", notify, depends_on=["stored_record_id"], checkpoint=True)
 
-                await self._ctx.lark_messenger \
-                    .send_message_card_to_group_chat(
-                        os.getenv("SR_GROUP_CHAT_ID"),
-                        notif_payload
-                    )
+                await stages.run()
+
+                self._ctx.checkpoints.clear(fields.record_id)
 
                 self._ctx.logger.info(
                     'done processing: %s, processing_time: %s',
@@ -255,7 +318,7 @@ class ScriptReadingHandler(CallbackHandler):
                     process_time
                 )
 
-            except requests.exceptions.InvalidURL as err:
+            except InvalidAudioUrlError as err:
                 await self._ctx.stores.bubble_data_store.update_status(
                     record_id=fields.record_id,
                     status="invalid audio url"
@@ -266,6 +329,24 @@ class ScriptReadingHandler(CallbackHandler):
                     err
                 )
 
+            except AudioTooLargeError as err:
+                await self._ctx.stores.bubble_data_store.update_status(
+                    record_id=fields.record_id,
+                    status="audio too large"
+                )
+                self._ctx.logger.error(
+                    "applicant name: %s, message: %s",
+                    fields.name,
+                    err
+                )
+
+            except AudioDownloadError as err:
+                await self._ctx.stores.bubble_data_store.increment_retry(
+                    record_id=fields.record_id,
+                    count=fields.no_of_retries
+                )
+                self._ctx.logger.error("download failure: %s", err)
+
             except FileUploadError as err:
                 self._ctx.logger.error(err)
 
@@ -309,6 +390,4 @@ class ScriptReadingHandler(CallbackHandler):
                 )
 
             finally:
-                if generated_filename and os.path.exists(generated_filename):
-                    delete_file(generated_filename)
                 self._ctx.logger.info("delaying for 3 secs...")
\ No newline at end of file
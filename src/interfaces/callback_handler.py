@@ -1,7 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.common.audio_buffer import AudioBuffer
 
 class CallbackHandler(ABC):
     @abstractmethod
-    async def handle(self, payload: Dict[str, str]) -> None:
+    async def handle(
+        self,
+        payload: Dict[str, str],
+        audio: Optional["AudioBuffer"] = None
+    ) -> None:
         pass
@@ -1,13 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Literal
+from typing import Literal, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.common.audio_source import AudioSource
 
 
 class ITranscriber(ABC):
     @abstractmethod
     async def transcribe(
         self,
-        audio_path: str,
+        audio: "AudioSource",
         model: str,
         language: Literal['en', 'tl'] = 'tl'
     ):
+        """`audio` is a file path, encoded file contents or an AudioBuffer"""
         pass
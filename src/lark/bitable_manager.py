@@ -5,6 +5,7 @@ import json
 from src.lark import Lark
 from lark_oapi.api.drive.v1 import *
 from loguru import logger
+from typing import AsyncIterator, List, Optional
 
 
 class BitableManager:
@@ -99,25 +100,65 @@ class BitableManager:
 
         return response
     
-    async def async_get_records(self, table_id: str, filter=None, page_token=None, page_size=500):
-        request = ListAppTableRecordRequest.builder() \
-            .app_token(self.BITABLE_TOKEN) \
-            .table_id(table_id)
-        if filter:
-            request = request.filter(filter)
-        if page_token:
-            request = request.page_token(page_token)
-        request = request.page_size(page_size).build()
+    async def iter_records(
+        self,
+        table_id: str,
+        filter=None,
+        page_token=None,
+        page_size=500,
+        sort: Optional[List[str]] = None
+    ) -> AsyncIterator[List[AppTableRecord]]:
+        """yield the matching records page by page, following the page tokens"""
+        while True:
+            request = ListAppTableRecordRequest.builder() \
+                .app_token(self.BITABLE_TOKEN) \
+                .table_id(table_id)
+            if filter:
+                request = request.filter(filter)
+            if sort:
+                request = request.sort(json.dumps(sort))
+            if page_token:
+                request = request.page_token(page_token)
+            request = request.page_size(page_size).build()
+
+            response = await self.lark.bitable.v1.app_table_record.alist(request)
+
+            if not response.success():
+                raise Exception(f"Request failed: code={response.code}, msg={response.msg}, log_id={response.get_log_id()}")
+
+            if response.data.items:
+                yield response.data.items
+
+            if not response.data.has_more or not response.data.page_token:
+                return
 
-        response = await self.lark.bitable.v1.app_table_record.alist(request)
+            page_token = response.data.page_token
+
+    async def subscribe_events_async(self):
+        """subscribe the app to the record change events of the bitable"""
+        request: SubscribeFileRequest = SubscribeFileRequest.builder() \
+            .file_token(self.BITABLE_TOKEN) \
+            .file_type("bitable") \
+            .build()
+
+        response: SubscribeFileResponse = await self.lark.drive.v1.file.asubscribe(request)
 
         if not response.success():
             raise Exception(f"Request failed: code={response.code}, msg={response.msg}, log_id={response.get_log_id()}")
 
-        if response.data.total == 0:
-            return []
+        return response
+
+    async def async_get_records(self, table_id: str, filter=None, page_token=None, page_size=500):
+        records = []
+        async for items in self.iter_records(
+            table_id,
+            filter=filter,
+            page_token=page_token,
+            page_size=page_size
+        ):
+            records.extend(items)
 
-        return response.data.items
+        return records
     
 
     def get_records(self, table_id, filter=None) -> List[AppTableRecord]:
@@ -192,6 +233,28 @@ class BitableManager:
         lark.logger.info(lark.JSON.marshal(response.data, indent=4))
         return response
     
+    async def list_field_names_async(self, table_id: str) -> List[str]:
+        """names of every field of the table"""
+        names: List[str] = []
+        page_token = None
+        while True:
+            builder = ListAppTableFieldRequest.builder() \
+                .app_token(self.BITABLE_TOKEN) \
+                .table_id(table_id or self.BITABLE_ID) \
+                .page_size(100)
+            if page_token:
+                builder = builder.page_token(page_token)
+
+            response: ListAppTableFieldResponse = await self.lark.bitable.v1.app_table_field.alist(builder.build())
+
+            if not response.success():
+                raise Exception(f"Request failed: code={response.code}, msg={response.msg}, log_id={response.get_log_id()}")
+
+            names.extend(field.field_name for field in response.data.items or [])
+            if not response.data.has_more:
+                return names
+            page_token = response.data.page_token
+
     async def update_record_async(self, table_id: str, record_id: str, fields: Dict[str, Any]):
         request: UpdateAppTableRecordRequest = UpdateAppTableRecordRequest.builder() \
             .app_token(self.BITABLE_TOKEN) \
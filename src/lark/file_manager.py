@@ -1,4 +1,5 @@
 import datetime
+import io
 import time
 from lark_oapi.api.drive.v1 import *
 from .TenantManager import TenantManager
@@ -32,17 +33,20 @@ class FileManager:
             return
         filename = os.path.split(file_path)[1]
 
-        size = self.get_file_size(file_path)
+        async with aiofiles.open(file_path, 'rb') as file:
+            data = await file.read()
 
-        file = open(file_path, 'rb')
+        return await self.upload_bytes_async(data, filename)
 
+    async def upload_bytes_async(self, data: bytes, file_name: str):
+        """upload file contents held in memory, no temporary file needed"""
         request: UploadAllMediaRequest = UploadAllMediaRequest.builder() \
             .request_body(UploadAllMediaRequestBody.builder()
-                .file_name(filename)
+                .file_name(file_name)
                 .parent_type("bitable_file")
                 .parent_node(self.bitable_token)
-                .size(size) \
-                .file(file) \
+                .size(len(data)) \
+                .file(io.BytesIO(data)) \
                 .build()) \
             .build()
 
@@ -52,7 +56,7 @@ class FileManager:
             raise FileUploadError(
                 code=response.code, 
                 message=response.msg, 
-                file_path=file_path
+                file_path=file_name
             )
 
         return response.data.file_token
@@ -1,3 +1,5 @@
+from .transcription_router import TranscriptionRouter, ProviderStats
+from .chunked_transcriber import ChunkedTranscriber
 from .transcription_service import TranscriptionService
 from .voice_analyzer_service import VoiceAnalyzerService
 from .llama_service import LlamaService
@@ -7,7 +9,9 @@ from .applicant_submitted_record_service import ApplicantSubmittedRecordService
 from .quote_translation_service import QuoteTranslationService
 from .photo_interpretation_service import PhotoInterpretationService
 from .groq_transcription_service import GroqTranscriptionService
+from .local_whisper_transcription_service import LocalWhisperTranscriptionService
 from .groq_service import GroqService
 from .reading_evaluation_service import ReadingEvaluationService
 from .bubble_http_client_service import BubbleHTTPClientService
-from .script_reading_service import ScriptReadingService
\ No newline at end of file
+from .script_reading_service import ScriptReadingService
+from .audio_scoring_service import AudioScoringService, AudioScores
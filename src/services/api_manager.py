@@ -1,14 +1,242 @@
-import itertools
-import os
-from typing import List
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, TypeVar
+
+import httpx
+from groq import APIConnectionError
+
+logger = logging.getLogger("api_manager")
+
+T = TypeVar("T")
+
+# wait before using a rate limited key again when the response doesn't say
+DEFAULT_RATE_LIMIT_WAIT = 60.0
+
+# http statuses worth trying again, like the sdk retries did: request
+# timeout, lock conflict and server errors
+_TRANSIENT_STATUSES = {408, 409}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+@dataclass
+class KeyState:
+    """what is known about the budget of one api key"""
+    key: str
+    in_flight: int = 0
+    remaining_requests: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    parked_until: float = 0.0
+    last_used: float = 0.0
 
 
 class APIManager:
-    def __init__(self, keys: List[str]) -> None:
-        self.keys = itertools.cycle(keys)
+    """
+        Pool of api keys sharing the load of every service calling the same
+        provider (transcription, script reading, quote translation).
+
+        `get_next_key` hands out the least loaded key: the one with the fewest
+        requests in flight, then the most remaining requests and tokens
+        reported by the `x-ratelimit-*` response headers (see `update`), then
+        the least recently used. A rate limited key (a 429, or a budget
+        reported as exhausted) is parked until its reset time. Missing keys
+        (unset env vars) are skipped.
+
+        `run` wraps a request: it waits for an available key, counts the
+        request in flight and retries with another key when the request was
+        rate limited. Transient failures (a timeout, a 5xx, a dropped
+        connection) are retried up to `max_retries` times, after `retry_backoff`
+        seconds doubled on every retry, on the next key handed out. The sdk
+        clients run with their own retries off so a 429 reaches the pool.
+    """
+
+    def __init__(
+        self,
+        keys: List[Optional[str]],
+        clock: Callable[[], float] = time.monotonic,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5
+    ) -> None:
+        # unset keys are dropped, the order of the others is kept
+        self.keys: List[str] = list(dict.fromkeys(key for key in keys if key))
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._clock = clock
+        self._states: Dict[str, KeyState] = {key: KeyState(key) for key in self.keys}
+
+    def get_next_key(self) -> str:
+        """least loaded available key, or the one available the soonest when every key is parked"""
+        if not self.keys:
+            raise RuntimeError("no api key configured")
+
+        now = self._clock()
+        available = [
+            state for state in self._states.values()
+            if state.parked_until <= now
+        ]
+        if not available:
+            state = min(self._states.values(), key=lambda state: state.parked_until)
+        else:
+            state = min(available, key=lambda state: (
+                state.in_flight,
+                -(state.remaining_requests if state.remaining_requests is not None else float("inf")),
+                -(state.remaining_tokens if state.remaining_tokens is not None else float("inf")),
+                state.last_used
+            ))
+
+        state.last_used = now
+        return state.key
+
+    def wait_time(self) -> float:
+        """seconds until a key is available, 0 when one is available now"""
+        if not self.keys:
+            return 0.0
+        now = self._clock()
+        return max(0.0, min(state.parked_until for state in self._states.values()) - now)
+
+    async def acquire(self) -> str:
+        """wait for an available key and count a request in flight on it, see `release`"""
+        wait = self.wait_time()
+        if wait > 0:
+            logger.warning("every api key is rate limited, waiting %.1fs", wait)
+            await asyncio.sleep(wait)
+
+        key = self.get_next_key()
+        self._states[key].in_flight += 1
+        return key
+
+    def release(self, key: str) -> None:
+        state = self._states.get(key)
+        if state is not None and state.in_flight > 0:
+            state.in_flight -= 1
+
+    async def run(self, request: Callable[[str], Awaitable[T]]) -> T:
+        """call `request` with a key, retrying with another key when it is rate limited or failed transiently"""
+        rate_limited, failed = 0, 0
+        while True:
+            delay = 0.0
+            key = await self.acquire()
+            try:
+                return await request(key)
+            except Exception as err:
+                if self.report_error(key, err):
+                    rate_limited += 1
+                    if rate_limited >= len(self.keys):
+                        raise
+                    logger.warning("api key %s rate limited, retrying with another key", self.mask(key))
+                elif self.is_transient(err) and failed < self.max_retries:
+                    delay = self.retry_backoff * 2 ** failed
+                    failed += 1
+                    logger.warning(
+                        "request with api key %s failed (%s), retrying in %.1fs",
+                        self.mask(key),
+                        err,
+                        delay
+                    )
+                else:
+                    raise
+            finally:
+                self.release(key)
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def is_transient(err: Exception) -> bool:
+        """whether `err` is a failure that may not happen again (timeout, 5xx, dropped connection)"""
+        if isinstance(err, (APIConnectionError, httpx.TransportError, TimeoutError)):
+            return True
+        status_code = getattr(err, "status_code", None)
+        return isinstance(status_code, int) and (status_code in _TRANSIENT_STATUSES or status_code >= 500)
+
+    def update(self, key: str, headers: Mapping[str, str]) -> None:
+        """record the budget left on the key from the `x-ratelimit-*` response headers"""
+        state = self._states.get(key)
+        if state is None:
+            return
+
+        remaining_requests = self._int(headers.get("x-ratelimit-remaining-requests"))
+        remaining_tokens = self._int(headers.get("x-ratelimit-remaining-tokens"))
+        if remaining_requests is not None:
+            state.remaining_requests = remaining_requests
+        if remaining_tokens is not None:
+            state.remaining_tokens = remaining_tokens
+
+        # a spent budget would only earn a 429, park the key until it resets.
+        # the budget is full again by then, until the next response says otherwise
+        if remaining_requests == 0:
+            self.park(key, self._duration(headers.get("x-ratelimit-reset-requests")))
+            state.remaining_requests = None
+        if remaining_tokens == 0:
+            self.park(key, self._duration(headers.get("x-ratelimit-reset-tokens")))
+            state.remaining_tokens = None
+
+    def http_client(self, key: str, **kwargs: Any) -> httpx.AsyncClient:
+        """
+            http client recording the budget headers of every response it
+            receives for `key`, for sdk clients that don't expose the raw
+            responses (e.g. langchain's ChatGroq)
+        """
+        async def record_budget(response: httpx.Response) -> None:
+            self.update(key, response.headers)
+
+        return httpx.AsyncClient(event_hooks={"response": [record_budget]}, **kwargs)
+
+    def report_error(self, key: str, err: Exception) -> bool:
+        """park the key when `err` is a rate limit (http 429), returns whether it was one"""
+        if getattr(err, "status_code", None) != 429:
+            return False
+
+        response = getattr(err, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        self.park(
+            key,
+            self._duration(headers.get("retry-after"))
+            or self._duration(headers.get("x-ratelimit-reset-requests"))
+            or self._duration(headers.get("x-ratelimit-reset-tokens"))
+        )
+        return True
+
+    def park(self, key: str, seconds: Optional[float] = None) -> None:
+        """stop handing out the key for `seconds` (DEFAULT_RATE_LIMIT_WAIT when unknown)"""
+        state = self._states.get(key)
+        if state is None:
+            return
+
+        seconds = DEFAULT_RATE_LIMIT_WAIT if seconds is None else seconds
+        state.parked_until = max(state.parked_until, self._clock() + seconds)
+        logger.info("api key %s parked for %.1fs", self.mask(key), seconds)
+
+    @staticmethod
+    def _int(value: Optional[str]) -> Optional[int]:
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _duration(value: Optional[str]) -> Optional[float]:
+        """seconds of a retry-after ("12") or reset ("1m30.5s", "250ms") header"""
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+        parts = _DURATION_PART.findall(value)
+        if not parts:
+            return None
+        return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
 
-    def get_next_key(self):
-        return next(self.keys)
+    @staticmethod
+    def mask(key: str) -> str:
+        """the key as it may appear in logs"""
+        return f"...{key[-4:]}"
 
     def __repr__(self):
-        return f"APIManager(keys={self.keys})"
+        return f"APIManager(keys={len(self.keys)})"
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.common.audio_buffer import AudioBuffer
+from src.common.feature_extractor import FeatureExtractor
+from src.common.micro_batcher import MicroBatcher
+from .voice_analyzer_service import VoiceAnalyzerService
+
+logger = logging.getLogger("audio_scoring_service")
+
+# sample rate expected by the voice analyzer models and the pause detection
+SAMPLE_RATE = 16000
+
+# voice analyzer owned by a pool worker process, loaded once per process
+_worker_voice_analyzer: Optional[VoiceAnalyzerService] = None
+
+
+class AudioScores(BaseModel):
+    avg_pause_duration: float
+    pronunciation: int
+    fluency: int
+    voice_classification: int
+
+
+def _initialize_worker() -> None:
+    """load the models as soon as the worker process starts"""
+    global _worker_voice_analyzer
+    _worker_voice_analyzer = VoiceAnalyzerService().load()
+
+
+def _ping() -> bool:
+    return _worker_voice_analyzer is not None
+
+
+def _score_recordings(
+    waveforms: List[np.ndarray],
+    batch_size: int,
+    voice_analyzer: Optional[VoiceAnalyzerService] = None
+) -> List[AudioScores]:
+    """run the cpu-bound audio scorers on a batch of 16 kHz waveforms"""
+    voice_analyzer = voice_analyzer or _worker_voice_analyzer
+
+    voice_scores = voice_analyzer.calculate_scores(
+        waveforms,
+        sampling_rate=SAMPLE_RATE,
+        batch_size=batch_size
+    )
+
+    return [
+        AudioScores(
+            avg_pause_duration=FeatureExtractor(y, SAMPLE_RATE).calculate_pause_duration(),
+            pronunciation=pronunciation,
+            fluency=fluency,
+            voice_classification=voice_classification
+        )
+        for y, (pronunciation, fluency, voice_classification) in zip(waveforms, voice_scores)
+    ]
+
+
+class AudioScoringService:
+    """
+        Offloads the cpu-bound audio scoring (decoding, pause detection and the
+        voice analyzer pipelines) so it does not block the event loop.
+
+        With `workers` > 0 the jobs run in a pool of processes that each keep
+        their own warm copy of the models. With `workers` = 0 the jobs run in a
+        thread using the in-process `voice_analyzer_service`.
+
+        Recordings submitted while every worker is busy are scored together as
+        one batch of up to `batch_size` recordings. Batching is opt-in, on a
+        cpu it was measured slower than scoring one recording at a time.
+
+        A worker dying (e.g. killed out of memory) breaks the whole pool, the
+        pool is then replaced and the batch scored once more.
+    """
+
+    def __init__(
+        self,
+        voice_analyzer_service: VoiceAnalyzerService,
+        workers: int = 1,
+        batch_size: int = 1
+    ):
+        self.voice_analyzer_service = voice_analyzer_service
+        self.workers = workers
+        self.batch_size = batch_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._restart_lock = asyncio.Lock()
+        self._batcher = MicroBatcher[np.ndarray, AudioScores](
+            self._score_batch,
+            max_batch_size=batch_size,
+            max_concurrency=max(1, workers)
+        )
+
+    async def start(self) -> None:
+        """spawn the worker processes and wait until every model is loaded"""
+        if self.workers <= 0:
+            await asyncio.to_thread(self.voice_analyzer_service.load)
+            return
+
+        if self._pool is not None:
+            return
+
+        logger.info("starting %s audio scoring worker(s)...", self.workers)
+
+        # spawn instead of fork, forking a process that already
+        # initialized torch can deadlock the child
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker
+        )
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._pool, _ping)
+            for _ in range(self.workers)
+        ])
+
+        logger.info("audio scoring workers ready")
+
+    @property
+    def models(self) -> Tuple[str, ...]:
+        """models the scores depend on, e.g. to key cached scores"""
+        return (
+            VoiceAnalyzerService.PRONUNCIATION_MODEL,
+            VoiceAnalyzerService.FLUENCY_MODEL,
+            VoiceAnalyzerService.VOICE_CLASSIFICATION_MODEL,
+        )
+
+    async def score(self, audio: AudioBuffer) -> AudioScores:
+        """score the recording without blocking the event loop"""
+        resampled = await asyncio.to_thread(audio.resample, SAMPLE_RATE)
+        return await self._batcher.submit(resampled.samples)
+
+    async def _score_batch(self, waveforms: List[np.ndarray]) -> List[AudioScores]:
+        logger.info("scoring batch of %s recording(s)", len(waveforms))
+
+        if self.workers <= 0:
+            return await asyncio.to_thread(
+                _score_recordings,
+                waveforms,
+                self.batch_size,
+                self.voice_analyzer_service
+            )
+
+        if self._pool is None:
+            await self.start()
+
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, _score_recordings, waveforms, self.batch_size)
+        except BrokenProcessPool:
+            logger.error("audio scoring worker died, restarting the pool")
+            await self._restart(pool)
+
+        return await loop.run_in_executor(self._pool, _score_recordings, waveforms, self.batch_size)
+
+    async def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """replace the broken pool, once for every batch that was running on it"""
+        async with self._restart_lock:
+            if self._pool is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            await self.start()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,32 @@
+from typing import Dict
+
+from langchain_groq import ChatGroq
+
+from src.services.api_manager import APIManager
+
+
+class ChatGroqClients:
+    """
+        One ChatGroq per key of the pool, since the key of a ChatGroq can't be
+        swapped once it is built. The sdk retries are off, `APIManager.run`
+        retries a rate limited or failed request with another key, and every
+        response reports the budget left on its key to the pool.
+    """
+
+    def __init__(self, api_manager: APIManager, model: str):
+        self.api_manager = api_manager
+        self.model = model
+        self._clients: Dict[str, ChatGroq] = {}
+
+    def get(self, api_key: str) -> ChatGroq:
+        if api_key not in self._clients:
+            self._clients[api_key] = ChatGroq(
+                model_name=self.model,
+                api_key=api_key,
+                http_async_client=self.api_manager.http_client(api_key),
+                temperature=0.2,
+                max_retries=0,
+                max_tokens=8192,
+                cache=False,
+            )
+        return self._clients[api_key]
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import re
+from typing import Awaitable, Callable, List, Tuple
+
+from src.common.audio_buffer import AudioBuffer
+from src.common.audio_processor import AudioProcessor
+
+logger = logging.getLogger("chunked_transcriber")
+
+
+class ChunkedTranscriber:
+    """
+        Transcribes long recordings as several shorter requests sent
+        concurrently, so the latency stays that of one chunk and no request
+        goes past a provider's file size limit.
+
+        The recording is cut in the middle of the last pause (silence
+        detected like `AudioProcessor.remove_silence_from_buffer`) before
+        `max_chunk_seconds`. Without a pause the chunk is cut hard and the
+        next one starts `overlap_seconds` earlier, so the word cut in two is
+        heard whole at least once; the words transcribed twice are dropped
+        when the texts are stitched back together in order.
+    """
+
+    def __init__(
+        self,
+        max_chunk_seconds: float = 120,
+        min_chunk_seconds: float = 30,
+        overlap_seconds: float = 1.0,
+        max_concurrency: int = 4,
+        silence_thresh: int = -40,
+        min_silence_len: int = 300,
+        max_overlap_words: int = 8
+    ):
+        self.max_chunk_seconds = max_chunk_seconds
+        self.min_chunk_seconds = min(min_chunk_seconds, max_chunk_seconds)
+        self.overlap_seconds = overlap_seconds
+        self.max_concurrency = max_concurrency
+        self.silence_thresh = silence_thresh
+        self.min_silence_len = min_silence_len
+        self.max_overlap_words = max_overlap_words
+
+    def needs_split(self, audio: AudioBuffer) -> bool:
+        return audio.duration_seconds > self.max_chunk_seconds
+
+    def split(self, audio: AudioBuffer) -> List[Tuple[AudioBuffer, bool]]:
+        """
+            chunks of the audio (views, the samples aren't copied), each with
+            whether it overlaps the previous chunk
+        """
+        total_ms = round(1000 * len(audio.samples) / audio.sample_rate)
+        max_ms = int(self.max_chunk_seconds * 1000)
+        min_ms = int(self.min_chunk_seconds * 1000)
+        overlap_ms = min(int(self.overlap_seconds * 1000), max_ms // 2)
+
+        ranges = AudioProcessor.detect_nonsilent_ranges(
+            audio.samples,
+            audio.sample_rate,
+            min_silence_len=self.min_silence_len,
+            silence_thresh=self.silence_thresh
+        )
+        # middle of every pause between two spoken ranges
+        pauses = (ranges[:-1, 1] + ranges[1:, 0]) // 2
+
+        bounds: List[Tuple[int, int, bool]] = []
+        start, overlapped = 0, False
+        while total_ms - start > max_ms:
+            limit = start + max_ms
+            candidates = pauses[(pauses >= start + min_ms) & (pauses <= limit)]
+
+            if len(candidates):
+                end = int(candidates[-1])
+                bounds.append((start, end, overlapped))
+                start, overlapped = end, False
+            else:
+                bounds.append((start, limit, overlapped))
+                start, overlapped = limit - overlap_ms, overlap_ms > 0
+
+        bounds.append((start, total_ms, overlapped))
+
+        def to_sample(ms: int) -> int:
+            return min(int(ms * (audio.sample_rate / 1000.0)), len(audio.samples))
+
+        return [
+            (AudioBuffer(audio.samples[to_sample(start):to_sample(end)], audio.sample_rate), overlapped)
+            for start, end, overlapped in bounds
+        ]
+
+    async def transcribe(
+        self,
+        audio: AudioBuffer,
+        transcribe_chunk: Callable[[AudioBuffer], Awaitable[str]]
+    ) -> str:
+        """transcribe the chunks with `transcribe_chunk`, at most `max_concurrency` at a time"""
+        chunks = await asyncio.to_thread(self.split, audio)
+        logger.info(
+            "transcribing %.1fs of audio as %d chunks",
+            audio.duration_seconds,
+            len(chunks)
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(chunk: AudioBuffer) -> str:
+            async with semaphore:
+                return await transcribe_chunk(chunk)
+
+        texts = await asyncio.gather(*[run(chunk) for chunk, _ in chunks])
+
+        return self.stitch(texts, [overlapped for _, overlapped in chunks])
+
+    def stitch(self, texts: List[str], overlapped: List[bool]) -> str:
+        """join the chunk texts, dropping the words an overlapping chunk repeats"""
+        words: List[str] = []
+        for text, overlaps in zip(texts, overlapped):
+            chunk_words = text.split()
+            if overlaps:
+                chunk_words = chunk_words[self._repeated_words(words, chunk_words):]
+            words.extend(chunk_words)
+        return " ".join(words)
+
+    def _repeated_words(self, previous: List[str], current: List[str]) -> int:
+        """number of leading words of `current` that repeat the end of `previous`"""
+        previous_tail = [self._normalize(word) for word in previous[-self.max_overlap_words:]]
+        current_head = [self._normalize(word) for word in current[:self.max_overlap_words]]
+
+        for size in range(min(len(previous_tail), len(current_head)), 0, -1):
+            if previous_tail[-size:] == current_head[:size]:
+                return size
+        return 0
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        # a word cut at a chunk edge may come back with other casing or punctuation
+        return re.sub(r"[^\w']", "", word.lower())
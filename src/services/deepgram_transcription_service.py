@@ -1,5 +1,7 @@
 import os
 from deepgram import DeepgramClient, FileSource, PrerecordedOptions
+from typing import Literal
+from src.common.audio_source import AudioSource, read_audio
 from src.interfaces import ITranscriber
 
 
@@ -7,11 +9,14 @@ class DeepgramTranscriptionService(ITranscriber):
     def __init__(self, token=os.getenv('DEEPGRAM_TOKEN')):
         self.deepgram = DeepgramClient(api_key=token)
     
-    async def transcribe(self, audio_path: str):
+    async def transcribe(
+        self,
+        audio: AudioSource,
+        model: str = "nova-2",
+        language: Literal['en', 'tl'] = 'en'
+    ):
         try:
-
-            with open(audio_path, "rb") as file:
-                buffer_data = file.read()
+            _, buffer_data = await read_audio(audio)
 
             payload: FileSource = {
                 "buffer": buffer_data,
@@ -19,7 +24,8 @@ class DeepgramTranscriptionService(ITranscriber):
 
             #STEP 2: Configure Deepgram options for audio analysis
             options = PrerecordedOptions(
-                model="nova-2",
+                model=model or "nova-2",
+                language=language,
                 smart_format=False,
                 punctuate=False
             )
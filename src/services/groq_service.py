@@ -11,28 +11,32 @@ class GroqService(ILLM):
         self,
         api_manager: APIManager
     ):
-        self.client = AsyncGroq(max_retries=3)
+        # a rate limited request is retried with another key by the key
+        # pool, not by the sdk on the same key
+        self.client = AsyncGroq(max_retries=0)
         self.api_manager = api_manager
     
     async def chat(self, prompt: str):
-        try:
-            api_key = self.api_manager.get_next_key()
-            self.client.api = api_key
-
-            logger.info("api_key_used for chat: %s", api_key)
+        async def request(api_key: str):
+            logger.info("api_key_used for chat: %s", APIManager.mask(api_key))
 
-            completion = await self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": prompt
-                    }
-                ],
-                model="llama3-70b-8192",
-                max_tokens=8192,
-                temperature=0.5
-            )
+            response = await self.client.with_options(api_key=api_key) \
+                .chat.completions.with_raw_response.create(
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": prompt
+                        }
+                    ],
+                    model="llama3-70b-8192",
+                    max_tokens=8192,
+                    temperature=0.5
+                )
+            self.api_manager.update(api_key, response.headers)
+            return response.parse()
 
+        try:
+            completion = await self.api_manager.run(request)
             return completion.choices[0].message.content
         except Exception as err:
             raise Exception(err) from err
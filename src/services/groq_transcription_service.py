@@ -1,4 +1,5 @@
 import logging
+from src.common.audio_source import AudioSource, read_audio
 from src.interfaces import ITranscriber
 from groq import AsyncGroq
 from src.services.api_manager import APIManager
@@ -18,22 +19,30 @@ class GroqTranscriptionService(ITranscriber):
 
     async def transcribe(
         self,
-        audio_path: str,
+        audio: AudioSource,
         model: Literal[
             'whisper-large-v3',
             'distil-whisper-large-v3-en'
         ] = 'whisper-large-v3',
         language: Literal['en', 'tl'] = 'tl'
     ):
-        api_key = self.api_manager.get_next_key()
-        self.client.api_key = api_key
-        logger.info("api_key_used: %s", self.client.api_key)
+        file_name, data = await read_audio(audio)
 
-        file = open(audio_path, 'rb')
+        async def request(api_key: str):
+            # a copy per request (sharing the connection pool): concurrent
+            # requests, e.g. the chunks of a recording, each keep their own
+            # key. a rate limited key is retried with another one by the key
+            # pool instead of by the sdk
+            client = self.client.with_options(api_key=api_key, max_retries=0)
+            logger.info("api_key_used: %s", APIManager.mask(api_key))
 
-        transcription = await self.client.audio.transcriptions.create(
-            file=(audio_path, file.read()),
-            model=model,
-            language=language
-        )
+            response = await client.audio.transcriptions.with_raw_response.create(
+                file=(file_name, data),
+                model=model,
+                language=language
+            )
+            self.api_manager.update(api_key, response.headers)
+            return response.parse()
+
+        transcription = await self.api_manager.run(request)
         return transcription.text
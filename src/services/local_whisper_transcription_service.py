@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+import torch
+from transformers import pipeline
+
+from src.common.audio_buffer import AudioBuffer
+from src.common.audio_source import AudioSource, read_audio
+from src.common.micro_batcher import MicroBatcher
+from src.interfaces import ITranscriber
+
+logger = logging.getLogger("local_whisper_transcription_service")
+
+# sample rate the whisper feature extractor expects
+SAMPLE_RATE = 16000
+
+
+class LocalWhisperTranscriptionService(ITranscriber):
+    """
+        Transcribes on this machine with a whisper model run by the
+        transformers speech recognition pipeline, as a fallback when the
+        remote providers are down or rate limited.
+
+        Every model is loaded once and kept warm. Recordings submitted while
+        the model is busy are transcribed together as one batch of up to
+        `batch_size` recordings, one batcher per model and language.
+    """
+
+    def __init__(
+        self,
+        model: str = "openai/whisper-small",
+        batch_size: int = 4,
+        device: str = "cpu",
+        chunk_length_s: int = 30
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.device = device
+        self.chunk_length_s = chunk_length_s
+        self._pipelines: Dict[str, object] = {}
+        self._load_lock = threading.Lock()
+        self._batchers: Dict[Tuple[str, str], MicroBatcher[np.ndarray, str]] = {}
+
+    def load(self, model: Optional[str] = None):
+        """speech recognition pipeline of the model, only the first call loads it"""
+        model = model or self.model
+        with self._load_lock:
+            if model not in self._pipelines:
+                logger.info("loading local transcription model %s...", model)
+                self._pipelines[model] = pipeline(
+                    "automatic-speech-recognition",
+                    model=model,
+                    device=self.device,
+                    # recordings longer than the 30s whisper window are
+                    # transcribed as strided chunks
+                    chunk_length_s=self.chunk_length_s
+                )
+            return self._pipelines[model]
+
+    async def start(self) -> None:
+        """load the default model upfront so the first request doesn't pay for it"""
+        await asyncio.to_thread(self.load)
+
+    async def transcribe(
+        self,
+        audio: AudioSource,
+        model: Optional[str] = None,
+        language: Literal['en', 'tl'] = 'tl'
+    ) -> str:
+        model = model or self.model
+
+        if not isinstance(audio, AudioBuffer):
+            _, data = await read_audio(audio)
+            audio = await asyncio.to_thread(AudioBuffer.from_bytes, data)
+        resampled = await asyncio.to_thread(audio.resample, SAMPLE_RATE)
+
+        return await self._batcher(model, language).submit(resampled.samples)
+
+    def _batcher(self, model: str, language: str) -> MicroBatcher[np.ndarray, str]:
+        key = (model, language)
+        if key not in self._batchers:
+            self._batchers[key] = MicroBatcher[np.ndarray, str](
+                lambda waveforms: asyncio.to_thread(
+                    self._transcribe_batch,
+                    waveforms,
+                    model,
+                    language
+                ),
+                max_batch_size=self.batch_size
+            )
+        return self._batchers[key]
+
+    def _transcribe_batch(self, waveforms: List[np.ndarray], model: str, language: str) -> List[str]:
+        logger.info("transcribing batch of %s recording(s) with %s", len(waveforms), model)
+        recognizer = self.load(model)
+
+        # english-only checkpoints (*.en) reject a language
+        generate_kwargs = {} if model.endswith(".en") else {
+            "language": language,
+            "task": "transcribe"
+        }
+
+        with torch.inference_mode():
+            results = recognizer(
+                [{"raw": waveform, "sampling_rate": SAMPLE_RATE} for waveform in waveforms],
+                batch_size=len(waveforms),
+                generate_kwargs=generate_kwargs
+            )
+
+        return [result["text"].strip() for result in results]
@@ -1,7 +1,7 @@
 import os
 import logging
 from src.services.api_manager import APIManager
-from langchain_groq import ChatGroq
+from src.services.chat_groq_clients import ChatGroqClients
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
@@ -28,28 +28,14 @@ class QuoteTranslationResult(BaseModel):
 class QuoteTranslationService:
     def __init__(self, api_manager: APIManager, model: str = 'llama3-70b-8192'):
         self.api_manager: APIManager = api_manager
-        self.client = ChatGroq(
-            model_name=model,
-            temperature=0.2,
-            max_retries=3,
-            max_tokens=8192,
-            cache=False,
-        )
-        self.structured_llm = self.client.with_structured_output(
-            QuoteTranslationResult, 
-            method='function_calling'
-        )
+        self.model = model
+        self._clients = ChatGroqClients(api_manager, model)
 
     async def evaluate(
         self,
         transcription: str,
         quote: str
     ) -> QuoteTranslationResult:
-        api_key = self.api_manager.get_next_key()
-        self.client.groq_api_key = api_key
-
-        logger.info("API Key used for Quote Interpretation: %s", api_key)
-
         parser = PydanticOutputParser(pydantic_object=QuoteTranslationResult)
         raw_prompt = get_prompt_raw(
             os.path.join('src', 'prompts', 'quote_translation', 'system.md')
@@ -62,12 +48,17 @@ class QuoteTranslationService:
             },
         )
 
-        # And a query intended to prompt a language model to populate the data structure.
-        prompt_and_model = prompt | self.client
-        output = await prompt_and_model.ainvoke({
-            "quote": quote,
-            "interpretation": transcription
-        })
+        async def request(api_key: str):
+            logger.info("API Key used for Quote Interpretation: %s", APIManager.mask(api_key))
+
+            # And a query intended to prompt a language model to populate the data structure.
+            prompt_and_model = prompt | self._clients.get(api_key)
+            return await prompt_and_model.ainvoke({
+                "quote": quote,
+                "interpretation": transcription
+            })
+
+        output = await self.api_manager.run(request)
         response: QuoteTranslationResult = await parser.ainvoke(output)
 
         return response
\ No newline at end of file
@@ -1,7 +1,7 @@
 import os
 import logging
 from src.services.api_manager import APIManager
-from langchain_groq import ChatGroq
+from src.services.chat_groq_clients import ChatGroqClients
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel
@@ -21,26 +21,14 @@ class ScriptReadingService:
         model: str = 'llama3-70b-8192'
     ):
         self.api_manager = api_manager
-        self.client = ChatGroq(
-            model_name=model,
-            temperature=0.2,
-            max_retries=3,
-            max_tokens=8192,
-            cache=False,
-        )
-        self.structured_llm = self.client.with_structured_output(
-            ScriptReadingEvaluationResult, 
-            method='function_calling'
-        )
+        self.model = model
+        self._clients = ChatGroqClients(api_manager, model)
 
     async def evaluate(
         self,
         transcription: str,
         given_script: str
     ) -> ScriptReadingEvaluationResult:
-        groq_api_key = self.api_manager.get_next_key()
-        self.client.groq_api_key = groq_api_key
-        logger.info("API Used for Script Reading GROQ: %s", groq_api_key)
         parser = PydanticOutputParser(
             pydantic_object=ScriptReadingEvaluationResult
         )
@@ -55,12 +43,17 @@ class ScriptReadingService:
             },
         )
 
-        # And a query intended to prompt a language model to populate the data structure.
-        prompt_and_model = prompt | self.client
+        async def request(groq_api_key: str):
+            logger.info("API Used for Script Reading GROQ: %s", APIManager.mask(groq_api_key))
+
+            # And a query intended to prompt a language model to populate the data structure.
+            prompt_and_model = prompt | self._clients.get(groq_api_key)
+
+            return await prompt_and_model.ainvoke({
+                "transcription": transcription,
+                "given_script": given_script
+            })
 
-        output = await prompt_and_model.ainvoke({
-            "transcription": transcription,
-            "given_script": given_script 
-        })
+        output = await self.api_manager.run(request)
         response: ScriptReadingEvaluationResult = await parser.ainvoke(output)
         return response
\ No newline at end of file
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.common.audio_source import AudioSource
+from src.interfaces import ITranscriber
+
+logger = logging.getLogger("transcription_router")
+
+
+class ProviderStats:
+    """rolling latency and error statistics of one transcription provider"""
+
+    def __init__(self, window: int = 50):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.unavailable_until = 0.0
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+
+    def p95(self) -> Optional[float]:
+        """95th percentile latency of the recent successful requests"""
+        if len(self.latencies) < 5:
+            return None
+        return float(np.percentile(self.latencies, 95))
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def available(self, now: float) -> bool:
+        return now >= self.unavailable_until
+
+
+class TranscriptionRouter:
+    """
+        Sends a transcription to the preferred healthy provider and falls back
+        to the next ones.
+
+        - failover: when a provider fails, the next provider is tried right
+          away. after `max_failures` failures in a row (e.g. rate limited) a
+          provider is skipped for `cooldown` seconds, and providers failing
+          more than `max_error_rate` of their recent requests are tried
+          after the healthy ones.
+        - hedging: when a provider hasn't answered within its recent p95
+          latency (at least `min_hedge_delay`, `default_hedge_delay` until
+          enough requests were measured), the same audio is also sent to the
+          next provider and the first answer wins, the slower request is
+          cancelled.
+
+        `routes` lists (provider name, model) pairs in order of preference,
+        each provider name being a key of `clients`.
+    """
+
+    def __init__(
+        self,
+        clients: Dict[str, ITranscriber],
+        routes: List[Tuple[str, str]],
+        min_hedge_delay: float = 5.0,
+        default_hedge_delay: float = 30.0,
+        max_failures: int = 3,
+        cooldown: float = 60.0,
+        max_error_rate: float = 0.5,
+        window: int = 50
+    ):
+        self.clients = clients
+        self.routes = routes
+        self.min_hedge_delay = min_hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.max_error_rate = max_error_rate
+        self.stats: Dict[str, ProviderStats] = {
+            provider: ProviderStats(window) for provider, _ in routes
+        }
+
+    @property
+    def models(self) -> Tuple[str, ...]:
+        """models a transcription may come from, e.g. to key cached transcriptions"""
+        return tuple(model for _, model in self.routes)
+
+    def hedge_delay(self, provider: str) -> float:
+        p95 = self.stats[provider].p95()
+        if p95 is None:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, p95)
+
+    def ranked_routes(self) -> List[Tuple[str, str]]:
+        """routes in order of preference, error prone and cooling down providers last"""
+        now = time.monotonic()
+
+        def health(route: Tuple[str, str]) -> int:
+            stats = self.stats[route[0]]
+            if not stats.available(now):
+                return 2
+            # a couple of errors are not a trend yet
+            if len(stats.outcomes) >= 5 and stats.error_rate() > self.max_error_rate:
+                return 1
+            return 0
+
+        # sorting is stable, the preference order holds among equals
+        return sorted(self.routes, key=health)
+
+    async def transcribe(self, audio: AudioSource, language: str = 'en') -> str:
+        routes = self.ranked_routes()
+        running: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+
+        try:
+            while routes or running:
+                if routes:
+                    provider, model = routes.pop(0)
+                    running[asyncio.create_task(
+                        self._request(provider, model, audio, language)
+                    )] = provider
+                    timeout = self.hedge_delay(provider) if routes else None
+                else:
+                    timeout = None
+
+                done, _ = await asyncio.wait(
+                    running.keys(),
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    logger.warning(
+                        "%s is slow, hedging with %s",
+                        ", ".join(running.values()),
+                        routes[0][0]
+                    )
+                    continue
+
+                for finished in done:
+                    provider = running.pop(finished)
+                    if finished.exception() is None:
+                        return finished.result()
+
+                    last_error = finished.exception()
+                    logger.warning("transcription with %s failed: %s", provider, last_error)
+        finally:
+            for pending in running:
+                pending.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        raise Exception("Transcription failed on every provider: ", last_error)
+
+    async def _request(self, provider: str, model: str, audio: AudioSource, language: str) -> str:
+        stats = self.stats[provider]
+        start = time.monotonic()
+        try:
+            transcription = await self.clients[provider].transcribe(
+                audio,
+                model,
+                language=language
+            )
+        except asyncio.CancelledError:
+            # lost the hedge race, says nothing about the provider
+            raise
+        except Exception:
+            stats.record_failure()
+            if stats.consecutive_failures >= self.max_failures:
+                stats.unavailable_until = time.monotonic() + self.cooldown
+                logger.warning(
+                    "%s failed %s times in a row, skipping it for %ss",
+                    provider,
+                    stats.consecutive_failures,
+                    self.cooldown
+                )
+            raise
+
+        stats.record_success(time.monotonic() - start)
+        return transcription
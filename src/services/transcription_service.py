@@ -1,28 +1,94 @@
+import asyncio
+from src.common.audio_buffer import AudioBuffer, AudioFormat
+from src.common.audio_source import AudioSource, encode_for_transcription
 from src.interfaces import ITranscriber
-from typing import Dict, Literal
+from typing import Dict, Literal, Optional, Tuple
+from .chunked_transcriber import ChunkedTranscriber
+from .transcription_router import TranscriptionRouter
 
 
 class TranscriptionService:
     def __init__(
         self,
         clients: Dict[str, ITranscriber],
-        default_client: Literal["groq", "deepgram"] = "deepgram"
+        default_client: Literal["groq", "deepgram"] = "deepgram",
+        router: Optional[TranscriptionRouter] = None,
+        audio_format: Optional[AudioFormat] = None,
+        sample_rate: int = 16000,
+        chunker: Optional[ChunkedTranscriber] = None
     ):
+        """
+            with an `audio_format` (e.g. flac or opus), decoded audio is
+            downsampled to `sample_rate` and encoded in that format before it
+            is sent, instead of the full rate mp3.
+            with a `chunker`, long decoded recordings are transcribed as
+            concurrent chunks
+        """
         self.implementations = clients
         self.client = clients[default_client]
-        
+        self.router = router
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self.chunker = chunker
+
+    @property
+    def models(self) -> Tuple[str, ...]:
+        """models a routed transcription may come from"""
+        return self.router.models if self.router else ()
+
+    @property
+    def profile(self) -> Tuple[str, ...]:
+        """what a transcription depends on besides the audio, e.g. to key cached transcriptions"""
+        profile = self.models
+        if self.audio_format is not None:
+            profile += (f"{self.audio_format}@{self.sample_rate}",)
+        if self.chunker is not None:
+            profile += (f"chunks@{self.chunker.max_chunk_seconds}",)
+        return profile
+
     async def transcribe(
         self,
-        audio_path: str,
-        model: str,
-        client: Literal["groq", "deepgram", None] = None,
+        audio: AudioSource,
+        model: Optional[str] = None,
+        client: Literal["groq", "deepgram", "local", None] = None,
         language: Literal['en', 'tl'] = 'tl'
     ) -> str:
-        """function interface for transcribing audio"""
+        """
+            function interface for transcribing audio, from a file path,
+            encoded contents or an AudioBuffer. without a `client` the
+            router picks the provider (with failover and hedging) when
+            configured, the default client otherwise
+        """
+        if self.chunker is not None and isinstance(audio, AudioBuffer) \
+                and self.chunker.needs_split(audio):
+            return await self.chunker.transcribe(
+                audio,
+                lambda chunk: self._transcribe(chunk, model, client, language)
+            )
+
+        return await self._transcribe(audio, model, client, language)
+
+    async def _transcribe(
+        self,
+        audio: AudioSource,
+        model: Optional[str],
+        client: Literal["groq", "deepgram", "local", None],
+        language: Literal['en', 'tl']
+    ) -> str:
+        if self.audio_format is not None and isinstance(audio, AudioBuffer):
+            audio = await asyncio.to_thread(
+                encode_for_transcription,
+                audio,
+                self.audio_format,
+                self.sample_rate
+            )
+
         if client:
             return await self.implementations[client].transcribe(
-                audio_path,
+                audio,
                 model,
                 language=language
             )
-        return await self.client.transcribe(audio_path)
+        if self.router is not None:
+            return await self.router.transcribe(audio, language=language)
+        return await self.client.transcribe(audio)
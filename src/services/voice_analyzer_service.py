@@ -1,19 +1,104 @@
 from transformers import pipeline
-from typing import Tuple
+from typing import Dict, List, Tuple
+import numpy as np
+import torch
 import os
 
 class VoiceAnalyzerService:
+    PRONUNCIATION_MODEL = "jeromesky/pronunciation_accuracy_v1.0.3"
+    FLUENCY_MODEL = "jeromesky/consistency_accuracy_v1.0.3"
+    VOICE_CLASSIFICATION_MODEL = "models/pronunciation_v3"
+
     def __init__(self):
-        token = os.getenv('HF_TOKEN')
-        self.pronunciation_analyzer = pipeline(model="jeromesky/pronunciation_accuracy_v1.0.3", task="audio-classification", token=token)
-        self.fluency_analyzer = pipeline("audio-classification", model="jeromesky/consistency_accuracy_v1.0.3", token=token)
-        self.voice_classification_analyzer = pipeline(model='models/pronunciation_v3', task="audio-classification")
+        self.token = os.getenv('HF_TOKEN')
+        self.pronunciation_analyzer = None
+        self.fluency_analyzer = None
+        self.voice_classification_analyzer = None
+
+    def load(self) -> "VoiceAnalyzerService":
+        """load the classification pipelines, only the first call downloads and initializes the models"""
+        if self.pronunciation_analyzer is None:
+            self.pronunciation_analyzer = pipeline(model=self.PRONUNCIATION_MODEL, task="audio-classification", token=self.token)
+            self.fluency_analyzer = pipeline("audio-classification", model=self.FLUENCY_MODEL, token=self.token)
+            self.voice_classification_analyzer = pipeline(model=self.VOICE_CLASSIFICATION_MODEL, task="audio-classification")
+        return self
 
     def calculate_score(self, input_path: str) -> Tuple[int, int, int]:
+        self.load()
+
         pronunciation_scores = self.pronunciation_analyzer(input_path)
         fluency_scores = self.fluency_analyzer(input_path)
         voice_classification_scores = self.voice_classification_analyzer(input_path)
 
+        return self.labels_to_scores(
+            pronunciation_scores,
+            fluency_scores,
+            voice_classification_scores
+        )
+
+    def calculate_scores(
+        self,
+        waveforms: List[np.ndarray],
+        sampling_rate: int = 16000,
+        batch_size: int = 1
+    ) -> List[Tuple[int, int, int]]:
+        """
+            score many mono waveforms, every classifier runs once per batch of
+            `batch_size` recordings. the pipelines pad every recording of a
+            batch with silence up to the longest one, so the recordings are
+            sorted by length before being batched and the scores put back in
+            input order. with a batch of 1 nothing is padded.
+        """
+        self.load()
+
+        if len(waveforms) == 0:
+            return []
+
+        order = sorted(range(len(waveforms)), key=lambda i: len(waveforms[i]))
+        results: List[Tuple[int, int, int]] = [None] * len(waveforms)
+
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                indices = order[start:start + batch_size]
+                batch = [waveforms[i] for i in indices]
+
+                pronunciation_scores = self.pronunciation_analyzer(
+                    self._as_inputs(batch, sampling_rate),
+                    batch_size=len(batch)
+                )
+                fluency_scores = self.fluency_analyzer(
+                    self._as_inputs(batch, sampling_rate),
+                    batch_size=len(batch)
+                )
+                voice_classification_scores = self.voice_classification_analyzer(
+                    self._as_inputs(batch, sampling_rate),
+                    batch_size=len(batch)
+                )
+
+                for position, index in enumerate(indices):
+                    results[index] = self.labels_to_scores(
+                        pronunciation_scores[position],
+                        fluency_scores[position],
+                        voice_classification_scores[position]
+                    )
+
+        return results
+
+    @staticmethod
+    def _as_inputs(waveforms: List[np.ndarray], sampling_rate: int) -> List[Dict]:
+        # the pipeline pops the keys of every input dict, build new ones per call
+        return [
+            {"raw": waveform, "sampling_rate": sampling_rate}
+            for waveform in waveforms
+        ]
+
+    @staticmethod
+    def labels_to_scores(
+        pronunciation_scores: List[Dict],
+        fluency_scores: List[Dict],
+        voice_classification_scores: List[Dict]
+    ) -> Tuple[int, int, int]:
+        """map the top label of each classifier to its 1-5 score"""
         pronunciation_max_score_label = max(pronunciation_scores, key=lambda x: x['score'])['label']
         fluency_max_score_label = max(fluency_scores, key=lambda x: x['score'])['label']
         voice_classification_label = max(voice_classification_scores, key=lambda x: x['score'])['label']
@@ -28,7 +113,7 @@ class VoiceAnalyzerService:
             pronunciation = 1
 
         if fluency_max_score_label == 'Influent':
-            fluency = 1 
+            fluency = 1
         elif fluency_max_score_label == 'Average':
             fluency = 3
         elif fluency_max_score_label == 'Fluent':
@@ -40,7 +125,5 @@ class VoiceAnalyzerService:
             voice_classification = 5
         else:
             voice_classification = 1
-        
-        return pronunciation, fluency, voice_classification
 
-            
\ No newline at end of file
+        return pronunciation, fluency, voice_classification
@@ -1,10 +1,15 @@
-from typing import Literal
+import asyncio
+import time
+from typing import List, Literal, Optional, Tuple
 
 from src.enums import BubbleRecordStatus
 from src.lark import BitableManager
 
 
 class BubbleDataStore:
+    # fields holding which worker processes a record and until when (ms epoch)
+    WORKER_ID_FIELD = "worker_id"
+    LEASE_EXPIRES_AT_FIELD = "lease_expires_at"
 
     def __init__(self, table_id: str, base_manager: BitableManager):
         self.table_id: str = table_id
@@ -13,7 +18,7 @@ class BubbleDataStore:
     async def update_status(
         self,
         record_id: str,
-        status: Literal["done", "failed", "file deleted", "invalid audio url", "audio_less_than_20_secs", "script error"]
+        status: Literal["done", "failed", "file deleted", "invalid audio url", "audio too large", "audio_less_than_20_secs", "script error"]
     ):
         try:
             await self.base_manager.update_record_async(
@@ -48,5 +53,116 @@ class BubbleDataStore:
             return response
         except Exception as err:
             raise Exception("BubbleDataStore failed to get items: ", err)
-            
 
+    async def missing_claim_fields(self) -> List[str]:
+        """claim fields the table doesn't have, a claim can't be written without them"""
+        try:
+            field_names = set(await self.base_manager.list_field_names_async(self.table_id))
+        except Exception as err:
+            raise Exception("BubbleDataStore failed to list fields: ", err)
+
+        return [
+            field for field in (self.WORKER_ID_FIELD, self.LEASE_EXPIRES_AT_FIELD)
+            if field not in field_names
+        ]
+
+    async def get_claim(self, record_id: str) -> Tuple[str, float]:
+        """worker id and lease expiry (ms epoch) currently written on the record"""
+        try:
+            response = await self.base_manager.find_record(
+                table_id=self.table_id,
+                record_id=record_id
+            )
+        except Exception as err:
+            raise Exception("BubbleDataStore failed to get claim: ", err)
+
+        return self.parse_claim(response.data.record.fields)
+
+    @classmethod
+    def parse_claim(cls, fields: Optional[dict]) -> Tuple[str, float]:
+        """worker id and lease expiry (ms epoch) from the record fields"""
+        fields = fields or {}
+        worker_id = fields.get(cls.WORKER_ID_FIELD) or ""
+        if isinstance(worker_id, list):
+            # text fields may come back as rich text segments
+            worker_id = "".join(segment.get("text", "") for segment in worker_id)
+
+        try:
+            lease_expires_at = float(fields.get(cls.LEASE_EXPIRES_AT_FIELD) or 0)
+        except (TypeError, ValueError):
+            lease_expires_at = 0
+
+        return worker_id, lease_expires_at
+
+    async def _write_claim(self, record_id: str, worker_id: str, lease_expires_at: float):
+        await self.base_manager.update_record_async(
+            table_id=self.table_id,
+            record_id=record_id,
+            fields={
+                self.WORKER_ID_FIELD: worker_id,
+                self.LEASE_EXPIRES_AT_FIELD: int(lease_expires_at)
+            }
+        )
+
+    async def claim(
+        self,
+        record_id: str,
+        worker_id: str,
+        lease_duration: float,
+        confirm_delay: float = 2.0
+    ) -> bool:
+        """
+            claim the record for `lease_duration` seconds unless another
+            worker holds an unexpired lease on it.
+
+            bitable has no conditional update, so the claim is written then
+            read back after `confirm_delay` seconds: when two workers race,
+            the last write wins and the other one sees it lost. the delay has
+            to be longer than a read plus a write to the bitable api.
+        """
+        try:
+            owner, lease_expires_at = await self.get_claim(record_id)
+            if owner and owner != worker_id and lease_expires_at > _now_ms():
+                return False
+
+            await self._write_claim(
+                record_id,
+                worker_id,
+                _now_ms() + lease_duration * 1000
+            )
+            await asyncio.sleep(confirm_delay)
+
+            owner, _ = await self.get_claim(record_id)
+            return owner == worker_id
+        except Exception as err:
+            raise Exception("BubbleDataStore failed to claim record: ", err)
+
+    async def renew(self, record_id: str, worker_id: str, lease_duration: float) -> bool:
+        """extend the lease of a record still held by `worker_id`"""
+        try:
+            owner, _ = await self.get_claim(record_id)
+            if owner != worker_id:
+                return False
+
+            await self._write_claim(
+                record_id,
+                worker_id,
+                _now_ms() + lease_duration * 1000
+            )
+            return True
+        except Exception as err:
+            raise Exception("BubbleDataStore failed to renew claim: ", err)
+
+    async def release(self, record_id: str, worker_id: str) -> None:
+        """give the record back so any worker can pick it up right away"""
+        try:
+            owner, _ = await self.get_claim(record_id)
+            if owner == worker_id:
+                await self._write_claim(record_id, "", 0)
+        except Exception as err:
+            raise Exception("BubbleDataStore failed to release claim: ", err)
+
+
+def _now_ms() -> float:
+    # leases are compared across machines, so wall clock time
+    return time.time() * 1000
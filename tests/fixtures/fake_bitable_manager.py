@@ -0,0 +1,66 @@
+import asyncio
+import copy
+import random
+from types import SimpleNamespace
+from typing import Dict, List
+
+from lark_oapi.api.bitable.v1 import AppTableRecord
+
+
+class FakeBitableManager:
+    """
+        In-memory stand-in for the bitable API of `BitableManager`.
+
+        Reads and writes take a random latency up to `max_latency` seconds so
+        concurrent callers interleave like they would against lark. Updates
+        merge the given fields into the record, like the real API.
+    """
+
+    def __init__(
+        self,
+        records: List[AppTableRecord] = (),
+        max_latency: float = 0.0,
+        field_names: List[str] = ("worker_id", "lease_expires_at")
+    ):
+        self.records: Dict[str, AppTableRecord] = {
+            record.record_id: record for record in records
+        }
+        self.field_names = list(field_names)
+        self.max_latency = max_latency
+        self.writes = 0
+
+    async def _latency(self) -> None:
+        await asyncio.sleep(random.uniform(0, self.max_latency))
+
+    def add(self, record_id: str, fields: dict) -> AppTableRecord:
+        record = AppTableRecord.builder() \
+            .record_id(record_id) \
+            .fields(fields) \
+            .build()
+        self.records[record_id] = record
+        return record
+
+    async def list_field_names_async(self, table_id: str) -> List[str]:
+        await self._latency()
+        return list(self.field_names)
+
+    async def find_record(self, table_id: str, record_id: str, with_shared_url: bool = True):
+        await self._latency()
+        if record_id not in self.records:
+            raise Exception(f"bitable http request error: record {record_id} not found")
+
+        return SimpleNamespace(
+            data=SimpleNamespace(record=copy.deepcopy(self.records[record_id]))
+        )
+
+    async def update_record_async(self, table_id: str, record_id: str, fields: dict):
+        await self._latency()
+        self.records[record_id].fields.update(fields)
+        self.writes += 1
+        return SimpleNamespace(
+            data=SimpleNamespace(record=copy.deepcopy(self.records[record_id]))
+        )
+
+    async def async_get_records(self, table_id: str, filter=None, page_token=None, page_size=500):
+        await self._latency()
+        return [copy.deepcopy(record) for record in self.records.values()]
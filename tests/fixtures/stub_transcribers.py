@@ -0,0 +1,43 @@
+import asyncio
+from typing import List, Literal, Optional, Sequence, Union
+
+from src.common.audio_source import AudioSource
+from src.interfaces import ITranscriber
+
+
+class StubTranscriber(ITranscriber):
+    """
+        Local transcriber answering `text` after `delay` seconds, or raising
+        for the calls listed in `fail_on` (0 based call numbers, every call
+        when `fail_on` is True).
+    """
+
+    def __init__(
+        self,
+        text: str = "hello world",
+        delay: float = 0.0,
+        fail_on: Union[Sequence[int], bool] = ()
+    ):
+        self.text = text
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls: List[AudioSource] = []
+        self.cancelled = 0
+
+    async def transcribe(
+        self,
+        audio: AudioSource,
+        model: Optional[str] = None,
+        language: Literal['en', 'tl'] = 'tl'
+    ) -> str:
+        call = len(self.calls)
+        self.calls.append(audio)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        if self.fail_on is True or (self.fail_on is not False and call in self.fail_on):
+            raise Exception("Transcription failed: ", "stubbed failure")
+        return self.text
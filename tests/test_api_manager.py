@@ -0,0 +1,176 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+import pytest
+import src.common  # noqa: F401, has to be imported before src.services
+from src.services import ScriptReadingService
+from src.services.api_manager import APIManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RateLimitError(Exception):
+    """shaped like the groq sdk error"""
+
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers=headers)
+
+
+def test_missing_keys_are_skipped():
+    manager = APIManager(["a", None, "", "b", "a"])
+
+    assert manager.keys == ["a", "b"]
+    assert {manager.get_next_key() for _ in range(4)} == {"a", "b"}
+
+    with pytest.raises(RuntimeError):
+        APIManager([None]).get_next_key()
+
+
+def test_least_loaded_key_is_handed_out():
+    manager = APIManager(["a", "b", "c"])
+
+    async def run():
+        return [await manager.acquire() for _ in range(3)]
+
+    # every request in flight sits on its own key
+    assert sorted(asyncio.run(run())) == ["a", "b", "c"]
+
+    manager.release("b")
+    assert manager.get_next_key() == "b"
+
+
+def test_key_with_the_most_budget_left_is_preferred():
+    manager = APIManager(["a", "b"])
+    manager.update("a", {"x-ratelimit-remaining-requests": "10", "x-ratelimit-remaining-tokens": "5000"})
+    manager.update("b", {"x-ratelimit-remaining-requests": "900", "x-ratelimit-remaining-tokens": "5000"})
+
+    assert manager.get_next_key() == "b"
+
+
+def test_exhausted_budget_parks_the_key_until_reset():
+    clock = FakeClock()
+    manager = APIManager(["a", "b"], clock=clock)
+
+    manager.update("a", {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m30s"})
+
+    assert manager.get_next_key() == "b"
+    assert manager.get_next_key() == "b"
+    clock.now = 90
+    assert "a" in {manager.get_next_key(), manager.get_next_key()}
+
+
+def test_rate_limited_request_is_retried_with_another_key():
+    clock = FakeClock()
+    manager = APIManager(["a", "b"], clock=clock)
+    used = []
+
+    async def request(key: str) -> str:
+        used.append(key)
+        if key == "a":
+            raise RateLimitError({"retry-after": "12"})
+        return "ok"
+
+    async def run():
+        # "a" is least recently used, "b" was just handed out
+        manager.get_next_key()
+        return await manager.run(request)
+
+    assert asyncio.run(run()) == "ok"
+    assert used == ["a", "b"]
+    assert manager.wait_time() == 0
+    clock.now = 11
+    assert manager.get_next_key() == "b"
+
+
+class ServerError(Exception):
+    """shaped like the groq sdk error"""
+
+    def __init__(self, status_code):
+        super().__init__("server error")
+        self.status_code = status_code
+
+
+def test_transient_errors_are_retried_with_backoff():
+    manager = APIManager(["a", "b"], max_retries=2, retry_backoff=0)
+    failures = [ServerError(503), httpx.ConnectError("connection reset")]
+    used = []
+
+    async def request(key: str) -> str:
+        used.append(key)
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert asyncio.run(manager.run(request)) == "ok"
+    # every retry goes to the least recently used key
+    assert used == ["a", "b", "a"]
+
+    failures.extend([ServerError(500)] * 3)
+    with pytest.raises(ServerError):
+        asyncio.run(manager.run(request))
+
+
+def test_other_errors_are_not_retried():
+    manager = APIManager(["a", "b"])
+    used = []
+
+    async def request(key: str):
+        used.append(key)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(manager.run(request))
+    assert len(used) == 1
+
+
+class MockedAPIManager(APIManager):
+    """answers every request of its http clients locally with `handler`"""
+
+    def __init__(self, keys, handler):
+        super().__init__(keys)
+        self.handler = handler
+
+    def http_client(self, key: str, **kwargs) -> httpx.AsyncClient:
+        return super().http_client(key, transport=httpx.MockTransport(self.handler), **kwargs)
+
+
+def test_llm_responses_report_the_key_budget():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={
+                "x-ratelimit-remaining-requests": "42",
+                "x-ratelimit-remaining-tokens": "1000",
+            },
+            json={
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "llama3-70b-8192",
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": '{"evaluation": "clear reading"}'},
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        )
+
+    manager = MockedAPIManager(["a"], handler)
+    service = ScriptReadingService(api_manager=manager)
+
+    result = asyncio.run(service.evaluate(transcription="hello", given_script="hello"))
+
+    assert result.evaluation == "clear reading"
+    assert manager._states["a"].remaining_requests == 42
+    assert manager._states["a"].remaining_tokens == 1000
+    # a 429 is left to the key pool instead of being retried on the same key
+    assert service._clients.get("a").max_retries == 0
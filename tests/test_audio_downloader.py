@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from aiohttp import web
+from src.common import AudioDownloader
+from src.exceptions import AudioDownloadError, InvalidAudioUrlError, \
+    AudioTooLargeError
+
+
+async def serve(routes, run):
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await run(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def download(routes, path, **kwargs):
+    async def run(base_url):
+        downloader = AudioDownloader(backoff=0, **kwargs)
+        try:
+            return await downloader.download(base_url + path)
+        finally:
+            await downloader.close()
+
+    return asyncio.run(serve(routes, run))
+
+
+def test_downloads_the_body():
+    async def audio(_):
+        return web.Response(body=b"\x00" * 1000)
+
+    assert download([web.get("/audio.mp3", audio)], "/audio.mp3") == b"\x00" * 1000
+
+
+def test_missing_file_is_not_retried():
+    calls = []
+
+    async def missing(_):
+        calls.append(1)
+        return web.Response(status=404)
+
+    with pytest.raises(InvalidAudioUrlError):
+        download([web.get("/audio.mp3", missing)], "/audio.mp3")
+    assert len(calls) == 1
+
+
+def test_server_errors_are_retried():
+    calls = []
+
+    async def flaky(_):
+        calls.append(1)
+        if len(calls) < 3:
+            return web.Response(status=503)
+        return web.Response(body=b"audio")
+
+    assert download([web.get("/audio.mp3", flaky)], "/audio.mp3", retries=3) == b"audio"
+    assert len(calls) == 3
+
+
+def test_gives_up_after_the_last_retry():
+    async def broken(_):
+        return web.Response(status=500)
+
+    with pytest.raises(AudioDownloadError) as err:
+        download([web.get("/audio.mp3", broken)], "/audio.mp3", retries=1)
+    assert err.value.status_code == 500
+
+
+def test_rejects_bodies_over_the_limit():
+    async def chunked(request):
+        # no content length, the limit has to be enforced while streaming
+        response = web.StreamResponse()
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for _ in range(10):
+            await response.write(b"\x00" * 1024)
+        return response
+
+    with pytest.raises(AudioTooLargeError):
+        download(
+            [web.get("/audio.mp3", chunked)],
+            "/audio.mp3",
+            max_bytes=4096,
+            chunk_size=1024
+        )
+
+
+def test_rejects_content_length_over_the_limit():
+    async def large(_):
+        return web.Response(body=b"\x00" * 8192)
+
+    with pytest.raises(AudioTooLargeError):
+        download([web.get("/audio.mp3", large)], "/audio.mp3", max_bytes=4096)
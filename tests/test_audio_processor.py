@@ -1,5 +1,9 @@
+import os
+import numpy as np
 import pytest
-from src.common import AudioProcessor
+from pydub import AudioSegment
+from pydub.silence import split_on_silence
+from src.common import AudioProcessor, AudioBuffer
 
 @pytest.mark.parametrize("wpm, expected_result", [
     pytest.param(161, 4, id="test_wpm_category_returns_four"),
@@ -20,4 +24,68 @@ def test_wpm_category_score(wpm, expected_result):
 ])
 def test_pitch_consistency_score(pitch_std: float, expected_result: int):
     assert AudioProcessor.determine_pitch_consistency(pitch_std) == expected_result
-    
\ No newline at end of file
+
+def _pydub_remove_silence(audio: AudioBuffer, **params) -> AudioBuffer:
+    chunks = split_on_silence(audio.to_segment(), **params)
+    return AudioBuffer.from_segment(sum(chunks, AudioSegment.empty()))
+
+
+def _tone_with_gaps(sample_rate: int) -> AudioBuffer:
+    def tone(seconds):
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        return 0.5 * np.sin(2 * np.pi * 220 * t)
+
+    def silence(seconds):
+        return np.zeros(int(seconds * sample_rate))
+
+    return AudioBuffer(
+        np.concatenate([
+            silence(1.2), tone(0.8), silence(0.3), tone(0.5),
+            silence(2.0), tone(1.0), silence(0.7)
+        ]),
+        sample_rate
+    )
+
+
+@pytest.mark.parametrize("sample_rate", [16000, 44100, 48000])
+@pytest.mark.parametrize("params", [
+    dict(silence_thresh=-50, min_silence_len=500, keep_silence=500),
+    dict(silence_thresh=-30, min_silence_len=200, keep_silence=100),
+    dict(silence_thresh=-50, min_silence_len=1000, keep_silence=0),
+])
+def test_trim_silence_matches_pydub_on_synthetic_audio(sample_rate, params):
+    audio = _tone_with_gaps(sample_rate)
+
+    expected = _pydub_remove_silence(audio, **params)
+    trimmed = AudioProcessor.remove_silence_from_buffer(audio, **params)
+
+    assert len(trimmed.samples) == len(expected.samples)
+    assert np.allclose(trimmed.samples, expected.samples, atol=2 / 32768)
+
+
+def test_trim_silence_matches_pydub_on_sample_recording():
+    audio = AudioBuffer.from_file(os.path.join("data", "sample1.mp3"))
+    params = dict(silence_thresh=-50, min_silence_len=500, keep_silence=500)
+
+    expected = _pydub_remove_silence(audio, **params)
+    trimmed = AudioProcessor.remove_silence_from_buffer(audio, **params)
+
+    assert trimmed.duration_seconds == pytest.approx(expected.duration_seconds)
+    assert np.allclose(trimmed.samples, expected.samples, atol=2 / 32768)
+
+
+@pytest.mark.parametrize("seconds", [10, 25, 71.5, 400])
+def test_cut_say_phrases_matches_pydub_merge(seconds):
+    sample_rate = 44100
+    rng = np.random.default_rng(0)
+    audio = AudioBuffer(
+        rng.uniform(-0.5, 0.5, int(seconds * sample_rate)),
+        sample_rate
+    )
+
+    merged, _ = AudioProcessor.merge_say_phrases(audio.to_segment())
+    expected = AudioBuffer.from_segment(merged)
+    cut = AudioProcessor.cut_say_phrases_from_buffer(audio)
+
+    assert len(cut.samples) == len(expected.samples)
+    assert np.allclose(cut.samples, expected.samples, atol=2 / 32768)
@@ -0,0 +1,42 @@
+import asyncio
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import src.common  # noqa: F401, has to be imported before src.services
+from src.services import AudioScoringService, VoiceAnalyzerService
+
+
+class StubPool(Executor):
+    """stands in for the process pool, broken pools fail every job"""
+
+    def __init__(self, broken: bool):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("a worker died"))
+        else:
+            future.set_result(["scores"])
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_is_restarted_and_the_batch_retried():
+    service = AudioScoringService(VoiceAnalyzerService(), workers=1)
+    broken = StubPool(broken=True)
+    service._pool = broken
+    started = []
+
+    async def start():
+        started.append(True)
+        service._pool = StubPool(broken=False)
+
+    service.start = start
+
+    assert asyncio.run(service._score_batch([np.zeros(16)])) == ["scores"]
+    assert broken.shut_down
+    assert started == [True]
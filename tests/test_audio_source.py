@@ -0,0 +1,53 @@
+import asyncio
+import numpy as np
+import pytest
+from src.common import AudioBuffer, encode_for_transcription, read_audio
+
+
+def test_read_audio_from_every_source(tmp_path):
+    audio = AudioBuffer(np.zeros(1600, dtype=np.float32), 16000)
+    encoded = audio.encode("wav")
+    path = tmp_path / "recording.wav"
+    path.write_bytes(encoded)
+
+    async def run():
+        return await asyncio.gather(
+            read_audio(str(path)),
+            read_audio(encoded, "wav"),
+            read_audio(memoryview(encoded), "wav"),
+            read_audio(audio, "wav")
+        )
+
+    from_path, from_bytes, from_view, from_buffer = asyncio.run(run())
+
+    assert from_path == ("recording.wav", encoded)
+    assert from_bytes == ("audio.wav", encoded)
+    assert from_view == ("audio.wav", encoded)
+    # the buffer hands out its cached encoding, no copy
+    assert from_buffer[1] is encoded
+
+
+def test_compact_encoding_for_transcription():
+    t = np.arange(44100 * 2) / 44100
+    audio = AudioBuffer((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), 44100)
+
+    flac = encode_for_transcription(audio, "flac", 16000)
+    opus = encode_for_transcription(audio, "opus", 16000)
+
+    assert len(opus) < len(flac) < len(audio.encode("wav"))
+    assert AudioBuffer.from_bytes(flac).sample_rate == 16000
+
+    async def run():
+        return await asyncio.gather(read_audio(flac), read_audio(opus))
+
+    (flac_name, _), (opus_name, _) = asyncio.run(run())
+    # named after the contents, not the default format
+    assert flac_name == "audio.flac"
+    assert opus_name == "audio.ogg"
+
+
+def test_opus_needs_a_supported_sample_rate():
+    audio = AudioBuffer(np.zeros(4410, dtype=np.float32), 44100)
+
+    with pytest.raises(ValueError):
+        audio.encode("opus")
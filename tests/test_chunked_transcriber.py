@@ -0,0 +1,71 @@
+import asyncio
+import numpy as np
+import src.common  # noqa: F401, has to be imported before src.services
+from src.common import AudioBuffer
+from src.services import ChunkedTranscriber, TranscriptionService
+from tests.fixtures.stub_transcribers import StubTranscriber
+
+SAMPLE_RATE = 8000
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_split_cuts_in_the_last_pause_before_the_limit():
+    audio = AudioBuffer(
+        np.concatenate([tone(4), silence(1), tone(3), silence(1), tone(4)]),
+        SAMPLE_RATE
+    )
+    chunker = ChunkedTranscriber(max_chunk_seconds=10, min_chunk_seconds=2)
+
+    chunks = chunker.split(audio)
+
+    # cut in the middle of the second pause, at 8.5s
+    assert [round(chunk.duration_seconds, 1) for chunk, _ in chunks] == [8.5, 4.5]
+    assert [overlapped for _, overlapped in chunks] == [False, False]
+    assert sum(len(chunk.samples) for chunk, _ in chunks) == len(audio.samples)
+
+
+def test_split_without_pauses_overlaps_the_hard_cuts():
+    audio = AudioBuffer(tone(25), SAMPLE_RATE)
+    chunker = ChunkedTranscriber(max_chunk_seconds=10, overlap_seconds=1)
+
+    chunks = chunker.split(audio)
+
+    assert [round(chunk.duration_seconds, 1) for chunk, _ in chunks] == [10, 10, 7]
+    assert [overlapped for _, overlapped in chunks] == [False, True, True]
+
+
+def test_stitch_drops_the_words_repeated_by_an_overlap():
+    chunker = ChunkedTranscriber()
+
+    stitched = chunker.stitch(
+        ["the quick brown fox", "Brown fox jumps over", "the lazy dog"],
+        [False, True, False]
+    )
+
+    # only overlapping chunks are de-duplicated
+    assert stitched == "the quick brown fox jumps over the lazy dog"
+
+
+def test_long_recordings_are_transcribed_as_concurrent_chunks():
+    transcriber = StubTranscriber(text="chunk", delay=0.05)
+    service = TranscriptionService(
+        clients={"deepgram": transcriber},
+        chunker=ChunkedTranscriber(max_chunk_seconds=10, overlap_seconds=0, max_concurrency=3)
+    )
+    audio = AudioBuffer(tone(30), SAMPLE_RATE)
+
+    transcription = asyncio.run(service.transcribe(audio))
+
+    assert transcription == "chunk chunk chunk"
+    assert [round(chunk.duration_seconds) for chunk in transcriber.calls] == [10, 10, 10]
+    # short recordings go in one request
+    asyncio.run(service.transcribe(AudioBuffer(tone(5), SAMPLE_RATE)))
+    assert len(transcriber.calls) == 4
@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import logging
+from types import SimpleNamespace
+import aiohttp
+import pytest
+from aiohttp import web
+from src.common import LarkEventListener, PollScheduler, RecordRegistry, \
+    TaskQueue, Worker
+from lark_oapi.api.bitable.v1 import AppTableRecord
+
+ENCRYPT_KEY = "key"
+VERIFICATION_TOKEN = "token"
+
+
+def make_event(table_id: str, actions):
+    return {
+        "schema": "2.0",
+        "header": {
+            "event_id": "event1",
+            "token": VERIFICATION_TOKEN,
+            "event_type": "drive.file.bitable_record_changed_v1",
+            "app_id": "app"
+        },
+        "event": {
+            "table_id": table_id,
+            "action_list": [
+                {"record_id": record_id, "action": action}
+                for record_id, action in actions
+            ]
+        }
+    }
+
+
+def sign(body: bytes, signature_key: str = ENCRYPT_KEY):
+    timestamp, nonce = "1700000000", "nonce"
+    signature = hashlib.sha256(
+        (timestamp + nonce + signature_key).encode() + body
+    ).hexdigest()
+    # lower-case, as some proxies forward them
+    return {
+        "x-lark-request-timestamp": timestamp,
+        "x-lark-request-nonce": nonce,
+        "x-lark-signature": signature
+    }
+
+
+class FakeLarkQueue:
+    def __init__(self):
+        self.requested = []
+
+    async def get_items_by_ids(self, server_tasks, record_ids):
+        self.requested.extend(record_ids)
+        return [
+            AppTableRecord.builder().record_id(record_id).fields({
+                "assessment_type": server_tasks[0],
+                "no_of_retries": 0
+            }).build()
+            for record_id in record_ids
+        ]
+
+
+def post_events(events, signature_key: str = ENCRYPT_KEY):
+    task_queue = TaskQueue()
+    lark_queue = FakeLarkQueue()
+    scheduler = PollScheduler()
+    ctx = SimpleNamespace(
+        logger=logging.getLogger("test"),
+        lark_queue=lark_queue,
+        task_queue=task_queue,
+        record_registry=RecordRegistry(),
+        record_claimer=None
+    )
+    listener = LarkEventListener(
+        ctx,
+        Worker(ctx, "sr"),
+        table_id="tbl",
+        encrypt_key=ENCRYPT_KEY,
+        verification_token=VERIFICATION_TOKEN,
+        scheduler=scheduler
+    )
+
+    async def run():
+        runner = web.AppRunner(listener.application())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        statuses = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for event in events:
+                    body = json.dumps(event).encode()
+                    async with session.post(
+                        f"http://127.0.0.1:{port}/lark/events",
+                        data=body,
+                        headers=sign(body, signature_key)
+                    ) as response:
+                        statuses.append(response.status)
+        finally:
+            await listener.stop()
+            await runner.cleanup()
+        return statuses
+
+    statuses = asyncio.run(run())
+    return statuses, lark_queue, task_queue, scheduler
+
+
+def test_record_events_are_queued_and_wake_the_scheduler():
+    statuses, lark_queue, task_queue, scheduler = post_events([
+        make_event("tbl", [("rec1", "record_added"), ("rec2", "record_deleted")]),
+        make_event("other", [("rec3", "record_added")])
+    ])
+
+    assert statuses == [200, 200]
+    assert lark_queue.requested == ["rec1"]
+    assert [task.payload["record_id"] for task in task_queue.list_queued_items()] == ["rec1"]
+    assert scheduler._wake.is_set()
+
+
+def test_events_with_a_bad_signature_are_rejected():
+    statuses, lark_queue, task_queue, _ = post_events(
+        [make_event("tbl", [("rec1", "record_added")])],
+        signature_key="wrong"
+    )
+
+    assert statuses == [500]
+    assert lark_queue.requested == []
+    assert task_queue.is_empty()
+
+
+def test_listener_refuses_empty_secrets():
+    ctx = SimpleNamespace(logger=logging.getLogger("test"))
+
+    for encrypt_key, verification_token in [("", VERIFICATION_TOKEN), (ENCRYPT_KEY, "")]:
+        with pytest.raises(ValueError):
+            LarkEventListener(
+                ctx,
+                Worker(ctx, "sr"),
+                table_id="tbl",
+                encrypt_key=encrypt_key,
+                verification_token=verification_token
+            )
@@ -0,0 +1,127 @@
+import asyncio
+import re
+from types import SimpleNamespace
+from typing import List
+from lark_oapi.api.bitable.v1 import AppTableRecord
+from src.common import LarkQueue
+from src.lark import BitableManager
+
+
+def make_record(record_id: str, cursor: int) -> AppTableRecord:
+    return AppTableRecord.builder() \
+        .record_id(record_id) \
+        .fields({"auto_number": cursor}) \
+        .build()
+
+
+class HighWaterMarkBitableManager:
+    """applies the high-water mark part of the filter, ignores the rest"""
+
+    def __init__(self, records: List[AppTableRecord]):
+        self.records = records
+        self.filters = []
+
+    def _matching(self, filter: str) -> List[AppTableRecord]:
+        match = re.search(r"CurrentValue\.\[auto_number\] >= (\d+)", filter)
+        low = int(match.group(1)) if match else None
+        return [
+            record for record in self.records
+            if low is None or record.fields["auto_number"] >= low
+        ]
+
+    async def async_get_records(self, table_id: str, filter=None):
+        self.filters.append(filter)
+        return self._matching(filter)
+
+    async def iter_records(self, table_id: str, filter=None, page_size=500, sort=None):
+        records = sorted(
+            self.records,
+            key=lambda record: record.fields["auto_number"],
+            reverse=True
+        )
+        yield records[:page_size]
+
+
+def make_queue(base_manager, **kwargs) -> LarkQueue:
+    return LarkQueue(
+        base_manager=base_manager,
+        bitable_table_id="tbl",
+        version="v1",
+        environment="test",
+        **kwargs
+    )
+
+
+def test_incremental_sync_only_fetches_past_the_high_water_mark():
+    base_manager = HighWaterMarkBitableManager([make_record("rec1", 1), make_record("rec2", 2)])
+    queue = make_queue(base_manager, cursor_field="auto_number", full_sync_interval=3600)
+
+    async def run():
+        first = await queue.get_items("sr")
+        base_manager.records.append(make_record("rec3", 3))
+        second = await queue.get_items("sr")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [record.record_id for record in first] == ["rec1", "rec2"]
+    # rec2 sits on the high-water mark and is filtered later by the task queue
+    assert [record.record_id for record in second] == ["rec2", "rec3"]
+    assert ">= 2" in base_manager.filters[1]
+
+
+def test_full_sync_runs_again_after_interval():
+    base_manager = HighWaterMarkBitableManager([make_record("rec1", 1), make_record("rec2", 2)])
+    queue = make_queue(base_manager, cursor_field="auto_number", full_sync_interval=0)
+
+    async def run():
+        await queue.get_items("sr")
+        return await queue.get_items("sr")
+
+    assert len(asyncio.run(run())) == 2
+    assert all("auto_number" not in _filter for _filter in base_manager.filters)
+
+
+def test_without_cursor_field_every_sync_is_full():
+    base_manager = HighWaterMarkBitableManager([make_record("rec1", 1)])
+    queue = make_queue(base_manager)
+
+    async def run():
+        await queue.get_items("sr")
+        await queue.get_items("sr")
+
+    asyncio.run(run())
+    assert len(base_manager.filters) == 2
+    assert all("auto_number" not in _filter for _filter in base_manager.filters)
+
+
+def test_async_get_records_follows_page_tokens():
+    pages = {
+        None: (["rec1", "rec2"], True, "page2"),
+        "page2": (["rec3"], False, None),
+    }
+    requested = []
+
+    async def alist(request):
+        requested.append(request.page_token)
+        record_ids, has_more, page_token = pages[request.page_token]
+        return SimpleNamespace(
+            success=lambda: True,
+            data=SimpleNamespace(
+                items=[make_record(record_id, 0) for record_id in record_ids],
+                has_more=has_more,
+                page_token=page_token
+            )
+        )
+
+    lark_client = SimpleNamespace(client=SimpleNamespace(
+        bitable=SimpleNamespace(v1=SimpleNamespace(
+            app_table_record=SimpleNamespace(alist=alist)
+        ))
+    ))
+    base_manager = BitableManager(lark_client, bitable_token="app")
+
+    records = asyncio.run(base_manager.async_get_records("tbl"))
+
+    assert [record.record_id for record in records] == ["rec1", "rec2", "rec3"]
+    assert requested == [None, "page2"]
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Dict, List
+import numpy as np
+import src.common  # noqa: F401, has to be imported before src.services
+from src.common import AudioBuffer
+from src.services import LocalWhisperTranscriptionService
+
+
+class FakeRecognizer:
+    """stands in for the transformers pipeline, answers the length of every waveform"""
+
+    def __init__(self):
+        self.batches: List[int] = []
+        self.generate_kwargs: List[Dict] = []
+
+    def __call__(self, inputs, batch_size, generate_kwargs):
+        self.batches.append(batch_size)
+        self.generate_kwargs.append(generate_kwargs)
+        return [{"text": f" {len(item['raw'])} "} for item in inputs]
+
+
+def test_concurrent_recordings_share_a_batch():
+    service = LocalWhisperTranscriptionService(model="openai/whisper-small", batch_size=4)
+    recognizer = FakeRecognizer()
+    service._pipelines["openai/whisper-small"] = recognizer
+
+    recordings = [
+        AudioBuffer(np.zeros(16000 * seconds, dtype=np.float32), 16000)
+        for seconds in (1, 2, 3)
+    ]
+
+    async def run():
+        return await asyncio.gather(*[
+            service.transcribe(recording, language="en")
+            for recording in recordings
+        ])
+
+    assert asyncio.run(run()) == ["16000", "32000", "48000"]
+    # the first recording leaves alone, the others wait and go together
+    assert recognizer.batches == [1, 2]
+    assert recognizer.generate_kwargs[0] == {"language": "en", "task": "transcribe"}
+
+
+def test_recordings_are_resampled_for_the_model():
+    service = LocalWhisperTranscriptionService(model="openai/whisper-base.en")
+    recognizer = FakeRecognizer()
+    service._pipelines["openai/whisper-base.en"] = recognizer
+
+    audio = AudioBuffer(np.zeros(48000, dtype=np.float32), 48000)
+
+    assert asyncio.run(service.transcribe(audio)) == "16000"
+    # english only models take no language
+    assert recognizer.generate_kwargs == [{}]
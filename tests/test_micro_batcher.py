@@ -0,0 +1,39 @@
+import asyncio
+from typing import List
+from src.common import MicroBatcher
+
+
+def test_items_submitted_while_busy_are_batched_together():
+    batches: List[List[int]] = []
+
+    async def double(items: List[int]) -> List[int]:
+        batches.append(items)
+        await asyncio.sleep(0.01)
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(double, max_batch_size=4, max_concurrency=1)
+        return await asyncio.gather(*[batcher.submit(i) for i in range(6)])
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8, 10]
+    # the first item leaves immediately, the rest wait for the free slot
+    assert batches == [[0], [1, 2, 3, 4], [5]]
+
+
+def test_exception_result_only_fails_its_own_item():
+    async def validate(items: List[int]) -> List[object]:
+        return [ValueError(item) if item < 0 else item for item in items]
+
+    async def run():
+        batcher = MicroBatcher(validate, max_batch_size=4)
+        return await asyncio.gather(
+            batcher.submit(1),
+            batcher.submit(-1),
+            batcher.submit(2),
+            return_exceptions=True
+        )
+
+    first, second, third = asyncio.run(run())
+    assert first == 1
+    assert isinstance(second, ValueError)
+    assert third == 2
@@ -0,0 +1,35 @@
+import asyncio
+import time
+from src.common import PollScheduler
+
+
+def test_idle_polls_back_off_up_to_the_max_interval():
+    scheduler = PollScheduler(min_interval=1, max_interval=8, jitter=0)
+    assert [scheduler.next_delay() for _ in range(6)] == [1, 2, 4, 8, 8, 8]
+    scheduler.reset()
+    assert scheduler.next_delay() == 1
+
+
+def test_jitter_stays_within_bounds():
+    scheduler = PollScheduler(min_interval=10, max_interval=10, jitter=0.1)
+    delays = [scheduler.next_delay() for _ in range(100)]
+    assert all(9 <= delay <= 11 for delay in delays)
+
+
+def test_wake_ends_the_wait_early():
+    scheduler = PollScheduler(min_interval=10, max_interval=10)
+
+    async def run():
+        asyncio.get_running_loop().call_later(0.01, scheduler.wake)
+        start = time.perf_counter()
+        woken = await scheduler.wait()
+        return woken, time.perf_counter() - start
+
+    woken, elapsed = asyncio.run(run())
+    assert woken
+    assert elapsed < 1
+
+
+def test_wait_times_out_without_wake():
+    scheduler = PollScheduler(min_interval=0.01, max_interval=0.01)
+    assert not asyncio.run(scheduler.wait())
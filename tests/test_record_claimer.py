@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Dict
+from src.common import RecordClaimer, TaskExecutor, TaskQueue
+from src.interfaces import CallbackHandler
+from src.stores import BubbleDataStore
+from tests.fixtures.fake_bitable_manager import FakeBitableManager
+
+
+def make_claimer(base_manager: FakeBitableManager, worker_id: str, **kwargs) -> RecordClaimer:
+    return RecordClaimer(
+        BubbleDataStore(table_id="tbl", base_manager=base_manager),
+        worker_id=worker_id,
+        **kwargs
+    )
+
+
+def test_racing_workers_split_records_without_overlap():
+    base_manager = FakeBitableManager(max_latency=0.01)
+    record_ids = [f"rec{i}" for i in range(20)]
+    for record_id in record_ids:
+        base_manager.add(record_id, {"status": ""})
+
+    # the read back has to wait longer than a read plus a write
+    claimers = [
+        make_claimer(base_manager, f"node{i}", confirm_delay=0.05)
+        for i in range(3)
+    ]
+
+    async def run():
+        return await asyncio.gather(*[
+            asyncio.gather(*[claimer.claim(record_id) for record_id in record_ids])
+            for claimer in claimers
+        ])
+
+    results = asyncio.run(run())
+
+    for index in range(len(record_ids)):
+        assert sum(claimed[index] for claimed in results) == 1
+
+
+def test_expired_lease_can_be_reclaimed():
+    base_manager = FakeBitableManager()
+    base_manager.add("rec1", {
+        "worker_id": "crashed-node",
+        "lease_expires_at": int(time.time() * 1000) - 1000
+    })
+    claimer = make_claimer(base_manager, "node1", confirm_delay=0)
+
+    assert asyncio.run(claimer.claim("rec1"))
+    assert base_manager.records["rec1"].fields["worker_id"] == "node1"
+
+
+def test_active_lease_is_respected_and_release_frees_the_record():
+    base_manager = FakeBitableManager()
+    record = base_manager.add("rec1", {})
+    owner = make_claimer(base_manager, "node1", confirm_delay=0)
+    other = make_claimer(base_manager, "node2", confirm_delay=0)
+
+    async def run():
+        assert await owner.claim("rec1")
+        assert other.held_elsewhere(record.fields)
+        assert not await other.claim("rec1")
+
+        await owner.release("rec1")
+        assert not other.held_elsewhere(record.fields)
+        assert await other.claim("rec1")
+
+    asyncio.run(run())
+
+
+class RecordingHandler(CallbackHandler):
+    def __init__(self):
+        self.handled = []
+
+    async def handle(self, payload: Dict[str, str]) -> None:
+        self.handled.append(payload["record_id"])
+
+
+def test_executor_drops_tasks_claimed_by_another_worker():
+    base_manager = FakeBitableManager()
+    base_manager.add("rec1", {})
+    base_manager.add("rec2", {})
+    handler = RecordingHandler()
+    queue = TaskQueue()
+    other = make_claimer(base_manager, "node2", confirm_delay=0)
+
+    async def run():
+        assert await other.claim("rec2")
+
+        executor = TaskExecutor(
+            {"type1": handler},
+            task_queue=queue,
+            claimer=make_claimer(base_manager, "node1", confirm_delay=0)
+        )
+        queue.enqueue_many([
+            {"record_id": "rec1", "assessment_type": "type1"},
+            {"record_id": "rec2", "assessment_type": "type1"},
+        ])
+        while not queue.is_empty():
+            await executor.submit(queue.pop())
+        await executor.drain()
+
+    asyncio.run(run())
+
+    assert handler.handled == ["rec1"]
+    # both tasks are done with locally
+    assert not queue.record_ids()
+    # rec1 was released once evaluated, rec2 still belongs to the other node
+    assert base_manager.records["rec1"].fields["worker_id"] == ""
+    assert base_manager.records["rec2"].fields["worker_id"] == "node2"
+
+
+def test_missing_claim_fields_fail_the_startup_check():
+    async def check(field_names):
+        claimer = make_claimer(FakeBitableManager(field_names=field_names), "worker-a")
+        try:
+            await claimer.check_fields()
+        except RuntimeError as err:
+            return str(err)
+
+    assert asyncio.run(check(["worker_id", "lease_expires_at", "status"])) is None
+    assert "lease_expires_at" in asyncio.run(check(["worker_id", "status"]))
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+from lark_oapi.api.bitable.v1 import AppTableRecord
+from src.common import RecordRegistry, TaskQueue, Worker
+
+
+def test_in_flight_record_is_known_for_any_retry_count():
+    registry = RecordRegistry()
+    registry.mark_in_flight("rec1", 0)
+    assert registry.is_known("rec1", 0)
+    assert registry.is_known("rec1", 1)
+    assert not registry.is_known("rec2", 0)
+
+
+def test_completed_record_only_blocks_the_same_retry_count():
+    registry = RecordRegistry()
+    registry.mark_completed("rec1", 0)
+    assert registry.is_known("rec1", 0)
+    # the handler incremented the retry count, this is a genuine retry
+    assert not registry.is_known("rec1", 1)
+
+
+def test_entries_expire_and_are_bounded():
+    registry = RecordRegistry(max_size=2, ttl=0.05)
+    registry.mark_completed("rec1")
+    registry.mark_completed("rec2")
+    registry.mark_completed("rec3")
+    assert len(registry) == 2
+    assert not registry.is_known("rec1")
+    time.sleep(0.06)
+    assert not registry.is_known("rec3")
+
+
+def test_released_record_is_forgotten():
+    registry = RecordRegistry()
+    registry.mark_in_flight("rec1")
+    registry.release("rec1")
+    assert not registry.is_known("rec1")
+
+
+def test_enqueue_many_skips_known_records():
+    registry = RecordRegistry()
+    registry.mark_in_flight("rec1")
+    queue = TaskQueue(registry=registry)
+    queued = queue.enqueue_many([
+        {"assessment_type": "type1", "record_id": "rec1", "no_of_retries": 0},
+        {"assessment_type": "type1", "record_id": "rec2", "no_of_retries": 0}
+    ])
+    assert queued == 1
+    assert [task.payload["record_id"] for task in queue.list_queued_items()] == ["rec2"]
+
+
+def test_sync_filters_records_before_transforming():
+    registry = RecordRegistry()
+    registry.mark_completed("rec1", 0)
+    queue = TaskQueue(registry=registry)
+    queue.enqueue_many([{"assessment_type": "type1", "record_id": "rec2"}])
+
+    records = [
+        AppTableRecord.builder().record_id(record_id).fields({
+            "assessment_type": "type1",
+            "no_of_retries": 0
+        }).build()
+        for record_id in ["rec1", "rec2", "rec3"]
+    ]
+
+    async def get_items(_):
+        return records
+
+    ctx = SimpleNamespace(
+        logger=logging.getLogger("test"),
+        lark_queue=SimpleNamespace(get_items=get_items),
+        task_queue=queue,
+        record_registry=registry,
+        record_claimer=None
+    )
+
+    asyncio.run(Worker(ctx, "type1").sync())
+
+    assert [task.payload["record_id"] for task in queue.list_queued_items()] == ["rec2", "rec3"]
@@ -0,0 +1,86 @@
+import asyncio
+import time
+import numpy as np
+from src.common import AudioBuffer, ResultCache
+
+
+def test_identical_audio_shares_the_cache_key():
+    samples = np.linspace(-1, 1, 16000, dtype=np.float32)
+    first = AudioBuffer(samples, 16000)
+    second = AudioBuffer(samples.copy(), 16000)
+    other = AudioBuffer(samples[::-1], 16000)
+
+    assert first.content_hash == second.content_hash
+    assert first.content_hash != other.content_hash
+    assert ResultCache.key("transcription", first.content_hash, "whisper") \
+        != ResultCache.key("transcription", first.content_hash, "other-model")
+
+
+def test_get_or_compute_only_computes_once():
+    cache = ResultCache()
+    calls = []
+
+    async def transcribe():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "hello world"
+
+    async def run():
+        key = ResultCache.key("transcription", "hash")
+        # identical submissions arriving together share one computation
+        concurrent = await asyncio.gather(
+            cache.get_or_compute(key, transcribe),
+            cache.get_or_compute(key, transcribe)
+        )
+        later = await cache.get_or_compute(key, transcribe)
+        return concurrent, later
+
+    concurrent, later = asyncio.run(run())
+
+    assert concurrent == ["hello world", "hello world"]
+    assert later == "hello world"
+    assert len(calls) == 1
+    assert cache.hits == 2 and cache.misses == 1
+
+
+def test_failed_computation_is_not_cached():
+    cache = ResultCache()
+    attempts = []
+
+    async def evaluate():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("rate limited")
+        return "evaluation"
+
+    async def run():
+        try:
+            await cache.get_or_compute("key", evaluate)
+        except RuntimeError:
+            pass
+        return await cache.get_or_compute("key", evaluate)
+
+    assert asyncio.run(run()) == "evaluation"
+    assert len(attempts) == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = ResultCache(ttl=0.01)
+    cache.put("key", "value")
+    time.sleep(0.02)
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    value = "x" * 1000
+    cache = ResultCache(max_bytes=2500)
+    cache.put("a", value)
+    cache.put("b", value)
+    # reading "a" makes "b" the least recently used entry
+    time.sleep(0.01)
+    assert cache.get("a") == value
+    cache.put("c", value)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
@@ -0,0 +1,116 @@
+import asyncio
+import time
+import pytest
+from src.common import CheckpointStore, StageGraph
+
+
+def test_independent_stages_run_concurrently():
+    async def wait(seconds: float, value: str):
+        await asyncio.sleep(seconds)
+        return value
+
+    async def run():
+        stages = StageGraph()
+
+        async def combine(first: str, second: str):
+            return first + second
+
+        stages.add("first", lambda: wait(0.1, "a")) \
+            .add("second", lambda: wait(0.1, "b")) \
+            .add("combined", combine, depends_on=["first", "second"])
+        return await stages.run(), stages.timings
+
+    start = time.perf_counter()
+    results, timings = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    assert results == {"first": "a", "second": "b", "combined": "ab"}
+    assert elapsed < 0.18
+    assert set(timings) == {"first", "second", "combined"}
+
+
+def test_failure_cancels_the_remaining_stages():
+    cancelled = []
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upload failed")
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def after(fail):
+        return fail
+
+    async def run():
+        stages = StageGraph()
+        stages.add("fail", fail) \
+            .add("slow", slow) \
+            .add("after", after, depends_on=["fail"])
+        await stages.run()
+
+    with pytest.raises(ValueError, match="upload failed"):
+        asyncio.run(run())
+    assert cancelled == ["slow"]
+
+
+def test_dependencies_have_to_be_registered_first():
+    async def stage():
+        pass
+
+    with pytest.raises(ValueError):
+        StageGraph().add("after", stage, depends_on=["missing"])
+
+
+def test_checkpointed_stages_resume_after_a_restart():
+    checkpoints = CheckpointStore()
+    calls = []
+
+    def build(fail_evaluation: bool) -> StageGraph:
+        async def encode():
+            calls.append("encode")
+            return "audio.mp3"
+
+        async def transcribe(audio_path):
+            calls.append("transcribe")
+            return "hello world"
+
+        async def evaluate(transcription):
+            calls.append("evaluate")
+            if fail_evaluation:
+                raise RuntimeError("worker killed")
+            return transcription.upper()
+
+        return StageGraph("sr rec1", checkpoints=checkpoints, key="rec1") \
+            .add("audio_path", encode) \
+            .add("transcription", transcribe, depends_on=["audio_path"], checkpoint=True) \
+            .add("evaluation", evaluate, depends_on=["transcription"], checkpoint=True)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(build(fail_evaluation=True).run())
+    assert calls == ["encode", "transcribe", "evaluate"]
+
+    calls.clear()
+    results = asyncio.run(build(fail_evaluation=False).run())
+
+    # the encode only fed the restored transcription and is skipped too
+    assert calls == ["evaluate"]
+    assert results["transcription"] == "hello world"
+    assert results["evaluation"] == "HELLO WORLD"
+    assert results["audio_path"] is None
+
+    checkpoints.clear("rec1")
+    assert checkpoints.load("rec1") == {}
+
+
+def test_expired_checkpoints_are_ignored_and_pruned():
+    checkpoints = CheckpointStore(max_age=0.01)
+    checkpoints.save("rec1", "transcription", "hello")
+    time.sleep(0.02)
+
+    assert checkpoints.load("rec1") == {}
+    assert checkpoints.prune() == 1
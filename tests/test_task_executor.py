@@ -0,0 +1,133 @@
+import asyncio
+from typing import Dict
+from src.common import Task, TaskExecutor, TaskQueue
+from src.interfaces import CallbackHandler
+
+
+class SlowHandler(CallbackHandler):
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.handled = []
+
+    async def handle(self, payload: Dict[str, str]) -> None:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        self.handled.append(payload["record_id"])
+
+
+def test_executor_limits_in_flight_tasks():
+    handler = SlowHandler()
+
+    async def run():
+        executor = TaskExecutor({"type1": handler}, concurrency=2)
+        for i in range(5):
+            await executor.submit(
+                Task(payload={"record_id": f"rec{i}"}, type="type1")
+            )
+        await executor.drain()
+
+    asyncio.run(run())
+
+    assert handler.max_running == 2
+    assert sorted(handler.handled) == [f"rec{i}" for i in range(5)]
+
+
+def test_executor_tracks_running_records():
+    handler = SlowHandler()
+
+    async def run():
+        executor = TaskExecutor({"type1": handler}, concurrency=2)
+        await executor.submit(Task(payload={"record_id": "rec1"}, type="type1"))
+        assert executor.is_running("rec1")
+        await executor.drain()
+        assert not executor.is_running("rec1")
+
+    asyncio.run(run())
+
+
+def test_executor_drain_cancels_after_timeout():
+    handler = SlowHandler(delay=10)
+
+    async def run():
+        executor = TaskExecutor({"type1": handler}, concurrency=1)
+        await executor.submit(Task(payload={"record_id": "rec1"}, type="type1"))
+        return await executor.drain(timeout=0.01)
+
+    assert asyncio.run(run()) == 1
+    assert handler.handled == []
+
+
+def test_executor_acks_finished_and_releases_cancelled_tasks():
+    task_queue = TaskQueue()
+    task_queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    task_queue.push(Task(payload={"record_id": "rec2"}, type="type1"))
+
+    async def run():
+        fast = TaskExecutor({"type1": SlowHandler(delay=0)}, task_queue=task_queue)
+        await fast.submit(task_queue.pop())
+        await fast.drain()
+
+        slow = TaskExecutor({"type1": SlowHandler(delay=10)}, task_queue=task_queue)
+        await slow.submit(task_queue.pop())
+        await slow.drain(timeout=0.01)
+
+    asyncio.run(run())
+
+    # rec1 is gone, the cancelled rec2 is back in the queue without losing an attempt
+    queued = task_queue.list_queued_items()
+    assert [task.payload["record_id"] for task in queued] == ["rec2"]
+    assert queued[0].no_of_retries == 0
+
+
+def test_executor_per_type_quota_and_wait_for_slot():
+    sr_handler = SlowHandler()
+    esr_handler = SlowHandler()
+
+    async def run():
+        executor = TaskExecutor(
+            {"sr": sr_handler, "esr": esr_handler},
+            concurrency={"sr": 1, "esr": 2}
+        )
+        await executor.submit(Task(payload={"record_id": "rec1"}, type="sr"))
+
+        # sr is at its quota while esr still has room
+        assert not executor.has_capacity("sr")
+        assert executor.has_capacity("esr")
+
+        await asyncio.wait_for(executor.wait_for_slot(), timeout=1)
+        assert executor.has_capacity("sr")
+        await executor.drain()
+
+    asyncio.run(run())
+
+
+def test_wake_ends_wait_for_slot():
+    async def run():
+        executor = TaskExecutor({"type1": SlowHandler()})
+        waiting = asyncio.create_task(executor.wait_for_slot())
+        await asyncio.sleep(0)
+        executor.wake()
+        await asyncio.wait_for(waiting, timeout=1)
+
+    asyncio.run(run())
+
+
+def test_lease_is_renewed_while_the_handler_runs():
+    task_queue = TaskQueue(visibility_timeout=0.15)
+    task_queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+
+    async def run():
+        executor = TaskExecutor({"type1": SlowHandler(delay=0.5)}, task_queue=task_queue)
+        await executor.submit(task_queue.pop())
+        await asyncio.sleep(0.3)
+        # past the visibility timeout, yet not handed out to another worker
+        stolen = task_queue.pop()
+        await executor.drain()
+        return stolen
+
+    assert asyncio.run(run()) is None
+    assert task_queue.is_empty()
@@ -0,0 +1,87 @@
+import asyncio
+import numpy as np
+from src.common import AudioBuffer, Task, TaskQueue, TaskPrefetcher
+
+
+def make_queue(count: int) -> TaskQueue:
+    task_queue = TaskQueue()
+    for i in range(count):
+        task_queue.push(Task(payload={"record_id": f"rec{i}"}, type="type1"))
+    return task_queue
+
+
+def test_prefetches_up_to_depth_in_queue_order():
+    started = []
+
+    async def fetch(task: Task) -> AudioBuffer:
+        started.append(task.payload["record_id"])
+        await asyncio.sleep(0.01)
+        return AudioBuffer(np.zeros(16), 16000)
+
+    async def run():
+        prefetcher = TaskPrefetcher(make_queue(4), fetch, depth=2)
+        prefetcher.fill()
+        await asyncio.sleep(0)
+        assert started == ["rec0", "rec1"]
+
+        results = []
+        while not prefetcher.is_empty():
+            task, audio = await prefetcher.next()
+            results.append((task.payload["record_id"], audio is not None))
+        return results
+
+    assert asyncio.run(run()) == [
+        ("rec0", True), ("rec1", True), ("rec2", True), ("rec3", True)
+    ]
+
+
+def test_stops_prefetching_while_over_memory_budget():
+    async def fetch(task: Task) -> AudioBuffer:
+        # 1024 float32 samples, 4 KiB per recording
+        return AudioBuffer(np.zeros(1024), 16000)
+
+    async def run():
+        task_queue = make_queue(1)
+        prefetcher = TaskPrefetcher(task_queue, fetch, depth=3, max_bytes=4096)
+        prefetcher.fill()
+        await asyncio.sleep(0)
+
+        task_queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+        prefetcher.fill()
+        assert prefetcher.pending() == 1
+        assert task_queue.remaining() == 1
+
+        # handing out the buffered audio frees the budget again
+        task, _ = await prefetcher.next()
+        assert task.payload["record_id"] == "rec0"
+        assert prefetcher.pending() == 1
+        assert task_queue.remaining() == 0
+
+    asyncio.run(run())
+
+
+def test_failed_prefetch_hands_out_task_without_audio():
+    async def fetch(_: Task) -> AudioBuffer:
+        raise ValueError("download failed")
+
+    async def run():
+        prefetcher = TaskPrefetcher(make_queue(1), fetch)
+        return await prefetcher.next()
+
+    task, audio = asyncio.run(run())
+    assert task.payload["record_id"] == "rec0"
+    assert audio is None
+
+
+def test_close_requeues_tasks_not_handed_out():
+    async def fetch(_: Task) -> AudioBuffer:
+        await asyncio.sleep(10)
+
+    async def run():
+        task_queue = make_queue(3)
+        prefetcher = TaskPrefetcher(task_queue, fetch, depth=2)
+        prefetcher.fill()
+        await prefetcher.close()
+        return prefetcher.pending(), task_queue.remaining()
+
+    assert asyncio.run(run()) == (0, 3)
@@ -1,3 +1,4 @@
+import time
 from src.common import Task, TaskQueue
 # Pytest test cases
 def test_push_and_pop():
@@ -38,3 +39,175 @@ def test_list_queued_items():
     assert queued_items[0].payload == {"assessment_type": "type1", "data": "sample1"}
     assert queued_items[1].type == "type2"
     assert queued_items[1].payload == {"assessment_type": "type2", "data": "sample2"}
+
+def test_pop_returns_none_when_empty():
+    queue = TaskQueue()
+    assert queue.pop() is None
+    assert queue.is_empty()
+
+def test_deduplicates_by_record_id():
+    queue = TaskQueue()
+    tasks = [
+        {"assessment_type": "type1", "record_id": "rec1"},
+        {"assessment_type": "type1", "record_id": "rec1"}
+    ]
+    assert queue.enqueue_many(tasks) == 1
+    task = queue.pop()
+    # still leased, syncing the same record again is a no-op
+    assert queue.enqueue_many(tasks) == 0
+    queue.ack(task)
+    # acked tasks can be queued again, e.g. for a retry
+    assert queue.enqueue_many(tasks) == 1
+
+def test_leased_task_is_hidden_until_visibility_timeout():
+    queue = TaskQueue(visibility_timeout=0.05)
+    queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    task = queue.pop()
+    assert queue.pop() is None
+    time.sleep(0.06)
+    # the lease expired without an ack, the task is handed out again
+    redelivered = queue.pop()
+    assert redelivered.uuid == task.uuid
+    assert redelivered.no_of_retries == 1
+
+def test_nack_requeues_and_ack_removes():
+    queue = TaskQueue()
+    queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    task = queue.pop()
+    queue.nack(task)
+    assert queue.remaining() == 1
+    task = queue.pop()
+    assert task.failed_at is not None
+    queue.ack(task)
+    assert queue.remaining() == 0
+    assert queue.pop() is None
+
+def test_task_is_dead_after_max_attempts():
+    queue = TaskQueue(max_attempts=2)
+    queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    queue.nack(queue.pop())
+    queue.nack(queue.pop())
+    assert queue.pop() is None
+    # dead records are not queued again
+    assert not queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+
+def test_dead_record_is_queued_again_once_retried_in_lark():
+    queue = TaskQueue(max_attempts=1)
+    queue.enqueue_many([{"assessment_type": "type1", "record_id": "rec1", "no_of_retries": 0}])
+    queue.nack(queue.pop())
+    assert queue.pop() is None
+    # left to the sync, which only replaces the task after a retry in lark
+    assert queue.record_ids() == set()
+    assert queue.enqueue_many([{"assessment_type": "type1", "record_id": "rec1", "no_of_retries": 0}]) == 0
+    assert queue.enqueue_many([{"assessment_type": "type1", "record_id": "rec1", "no_of_retries": 1}]) == 1
+    assert queue.pop().payload["no_of_retries"] == 1
+
+def test_pop_filters_by_type():
+    queue = TaskQueue()
+    queue.enqueue_many([
+        {"assessment_type": "type1", "record_id": "rec1"},
+        {"assessment_type": "type2", "record_id": "rec2"}
+    ])
+    assert queue.remaining(["type2"]) == 1
+    assert queue.pop(["type2"]).payload["record_id"] == "rec2"
+    assert queue.pop(["type2"]) is None
+
+def test_queue_survives_restart(tmp_path):
+    path = str(tmp_path / "task_queue.db")
+    queue = TaskQueue(path=path, visibility_timeout=0.05)
+    queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    queue.push(Task(payload={"record_id": "rec2"}, type="type1"))
+    # the worker crashes while processing rec1
+    queue.pop()
+    queue.close()
+
+    restarted = TaskQueue(path=path)
+    assert restarted.pop().payload["record_id"] == "rec2"
+    time.sleep(0.06)
+    assert restarted.pop().payload["record_id"] == "rec1"
+
+def test_retries_go_behind_fresh_submissions():
+    queue = TaskQueue(retry_penalty=60)
+    queue.enqueue_many([
+        {"assessment_type": "type1", "record_id": "retried", "no_of_retries": 2},
+        {"assessment_type": "type1", "record_id": "fresh", "no_of_retries": 0}
+    ])
+    assert queue.pop().payload["record_id"] == "fresh"
+    assert queue.pop().payload["record_id"] == "retried"
+
+def test_penalised_tasks_age_ahead_of_later_submissions():
+    queue = TaskQueue(retry_penalty=0.05)
+    queue.enqueue_many([{"assessment_type": "type1", "record_id": "retried", "no_of_retries": 1}])
+    time.sleep(0.06)
+    queue.enqueue_many([{"assessment_type": "type1", "record_id": "fresh"}])
+    assert queue.pop().payload["record_id"] == "retried"
+
+def test_type_priorities_offset_the_rank():
+    queue = TaskQueue(type_priorities={"type1": 60})
+    queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    queue.push(Task(payload={"record_id": "rec2"}, type="type2"))
+    assert queue.pop().type == "type2"
+    assert queue.pop().type == "type1"
+
+def test_nack_delays_retry_with_exponential_backoff():
+    queue = TaskQueue(retry_delay=0.05, max_retry_delay=10)
+    queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    assert queue.backoff(1) == 0.05
+    assert queue.backoff(3) == 0.2
+
+    queue.nack(queue.pop())
+    # hidden during the backoff, but still known to the de-duplication
+    assert queue.pop() is None
+    assert queue.record_ids() == {"rec1"}
+    time.sleep(0.06)
+    task = queue.pop()
+    assert task.failed_at is not None
+
+    queue.nack(task, delay=0)
+    assert queue.pop().uuid == task.uuid
+
+def test_release_refunds_the_attempt_without_penalty():
+    queue = TaskQueue(max_attempts=2, retry_penalty=60, retry_delay=60)
+    queue.push(Task(payload={"record_id": "rec1"}, type="type1"))
+    # interrupted by more restarts than max_attempts, the task never failed
+    for _ in range(3):
+        queue.release(queue.pop())
+    queue.push(Task(payload={"record_id": "rec2"}, type="type1"))
+
+    task = queue.pop()
+    assert task.payload["record_id"] == "rec1"
+    assert task.no_of_retries == 0
+
+def test_records_retried_by_lark_wait_for_the_backoff():
+    queue = TaskQueue(retry_delay=0.05)
+    queue.enqueue_many([{"assessment_type": "type1", "record_id": "rec1", "no_of_retries": "1"}])
+    assert queue.pop() is None
+    time.sleep(0.06)
+    assert queue.pop().payload["record_id"] == "rec1"
+
+def test_queue_created_before_priorities_is_migrated(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "task_queue.db")
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            uuid TEXT NOT NULL UNIQUE,
+            dedup_key TEXT NOT NULL UNIQUE,
+            type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            failed_at REAL,
+            lease_expires_at REAL,
+            enqueued_at REAL NOT NULL
+        );
+        INSERT INTO tasks (uuid, dedup_key, type, payload, enqueued_at)
+        VALUES ('uuid1', 'record:rec1', 'type1', '{"record_id": "rec1"}', 1);
+    """)
+    connection.close()
+
+    queue = TaskQueue(path=path)
+    queue.push(Task(payload={"record_id": "rec2"}, type="type1"))
+    assert queue.pop().payload["record_id"] == "rec1"
+    assert queue.pop().payload["record_id"] == "rec2"
@@ -0,0 +1,92 @@
+import asyncio
+import time
+import pytest
+import src.common  # noqa: F401, has to be imported before src.services
+from src.services import TranscriptionRouter, TranscriptionService
+from tests.fixtures.stub_transcribers import StubTranscriber
+
+
+def make_router(primary: StubTranscriber, secondary: StubTranscriber, **kwargs) -> TranscriptionRouter:
+    return TranscriptionRouter(
+        clients={"primary": primary, "secondary": secondary},
+        routes=[("primary", "model-a"), ("secondary", "model-b")],
+        **kwargs
+    )
+
+
+def test_primary_answers_without_touching_the_secondary():
+    primary = StubTranscriber("from primary")
+    secondary = StubTranscriber("from secondary")
+    router = make_router(primary, secondary)
+
+    assert asyncio.run(router.transcribe("audio.mp3")) == "from primary"
+    assert secondary.calls == []
+
+
+def test_fails_over_to_the_secondary_right_away():
+    primary = StubTranscriber(fail_on=True)
+    secondary = StubTranscriber("from secondary")
+    router = make_router(primary, secondary, default_hedge_delay=10)
+
+    start = time.monotonic()
+    assert asyncio.run(router.transcribe("audio.mp3")) == "from secondary"
+    assert time.monotonic() - start < 1
+    assert router.stats["primary"].error_rate() == 1
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary = StubTranscriber("from primary", delay=1)
+    secondary = StubTranscriber("from secondary")
+    router = make_router(primary, secondary, default_hedge_delay=0.05)
+
+    assert asyncio.run(router.transcribe("audio.mp3")) == "from secondary"
+    assert primary.cancelled == 1
+    # losing the race is not counted as an error
+    assert router.stats["primary"].error_rate() == 0
+
+
+def test_hedge_delay_follows_the_p95_latency():
+    router = make_router(StubTranscriber(), StubTranscriber(), min_hedge_delay=0.5)
+    assert router.hedge_delay("primary") == router.default_hedge_delay
+
+    for latency in [1, 1, 1, 1, 1, 1, 1, 1, 1, 4]:
+        router.stats["primary"].record_success(latency)
+    assert 1 < router.hedge_delay("primary") < 4
+
+    for _ in range(10):
+        router.stats["primary"].record_success(0.1)
+    assert router.hedge_delay("primary") >= 0.5
+
+
+def test_failing_provider_cools_down():
+    primary = StubTranscriber(fail_on=True)
+    secondary = StubTranscriber("from secondary")
+    router = make_router(primary, secondary, max_failures=2, cooldown=60)
+
+    async def run():
+        for _ in range(3):
+            await router.transcribe("audio.mp3")
+
+    asyncio.run(run())
+
+    # skipped after the second failure in a row
+    assert len(primary.calls) == 2
+    assert router.ranked_routes()[0][0] == "secondary"
+
+
+def test_every_provider_failing_raises():
+    router = make_router(StubTranscriber(fail_on=True), StubTranscriber(fail_on=True))
+
+    with pytest.raises(Exception, match="every provider"):
+        asyncio.run(router.transcribe("audio.mp3"))
+
+
+def test_transcription_service_uses_the_router_without_client():
+    groq = StubTranscriber("from groq")
+    service = TranscriptionService(
+        clients={"groq": groq, "deepgram": StubTranscriber("from deepgram")},
+        router=TranscriptionRouter({"groq": groq}, [("groq", "whisper")])
+    )
+
+    assert asyncio.run(service.transcribe("audio.mp3", language="en")) == "from groq"
+    assert service.models == ("whisper",)
@@ -0,0 +1,46 @@
+from typing import Dict, List
+import numpy as np
+import src.common  # noqa: F401, has to be imported before src.services
+from src.services import VoiceAnalyzerService
+
+# label of every recording length, so a result put back at the wrong index shows up
+LABELS = {1000: "Poor", 2000: "Average", 3000: "Excellent"}
+
+
+class StubClassifier:
+    """stands in for an audio-classification pipeline, labels every input by its length"""
+
+    def __init__(self, labels: Dict[int, str]):
+        self.labels = labels
+        self.batches: List[List[int]] = []
+
+    def __call__(self, inputs, batch_size):
+        lengths = [len(item["raw"]) for item in inputs]
+        self.batches.append(lengths)
+        return [
+            [{"label": self.labels[length], "score": 0.9}, {"label": "other", "score": 0.1}]
+            for length in lengths
+        ]
+
+
+def test_scores_come_back_in_input_order():
+    service = VoiceAnalyzerService()
+    service.pronunciation_analyzer = StubClassifier(LABELS)
+    service.fluency_analyzer = StubClassifier({1000: "Influent", 2000: "Average", 3000: "Fluent"})
+    service.voice_classification_analyzer = StubClassifier({1000: "Bad", 2000: "Good", 3000: "Good"})
+
+    waveforms = [np.zeros(length, dtype=np.float32) for length in (3000, 1000, 2000, 1000, 3000)]
+
+    scores = service.calculate_scores(waveforms, batch_size=2)
+
+    assert scores == [(5, 5, 5), (1, 1, 1), (3, 3, 5), (1, 1, 1), (5, 5, 5)]
+    # batched by length, so a batch is padded as little as possible
+    assert service.pronunciation_analyzer.batches == [[1000, 1000], [2000, 3000], [3000]]
+
+
+def test_no_recordings_no_batches():
+    service = VoiceAnalyzerService()
+    service.pronunciation_analyzer = StubClassifier(LABELS)
+
+    assert service.calculate_scores([]) == []
+    assert service.pronunciation_analyzer.batches == []
@@ -0,0 +1,30 @@
+from collections import Counter
+import pytest
+from src.common import WeightedFairSelector
+
+
+def test_turns_follow_the_weights():
+    selector = WeightedFairSelector({"sr": 2, "esr": 1})
+
+    picks = [selector.pick(["sr", "esr"]) for _ in range(6)]
+
+    assert Counter(picks) == {"sr": 4, "esr": 2}
+    # turns are interleaved instead of handed out in bursts
+    assert picks[:3] == ["sr", "esr", "sr"]
+
+
+def test_only_candidates_are_picked():
+    selector = WeightedFairSelector({"sr": 5, "esr": 1})
+
+    assert [selector.pick(["esr"]) for _ in range(3)] == ["esr"] * 3
+    assert selector.pick([]) is None
+    assert selector.pick(["unknown"]) is None
+
+
+def test_weights_must_be_positive():
+    # a type with no weight would sit with work queued and never be picked
+    with pytest.raises(ValueError):
+        WeightedFairSelector({"sr": 0, "esr": 1})
+
+    with pytest.raises(ValueError):
+        WeightedFairSelector({"sr": -1})